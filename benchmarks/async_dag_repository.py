@@ -0,0 +1,85 @@
+"""
+Wall time of the upload of 400 DAGs, as done by /v1/provision, through the request
+threadpool (synchronous handlers, 40 threads by default) versus
+AsyncS3DagRepository.create_or_update_dags, whose concurrency is bounded by
+S3_DAG_ASYNC_MAX_CONCURRENCY instead.
+
+Runs against a local S3 stand-in that adds 50 ms of latency to every upload:
+
+    python -m benchmarks.async_dag_repository
+"""
+
+import asyncio
+import threading
+import time
+
+import anyio.to_thread
+from botocore.exceptions import ClientError
+
+from src.repositories.async_s3_dag_repository import AsyncS3DagRepository
+from src.repositories.s3_dag_repository import S3DagRepository
+from src.settings.s3_dag_settings import S3DagSettings
+
+UPLOADS = 400
+LATENCY = 0.05
+MAX_POOL_CONNECTIONS = 200
+DAGS = {f"urn:dc:{i}": "content" for i in range(UPLOADS)}
+
+
+class SlowS3Client:
+    """S3 stand-in tracking the highest number of uploads in flight"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def head_object(self, Bucket: str, Key: str) -> dict:
+        raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+
+    def put_object(self, Bucket: str, Key: str, **kwargs) -> dict:
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+        return dict()
+
+
+async def request_threadpool(repository: S3DagRepository) -> None:
+    async def upload(data_contract_id: str, content: str) -> None:
+        await anyio.to_thread.run_sync(
+            repository.create_or_update_dag, data_contract_id, content, "development"
+        )
+
+    await asyncio.gather(*(upload(*dag) for dag in DAGS.items()))
+
+
+async def async_repository(repository: S3DagRepository) -> None:
+    await AsyncS3DagRepository(repository).create_or_update_dags(DAGS, "development")
+
+
+def main():
+    settings = S3DagSettings(
+        bucket_name="benchmark-bucket",
+        folder="dags",
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+    )
+    for name, fn in [
+        ("request threadpool", request_threadpool),
+        ("async repository", async_repository),
+    ]:
+        s3_client = SlowS3Client(LATENCY)
+        repository = S3DagRepository(settings, s3_client)  # type: ignore[arg-type]
+        start = time.perf_counter()
+        asyncio.run(fn(repository))
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:<20} {elapsed:6.2f} s, {s3_client.max_in_flight:4d} uploads in flight"  # noqa: E501
+        )
+
+
+if __name__ == "__main__":
+    main()
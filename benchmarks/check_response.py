@@ -0,0 +1,89 @@
+"""
+Cost of check_response for a route with the previous lookup (stack inspection,
+then linear scans of the application routes and of the route responses) versus
+the precomputed route response indexes, looked up by the endpoint passed by the
+route.
+
+    python -m benchmarks.check_response
+"""
+
+import inspect
+import timeit
+from typing import Any
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+from src.check_return_type import (
+    _check_response_type,
+    _get_route_response_indexes,
+    check_response,
+)
+from src.models.api_models import SystemErr, ValidationError, ValidationResult
+
+ITERATIONS = 50_000
+ROUTES = 50
+
+app = FastAPI()
+RESPONSES: dict[int | str, dict[str, Any]] = {
+    "200": {"model": ValidationResult},
+    "202": {"model": str},
+    "400": {"model": ValidationError},
+    "500": {"model": SystemErr},
+}
+ENDPOINTS = [lambda: None for _ in range(ROUTES)]
+for i, endpoint in enumerate(ENDPOINTS):
+    app.add_api_route(f"/v1/route{i}", endpoint, name=f"route{i}", responses=RESPONSES)
+
+OUT_RESPONSE = SystemErr(error="error")
+
+
+def previous_lookup(caller_name: str):
+    frame = inspect.currentframe()
+    for _ in range(2):
+        frame = frame.f_back if frame is not None else None
+    endpoint = next(
+        route
+        for route in app.routes
+        if isinstance(route, APIRoute) and route.name == caller_name
+    )
+    for code, endpoint_response in endpoint.responses.items():
+        if not isinstance(endpoint_response, dict):
+            continue
+        if endpoint_response.get("model") is type(OUT_RESPONSE):
+            return code
+
+
+def route48():
+    # same lookup done by check_response when called by the route48 endpoint
+    return (
+        _get_route_response_indexes(app)
+        .by_endpoint[ENDPOINTS[48]]
+        .get(type(OUT_RESPONSE))
+    )
+
+
+def route49():
+    return check_response(OUT_RESPONSE, application=app, endpoint=ENDPOINTS[49])
+
+
+def route49_previous():
+    previous_lookup("route49")
+    return _check_response_type({SystemErr: "500"}, OUT_RESPONSE)
+
+
+def main():
+    route49()  # builds the indexes
+    cases = [
+        ("lookup only, previous", lambda: previous_lookup("route48")),
+        ("lookup only, indexed", route48),
+        ("check_response, previous", route49_previous),
+        ("check_response, indexed", route49),
+    ]
+    for name, fn in cases:
+        elapsed = timeit.timeit(fn, number=ITERATIONS)
+        print(f"{name:<26} {elapsed / ITERATIONS * 1_000_000:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
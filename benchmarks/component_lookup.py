@@ -0,0 +1,118 @@
+"""
+Component lookups on a data product with 5,000 components, 1,000 of which are
+guarded by the guardian workload: linear scans of `components` (as before)
+versus the lazily built component indexes of DataProduct, and the selection of
+the data contracts to guard with a nested scan of the guards versus a set.
+
+    python -m benchmarks.component_lookup
+"""
+
+import timeit
+
+from benchmarks.synthetic_descriptor import build_descriptor_dict
+from src.models.data_product_descriptor import Component, DataProduct
+from src.models.gx_models import GXGuardianWorkload
+from src.utility.parsing_pydantic_models import parse_yaml_with_model
+
+COMPONENTS = 5_000
+GUARDS = 1_000
+REPEAT = 5
+
+
+def get_component_by_id_linear(
+    data_product: DataProduct, component_id: str
+) -> Component | None:
+    for component in data_product.components:
+        if component.id == component_id:
+            return component
+    return None
+
+
+def get_data_contracts_to_guard_nested(
+    data_product: DataProduct, guardian: GXGuardianWorkload
+) -> list[Component]:
+    return [
+        cmp
+        for cmp in [
+            component
+            for component in data_product.components
+            if component.dataContractEnabled
+        ]
+        if cmp.id
+        in map(
+            lambda x: x.dataContractId,
+            guardian.dataContractGuardianSpec.guards,
+        )
+    ]
+
+
+def get_data_contracts_to_guard_set(
+    data_product: DataProduct, guardian: GXGuardianWorkload
+) -> list[Component]:
+    guarded_data_contract_ids = {
+        guard.dataContractId for guard in guardian.dataContractGuardianSpec.guards
+    }
+    return [
+        cmp
+        for cmp in data_product.get_data_contract_components()
+        if cmp.id in guarded_data_contract_ids
+    ]
+
+
+def main():
+    descriptor = build_descriptor_dict(
+        output_ports=COMPONENTS - 1, guards=GUARDS, columns=2, expectations=0
+    )
+    data_product = parse_yaml_with_model(descriptor["dataProduct"], DataProduct)
+    assert isinstance(data_product, DataProduct)
+    guardian = data_product.get_typed_component_by_id(
+        descriptor["componentIdToProvision"], GXGuardianWorkload
+    )
+    guarded_ids = [
+        guard.dataContractId for guard in guardian.dataContractGuardianSpec.guards
+    ]
+    print(f"{len(data_product.components)} components, {len(guarded_ids)} guards")
+
+    linear = min(
+        timeit.repeat(
+            lambda: [
+                get_component_by_id_linear(data_product, component_id)
+                for component_id in guarded_ids
+            ],
+            number=1,
+            repeat=REPEAT,
+        )
+    )
+    indexed = min(
+        timeit.repeat(
+            lambda: [
+                data_product.get_component_by_id(component_id)
+                for component_id in guarded_ids
+            ],
+            number=1,
+            repeat=REPEAT,
+        )
+    )
+    print(f"{GUARDS} lookups by ID linear        {linear * 1000:8.2f} ms")
+    print(f"{GUARDS} lookups by ID indexed       {indexed * 1000:8.2f} ms")
+
+    nested = min(
+        timeit.repeat(
+            lambda: get_data_contracts_to_guard_nested(data_product, guardian),
+            number=1,
+            repeat=REPEAT,
+        )
+    )
+    with_set = min(
+        timeit.repeat(
+            lambda: get_data_contracts_to_guard_set(data_product, guardian),
+            number=1,
+            repeat=REPEAT,
+        )
+    )
+    print(f"data contracts to guard nested {nested * 1000:8.2f} ms")
+    print(f"data contracts to guard set    {with_set * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
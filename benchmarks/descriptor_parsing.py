@@ -0,0 +1,64 @@
+"""
+Time and memory allocated to handle the descriptor of a provisioning request
+when it is parsed twice (once by the dependencies and once more by the provision
+service, as before) versus once, through ParsedDescriptor.
+
+Peak allocated memory is measured with tracemalloc.
+
+    python -m benchmarks.descriptor_parsing
+"""
+
+import json
+import time
+import tracemalloc
+from typing import Callable
+
+import yaml
+from fastapi.encoders import jsonable_encoder
+
+from benchmarks.synthetic_descriptor import build_descriptor
+from src.models.data_product_descriptor import DataProduct
+from src.models.parsed_descriptor import ParsedDescriptor
+from src.utility.parsing_pydantic_models import parse_yaml_with_model
+
+
+def parse_twice(descriptor_str: str) -> None:
+    descriptor_dict = yaml.safe_load(descriptor_str)
+    parse_yaml_with_model(descriptor_dict.get("dataProduct"), DataProduct)
+    json.dumps(jsonable_encoder(yaml.safe_load(descriptor_str)))
+
+
+def parse_once(descriptor_str: str) -> None:
+    descriptor_dict = yaml.safe_load(descriptor_str)
+    data_product = parse_yaml_with_model(
+        descriptor_dict.get("dataProduct"), DataProduct
+    )
+    assert isinstance(data_product, DataProduct)
+    ParsedDescriptor(
+        descriptor_dict, data_product, descriptor_dict["componentIdToProvision"]
+    ).json
+
+
+def profile(fn: Callable[[str], None], descriptor_str: str) -> tuple[float, int]:
+    start = time.perf_counter()
+    fn(descriptor_str)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn(descriptor_str)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    descriptor_str = build_descriptor(output_ports=100, guards=50)
+    print(f"descriptor size: {len(descriptor_str) / 1024 / 1024:.2f} MB")
+    for name, fn in [("parsed twice", parse_twice), ("parsed once", parse_once)]:
+        elapsed, peak = profile(fn, descriptor_str)
+        print(
+            f"{name:<13} {elapsed:7.2f} s  peak allocated {peak / 1024 / 1024:7.2f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
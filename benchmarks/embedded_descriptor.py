@@ -0,0 +1,64 @@
+"""
+Bytes uploaded by a single provision when every DAG embeds the full descriptor
+versus only the slice of its data contract component.
+
+    python -m benchmarks.embedded_descriptor
+"""
+
+import asyncio
+from unittest.mock import Mock
+
+from benchmarks.synthetic_descriptor import build_descriptor
+from src.dependencies import unpack_provisioning_request
+from src.models.api_models import DescriptorKind, ProvisioningRequest, ValidationError
+from src.repositories.dag_repository import DagWriteOutcome
+from src.services.provision_service import ProvisionService
+from src.services.template_service import TemplateService
+from src.services.validation_service import validate_components
+from src.settings.airflow_settings import AirflowSettings
+from src.settings.cgp_settings import CGPSettings
+from src.settings.provision_settings import ProvisionSettings
+
+SIZES = [(10, 10), (100, 50), (500, 200)]
+
+
+def bytes_uploaded(descriptor_str: str, descriptor_embedding: str) -> int:
+    request = ProvisioningRequest(
+        descriptorKind=DescriptorKind.COMPONENT_DESCRIPTOR, descriptor=descriptor_str
+    )
+    validated = validate_components(asyncio.run(unpack_provisioning_request(request)))
+    assert not isinstance(validated, ValidationError)
+    descriptor, workload, data_contracts = validated
+    uploaded = 0
+
+    def create_or_update_dag(data_contract_id, content, environment):
+        nonlocal uploaded
+        uploaded += len(content.encode("utf-8"))
+        return DagWriteOutcome.WRITTEN
+
+    dag_repository = Mock()
+    dag_repository.create_or_update_dag.side_effect = create_or_update_dag
+    provision_service = ProvisionService(
+        dag_repository,
+        TemplateService(),
+        CGPSettings(base_url="http://localhost:8088"),
+        AirflowSettings(connection_id="snowflake"),
+        ProvisionSettings(descriptor_embedding=descriptor_embedding),
+    )
+    provision_service.provision(descriptor, workload, data_contracts)
+    return uploaded
+
+
+def main():
+    print(
+        f"{'components':>10} {'guards':>6} {'full (bytes)':>14} {'component (bytes)':>18}"
+    )
+    for output_ports, guards in SIZES:
+        descriptor = build_descriptor(output_ports, guards)
+        full = bytes_uploaded(descriptor, "full")
+        component = bytes_uploaded(descriptor, "component")
+        print(f"{output_ports:>10} {guards:>6} {full:>14} {component:>18}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Per-request logging overhead: the previous get_logger, which reconfigured the root
+logger with basicConfig(force=True) on every call, versus logging configured once
+with the queue handler. A request creates the loggers of ProvisionService,
+TemplateService and S3DagRepository and writes a few records.
+
+Records are written to /dev/null:
+
+    python -m benchmarks.logging_overhead
+"""
+
+import logging
+import os
+import sys
+import timeit
+
+from src.settings.logging_settings import LoggingSettings
+from src.utility import logger as logger_module
+
+REQUESTS = 2000
+LOGGERS = ["provision_service", "template_service", "s3_dag_repository"]
+
+
+def basic_config_get_logger(name=""):
+    logging.basicConfig(
+        level=logging.INFO,
+        format=logger_module.LOG_FORMAT,
+        datefmt=logger_module.LOG_DATE_FORMAT,
+        force=True,
+    )
+    return logging.getLogger(name)
+
+
+def request(get_logger) -> None:
+    loggers = [get_logger(name) for name in LOGGERS]
+    for logger in loggers:
+        logger.info("Handling data contract %s", "urn:dmb:cmp:dp:0:dc")
+
+
+def main():
+    sys.stderr = open(os.devnull, "w")
+    elapsed = timeit.timeit(lambda: request(basic_config_get_logger), number=REQUESTS)
+    print(
+        f"{'basicConfig per call':<22} {elapsed / REQUESTS * 1e6:8.1f} us/request",
+        file=sys.stdout,
+    )
+
+    logging.getLogger().handlers.clear()
+    logger_module._configured = False
+    logger_module.configure_logging(LoggingSettings(queue=True))
+    elapsed = timeit.timeit(lambda: request(logger_module.get_logger), number=REQUESTS)
+    print(
+        f"{'configured once':<22} {elapsed / REQUESTS * 1e6:8.1f} us/request",
+        file=sys.stdout,
+    )
+    logger_module.stop_logging()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Per-request metrics overhead: the metrics recorded while serving a provisioning
+request (in-progress gauge, descriptor parse, data product validation,
+validate_components, a DAG render, a DAG upload and the DAG counters), with the
+instrumented code replaced by no-ops, versus parsing the smallest test descriptor:
+
+    python -m benchmarks.metrics_overhead
+"""
+
+import timeit
+from pathlib import Path
+
+from src.dependencies import parse_component_descriptor
+from src.utility import metrics
+
+REQUESTS = 20000
+
+
+def request() -> None:
+    in_progress = metrics.REQUESTS_IN_PROGRESS.labels("/v1/provision")
+    in_progress.inc()
+    metrics.set_endpoint("/v1/provision")
+    with metrics.DESCRIPTOR_PARSE_SECONDS.time():
+        pass
+    with metrics.DATA_PRODUCT_VALIDATION_SECONDS.time():
+        pass
+    metrics.observe_descriptor_size("descriptor", "development")
+    with metrics.VALIDATE_COMPONENTS_SECONDS.time():
+        pass
+    with metrics.RENDER_TEMPLATE_SECONDS.labels("snowflake.jinja").time():
+        pass
+    with metrics.S3_PUT_OBJECT_SECONDS.time():
+        pass
+    metrics.count_dags("development", written=1)
+    in_progress.dec()
+
+
+def main():
+    elapsed = timeit.timeit(request, number=REQUESTS)
+    print(f"{'metrics':<18} {elapsed / REQUESTS * 1e6:8.1f} us/request")
+
+    descriptor = Path("tests/descriptors/descriptor_valid.yaml").read_text()
+    parses = REQUESTS // 100
+    elapsed = timeit.timeit(
+        lambda: parse_component_descriptor(descriptor), number=parses
+    )
+    print(f"{'descriptor parsing':<18} {elapsed / parses * 1e6:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Throughput of TemplateService.render_template with a new Jinja environment built
+for every render (previous behaviour) versus the shared, cached environment.
+
+    python -m benchmarks.render_template
+"""
+
+import timeit
+
+from jinja2 import Environment, PackageLoader, select_autoescape
+
+from src.services.template_service import TemplateService
+
+ITERATIONS = 200
+
+PARAMETERS = {
+    "data_contract_id": "urn:dmb:cmp:marketing:dp:0:output-port",
+    "environment": "development",
+    "descriptor": "{}",
+    "passive_policy_id": "policy",
+    "cgp_base_url": "http://localhost:8088",
+    "airflow_connection_id": "snowflake",
+}
+
+
+def main():
+    def environment_per_render():
+        env = Environment(loader=PackageLoader("src"), autoescape=select_autoescape())
+        env.get_template("snowflake.jinja").render(PARAMETERS)
+
+    template_service = TemplateService()
+    template_service.precompile()
+
+    def shared_environment():
+        template_service.render_template("Snowflake", PARAMETERS)
+
+    for name, fn in [
+        ("environment per render", environment_per_render),
+        ("shared environment", shared_environment),
+    ]:
+        elapsed = timeit.timeit(fn, number=ITERATIONS)
+        print(f"{name:<24} {ITERATIONS / elapsed:10.1f} renders/s")
+
+
+if __name__ == "__main__":
+    main()
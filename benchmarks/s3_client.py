@@ -0,0 +1,49 @@
+"""
+Per-call latency of S3DagRepository.create_or_update_dag with a client created
+on every call (previous behaviour) versus the shared, pooled client.
+
+Runs against moto's in-process S3 stand-in, so no AWS account is needed:
+
+    python -m benchmarks.s3_client
+"""
+
+import os
+import timeit
+
+import boto3
+from moto import mock_aws
+
+from src.repositories.s3_dag_repository import S3DagRepository, create_s3_client
+from src.settings.s3_dag_settings import S3DagSettings
+
+ITERATIONS = 200
+
+
+def main():
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    settings = S3DagSettings(bucket_name="benchmark-bucket", folder="dags")
+
+    with mock_aws():
+        boto3.client("s3").create_bucket(Bucket=settings.bucket_name)
+
+        def client_per_call():
+            repository = S3DagRepository(settings, create_s3_client(settings))
+            repository.create_or_update_dag("urn:dc", "content", "development")
+
+        shared_repository = S3DagRepository(settings)
+
+        def shared_client():
+            shared_repository.create_or_update_dag("urn:dc", "content", "development")
+
+        for name, fn in [
+            ("client per call", client_per_call),
+            ("shared client", shared_client),
+        ]:
+            elapsed = timeit.timeit(fn, number=ITERATIONS)
+            print(f"{name:<16} {elapsed / ITERATIONS * 1000:8.2f} ms/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Builds synthetic provisioning descriptors of arbitrary size, starting from the
+valid descriptor used by the tests.
+"""
+
+import copy
+from pathlib import Path
+
+import yaml
+
+BASE_DESCRIPTOR = Path("tests/descriptors/descriptor_valid.yaml")
+DATA_TYPES = ["VARCHAR", "NUMBER", "BOOLEAN", "TIMESTAMP", "DATE", "VARIANT"]
+
+
+def build_descriptor_dict(
+    output_ports: int, guards: int, columns: int = 20, expectations: int = 3
+) -> dict:
+    """
+    Returns a provisioning descriptor whose data product contains `output_ports`
+    Snowflake output ports with a data contract of `columns` columns and
+    `expectations` quality checks, plus the guardian workload guarding the first
+    `guards` of them.
+    """
+    descriptor = yaml.safe_load(BASE_DESCRIPTOR.read_text())
+    output_port, guardian = descriptor["dataProduct"]["components"]
+    components = []
+    for i in range(output_ports):
+        component = copy.deepcopy(output_port)
+        component["id"] = f"{output_port['id']}-{i}"
+        component["name"] = f"{output_port['name']} {i}"
+        component["specific"]["tableName"] = f"table_{i}"
+        component["dataContract"]["schema"] = [
+            {"name": f"column_{c}", "dataType": DATA_TYPES[c % len(DATA_TYPES)]}
+            for c in range(columns)
+        ]
+        component["dataContract"]["quality"] = [
+            {
+                "type": "custom",
+                "engine": "greatExpectations",
+                "implementation": {
+                    "type": "expect_column_values_to_not_be_null",
+                    "args": {"column": f"column_{e}"},
+                },
+            }
+            for e in range(expectations)
+        ]
+        components.append(component)
+    guardian["__dataContractGuardianSpec"]["guards"] = [
+        {"dataContractId": component["id"]} for component in components[:guards]
+    ]
+    descriptor["dataProduct"]["components"] = components + [guardian]
+    return descriptor
+
+
+def build_descriptor(
+    output_ports: int, guards: int, columns: int = 20, expectations: int = 3
+) -> str:
+    return yaml.safe_dump(
+        build_descriptor_dict(output_ports, guards, columns, expectations)
+    )
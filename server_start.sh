@@ -2,6 +2,13 @@
 
 echo -e "Uvicorn server initialization...\n"
 
+if [[ -n $PROMETHEUS_MULTIPROC_DIR ]];
+then
+    # metrics files left by the worker processes of a previous run
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+    rm -f "$PROMETHEUS_MULTIPROC_DIR"/*.db
+fi
+
 if [[ $1 = open_telemetry_activation ]];
 then
     # The following configuration is set for the Dockerfile
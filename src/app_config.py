@@ -1,7 +1,14 @@
 from fastapi import FastAPI
 
+from src.lifespan import lifespan
+
 app = FastAPI(
     title="Specific Provisioner Micro Service",
     description="Microservice responsible to handle provisioning and access control requests for one or more data product components.",  # noqa: E501
     version="2.2.0",
+    lifespan=lifespan,
 )
+# set by the lifespan once the service is warmed up
+app.state.ready = False
+# set by the lifespan, to run coroutines on its event loop from the worker threads
+app.state.blocking_portal = None
@@ -1,6 +1,6 @@
-import inspect
 import json
-from typing import Any
+from typing import Any, Callable
+from weakref import WeakKeyDictionary
 
 from fastapi import FastAPI
 from fastapi.encoders import jsonable_encoder
@@ -14,18 +14,39 @@ from src.utility.logger import get_logger
 
 logger = get_logger()
 
+# model type -> HTTP response code
+ResponseIndex = dict[Any, Any]
+
+
+class _RouteResponseIndexes:
+    def __init__(self, application: FastAPI):
+        self.routes_count = len(application.routes)
+        self.by_endpoint: dict[Callable, ResponseIndex] = dict()
+        self.by_path: dict[str, ResponseIndex] = dict()
+        for route in application.routes:
+            if isinstance(route, APIRoute):
+                response_index = _build_response_index(route.responses)
+                self.by_endpoint.setdefault(route.endpoint, response_index)
+                self.by_path.setdefault(route.path, response_index)
+
+
+_route_response_indexes: WeakKeyDictionary[FastAPI, _RouteResponseIndexes] = (
+    WeakKeyDictionary()
+)
+
 
 def check_response(
     out_response: Any,
     responses: dict | None = None,
     route_path: str | None = None,
     application: FastAPI = app,
+    endpoint: Callable | None = None,
 ) -> Response:
     """
     Check if the type of out_response is included in one of:
     - the responses param
     - in the responses of the specified route
-    - in the responses of the caller route
+    - in the responses of the route of the specified endpoint
 
     and, in case, returns a Response object that includes the HTTP response code and
     the JSON or the text corresponding to the out_response parameter.
@@ -38,6 +59,7 @@ def check_response(
             including the data model to be returned. Defaults to None.
         route_path: (str, optional) The path of the FastAPI route. Defaults to None.
         application: (FastAPI, optional) The FastAPI application. Defaults to the main application.
+        endpoint: (Callable, optional) The function of the FastAPI route, usually the caller itself. Defaults to None.
 
     Returns:
         starlette.responses.Response: A Response object that includes the HTTP response code and
@@ -45,34 +67,18 @@ def check_response(
     """  # noqa: E501
 
     if responses is not None:
-        return _check_response_type(responses, out_response)
+        return _check_response_type(_build_response_index(responses), out_response)
 
-    if route_path is not None:
-        endpoint = _find_caller_endpoint_by_path(
-            application=application, caller_path=route_path
-        )
+    route_indexes = _get_route_response_indexes(application)
 
+    if route_path is not None:
+        response_index = route_indexes.by_path.get(route_path)
+    elif endpoint is not None:
+        response_index = route_indexes.by_endpoint.get(endpoint)
     else:
-        caller_function = _find_caller_function()
-
-        if caller_function is None:
-            logger.error("Check_responses: caller function not found")
-            return Response(
-                status_code=500,
-                content=SystemErr(
-                    error="An unexpected error occurred while processing the request. "
-                    "If the issue still persists, contact the platform team for assistance!"  # noqa: E501
-                ).model_dump_json(),
-                media_type="application/json",
-            )
-
-        endpoint = _find_caller_endpoint_by_name(
-            application=application, caller_name=caller_function
-        )
-
-    responses = endpoint.responses if endpoint is not None else None
+        response_index = None
 
-    if responses is None:
+    if response_index is None:
         logger.error(
             "Check_responses: endpoint not found in app.routes or responses parameter has no value "  # noqa: E501
         )
@@ -85,18 +91,45 @@ def check_response(
             media_type="application/json",
         )
 
-    return _check_response_type(responses, out_response)
+    return _check_response_type(response_index, out_response)
 
 
-def _check_response_type(responses: dict, out_response: Any) -> Response:
+def _get_route_response_indexes(application: FastAPI) -> _RouteResponseIndexes:
+    """
+    Returns the responses of the routes of the application indexed by endpoint and by
+    route path, so that the response check of every request is a dictionary lookup.
+
+    The indexes are built the first time they are needed and rebuilt only if routes
+    are added to the application afterwards.
     """
-    Ensures that the type of the parameter 'out_response' is contained in the 'model'
-    field of the 'responses' dictionary.
+    route_indexes = _route_response_indexes.get(application)
+    if route_indexes is None or route_indexes.routes_count != len(application.routes):
+        route_indexes = _RouteResponseIndexes(application)
+        _route_response_indexes[application] = route_indexes
+    return route_indexes
+
+
+def _build_response_index(responses: dict) -> ResponseIndex:
+    """
+    Builds the map from the 'model' field of the 'responses' dictionary to the
+    corresponding HTTP response code. If the same model is used by more response
+    codes, the first one is kept.
+    """
+    response_index: ResponseIndex = dict()
+    for response_code, endpoint_response in responses.items():
+        if isinstance(endpoint_response, dict) and "model" in endpoint_response:
+            response_index.setdefault(endpoint_response["model"], response_code)
+    return response_index
+
+
+def _check_response_type(response_index: ResponseIndex, out_response: Any) -> Response:
+    """
+    Ensures that the type of the parameter 'out_response' is one of the models of the
+    route responses.
 
     Args:
-        responses: (dict) A dictionary used to specify the possible responses for the route.
-            It is used to define the possible HTTP response codes that the API can return along with their details,
-            including the data model to be returned.
+        response_index: (dict) A dictionary mapping the data models that the route can return
+            to the corresponding HTTP response codes, as built by `_build_response_index`.
         out_response: (Any) The response that the FastAPI route wants to return as output.
     Returns:
         starlette.responses.Response: A Response object that includes the HTTP response code and
@@ -105,18 +138,9 @@ def _check_response_type(responses: dict, out_response: Any) -> Response:
         it returns a Response containing a SystemErr.
     """  # noqa: E501
 
-    # set default response_code = 500, if correct response type is found it will be changed  # noqa: E501
-    response_code = 500
-    correct_output_type = False
-    for k in responses.keys():
-        endpoint_response = responses.get(k)
-        if isinstance(endpoint_response, dict) and endpoint_response is not None:
-            if endpoint_response.get("model") == type(out_response):
-                correct_output_type = True
-                response_code = k
-                break
-
-    if not correct_output_type:
+    response_code = response_index.get(type(out_response))
+
+    if response_code is None:
         logger.error("Check response type: response type indicated not allowed")
         return Response(
             status_code=500,
@@ -143,87 +167,3 @@ def _check_response_type(responses: dict, out_response: Any) -> Response:
     return Response(
         status_code=int(response_code), content=content, media_type=media_type
     )
-
-
-def _find_caller_function(n_back: int = 2) -> str | None:
-    """
-    Returns the name of the caller function 'n_back' frames up the call stack.
-
-    This function inspects the call stack to find the name of the caller function
-    'n_back' frames up from the current function call. If 'n_back' is not specified,
-    it defaults to 2.
-
-    Args:
-        n_back (int, optional): The number of frames up the call stack to look for
-            the caller function. Defaults to 2, which retrieves the immediate caller.
-
-    Returns:
-        str | None: The name of the caller function as a string, or None if the caller
-        function cannot be determined (e.g., when 'n_back' exceeds the call stack depth
-        or when this function is executed at the highest level in the call stack).
-    """  # noqa: E501
-
-    frame = inspect.currentframe()
-
-    if frame is not None:
-        for _ in range(n_back):
-            if frame is None:
-                return None
-            frame = frame.f_back
-
-    caller_function = frame.f_code.co_name if frame is not None else None
-    return caller_function
-
-
-def _find_caller_endpoint_by_path(
-    application: FastAPI, caller_path: str
-) -> APIRoute | None:
-    """
-    Find and return the FastAPI endpoint (APIRoute) based on the provided caller_path.
-
-    This function iterates through all registered routes in the FastAPI application and searches for an APIRoute
-    that matches the caller_path argument.
-    If a match is found, the corresponding APIRoute object is returned. If no match is found, the function returns None.
-
-    Args:
-        application (FastAPI): The FastAPI application instance to search for the endpoint.
-        caller_path (str): The path of the route to search for.
-
-    Returns:
-        APIRoute or None: If a matching route is found, it returns the corresponding APIRoute object.
-        If no matching route is found, it returns None.
-
-    """  # noqa: E501
-
-    for route in application.routes:
-        if isinstance(route, APIRoute) and route.path == caller_path:
-            return route
-
-    return None
-
-
-def _find_caller_endpoint_by_name(
-    application: FastAPI, caller_name: str
-) -> APIRoute | None:
-    """
-    Find and return the FastAPI endpoint (APIRoute) based on the provided caller_name.
-
-    This function iterates through all registered routes in the FastAPI application and searches for an APIRoute
-    that matches the caller_name argument.
-    If a match is found, the corresponding APIRoute object is returned. If no match is found, the function returns None.
-
-    Args:
-        application (FastAPI): The FastAPI application instance to search for the endpoint.
-        caller_name (str): The name of the route to search for.
-
-    Returns:
-        APIRoute or None: If a matching route is found, it returns the corresponding APIRoute object.
-        If no matching route is found, it returns None.
-
-    """  # noqa: E501
-
-    for route in application.routes:
-        if isinstance(route, APIRoute) and route.name == caller_name:
-            return route
-
-    return None
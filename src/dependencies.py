@@ -1,9 +1,13 @@
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 from typing import Annotated, Tuple
 
-import yaml
-from fastapi import Depends
+from anyio.from_thread import BlockingPortal
+from botocore.client import BaseClient
+from fastapi import Depends, Request
 
+# registers the GX component models used when parsing the descriptors
+from src.models import gx_models  # noqa: F401
 from src.models.api_models import (
     DescriptorKind,
     ProvisioningRequest,
@@ -11,22 +15,39 @@ from src.models.api_models import (
     ValidationError,
 )
 from src.models.data_product_descriptor import DataProduct
-from src.repositories.dag_repository import DagRepository
-from src.repositories.s3_dag_repository import S3DagRepository
+from src.models.parsed_descriptor import ParsedDescriptor
+from src.repositories.async_s3_dag_repository import AsyncS3DagRepository
+from src.repositories.dag_repository import AsyncDagRepository, DagRepository
+from src.repositories.in_memory_task_repository import InMemoryTaskRepository
+from src.repositories.s3_dag_repository import S3DagRepository, create_s3_client
+from src.repositories.sqlite_task_repository import SqliteTaskRepository
+from src.repositories.task_repository import TaskRepository
 from src.services.provision_service import ProvisionService
+from src.services.provisioning_task_service import ProvisioningTaskService
 from src.services.template_service import TemplateService
 from src.settings.airflow_settings import AirflowSettings
 from src.settings.cgp_settings import CGPSettings
+from src.settings.provision_settings import ProvisionSettings
 from src.settings.s3_dag_settings import S3DagSettings
+from src.settings.task_settings import TaskSettings
+from src.settings.template_settings import TemplateSettings
+from src.settings.validation_settings import ValidationSettings
 from src.utility.logger import get_logger
+from src.utility.metrics import (
+    DATA_PRODUCT_VALIDATION_SECONDS,
+    DESCRIPTOR_PARSE_SECONDS,
+    observe_descriptor_size,
+)
 from src.utility.parsing_pydantic_models import parse_yaml_with_model
+from src.utility.tracing import ENVIRONMENT, PAYLOAD_SIZE, start_span
+from src.utility.yaml_loader import safe_load
 
 logger = get_logger()
 
 
 async def unpack_provisioning_request(
     provisioning_request: ProvisioningRequest,
-) -> Tuple[DataProduct, str] | ValidationError:
+) -> ParsedDescriptor | ValidationError:
     """
     Unpacks a Provisioning Request.
 
@@ -37,15 +58,17 @@ async def unpack_provisioning_request(
         provisioning_request (ProvisioningRequest): The provisioning request to be unpacked.
 
     Returns:
-        Union[Tuple[DataProduct, str], ValidationError]:
-            - If successful, returns a tuple containing:
-                - `DataProduct`: The data product for provisioning.
-                - `str`: The component ID to provision.
+        Union[ParsedDescriptor, ValidationError]:
+            - If successful, returns a `ParsedDescriptor` containing:
+                - `descriptor_dict`: The descriptor loaded from the YAML.
+                - `data_product`: The data product for provisioning.
+                - `component_id`: The component ID to provision.
             - If unsuccessful, returns a `ValidationError` object with error details.
 
     Note:
         - This function expects the `provisioning_request` to have a descriptor kind of `DescriptorKind.COMPONENT_DESCRIPTOR`.
         - It will attempt to parse the descriptor and return the relevant information. If parsing fails or the descriptor kind is unexpected, a `ValidationError` will be returned.
+        - The descriptor is parsed only here: the returned `ParsedDescriptor` is meant to be passed along to the services handling the request.
 
     """  # noqa: E501
 
@@ -56,15 +79,40 @@ async def unpack_provisioning_request(
             f"platform team."
         )
         return ValidationError(errors=[error])
+    return parse_component_descriptor(provisioning_request.descriptor)
+
+
+def parse_component_descriptor(descriptor: str) -> ParsedDescriptor | ValidationError:
+    """
+    Parses a descriptor of kind `DescriptorKind.COMPONENT_DESCRIPTOR`.
+
+    Args:
+        descriptor (str): The descriptor in YAML format.
+
+    Returns:
+        Union[ParsedDescriptor, ValidationError]: the parsed descriptor, or a `ValidationError` object with error details if parsing fails.
+    """  # noqa: E501
+
     try:
-        descriptor_dict = yaml.safe_load(provisioning_request.descriptor)
-        data_product = parse_yaml_with_model(
-            descriptor_dict.get("dataProduct"), DataProduct
-        )
+        with DESCRIPTOR_PARSE_SECONDS.time(), start_span(
+            "descriptor.parse", {PAYLOAD_SIZE: len(descriptor)}
+        ):
+            descriptor_dict = safe_load(descriptor)
+        with DATA_PRODUCT_VALIDATION_SECONDS.time(), start_span(
+            "descriptor.validate_data_product"
+        ) as span:
+            data_product = parse_yaml_with_model(
+                descriptor_dict.get("dataProduct"), DataProduct
+            )
+            if isinstance(data_product, DataProduct):
+                span.set_attribute(ENVIRONMENT, data_product.environment)
         component_to_provision = descriptor_dict.get("componentIdToProvision")
 
         if isinstance(data_product, DataProduct):
-            return data_product, component_to_provision
+            observe_descriptor_size(descriptor, data_product.environment)
+            return ParsedDescriptor(
+                descriptor_dict, data_product, component_to_provision
+            )
         elif isinstance(data_product, ValidationError):
             return data_product
 
@@ -80,14 +128,14 @@ async def unpack_provisioning_request(
 
 
 UnpackedProvisioningRequestDep = Annotated[
-    Tuple[DataProduct, str] | ValidationError,
+    ParsedDescriptor | ValidationError,
     Depends(unpack_provisioning_request),
 ]
 
 
 async def unpack_unprovisioning_request(
     provisioning_request: ProvisioningRequest,
-) -> Tuple[DataProduct, str, bool] | ValidationError:
+) -> Tuple[ParsedDescriptor, bool] | ValidationError:
     """
     Unpacks a Unprovisioning Request.
 
@@ -98,10 +146,9 @@ async def unpack_unprovisioning_request(
         provisioning_request (ProvisioningRequest): The unprovisioning request to be unpacked.
 
     Returns:
-        Union[Tuple[DataProduct, str, bool], ValidationError]:
+        Union[Tuple[ParsedDescriptor, bool], ValidationError]:
             - If successful, returns a tuple containing:
-                - `DataProduct`: The data product for provisioning.
-                - `str`: The component ID to provision.
+                - `ParsedDescriptor`: The parsed descriptor, with the data product and the component ID to unprovision.
                 - `bool`: The value of the removeData field.
             - If unsuccessful, returns a `ValidationError` object with error details.
 
@@ -121,12 +168,11 @@ async def unpack_unprovisioning_request(
     if isinstance(unpacked_request, ValidationError):
         return unpacked_request
     else:
-        data_product, component_id = unpacked_request
-        return data_product, component_id, remove_data
+        return unpacked_request, remove_data
 
 
 UnpackedUnprovisioningRequestDep = Annotated[
-    Tuple[DataProduct, str, bool] | ValidationError,
+    Tuple[ParsedDescriptor, bool] | ValidationError,
     Depends(unpack_unprovisioning_request),
 ]
 
@@ -160,7 +206,7 @@ async def unpack_update_acl_request(
     """  # noqa: E501
 
     try:
-        request = yaml.safe_load(update_acl_request.provisionInfo.request)
+        request = safe_load(update_acl_request.provisionInfo.request)
         data_product = parse_yaml_with_model(request.get("dataProduct"), DataProduct)
         component_to_provision = request.get("componentIdToProvision")
         if isinstance(data_product, DataProduct):
@@ -192,8 +238,18 @@ def get_cgp_settings() -> CGPSettings:
     return CGPSettings()
 
 
+@lru_cache
+def get_template_settings() -> TemplateSettings:
+    return TemplateSettings()
+
+
+@lru_cache
 def get_template_service() -> TemplateService:
-    return TemplateService()
+    template_settings = get_template_settings()
+    template_service = TemplateService(template_settings)
+    if template_settings.precompile:
+        template_service.precompile()
+    return template_service
 
 
 @lru_cache
@@ -206,21 +262,102 @@ def get_airflow_settings() -> AirflowSettings:
     return AirflowSettings()
 
 
-def get_dag_repository(
-    s3_dag_settings: Annotated[S3DagSettings, Depends(get_s3_dag_settings)]
-) -> DagRepository:
-    return S3DagRepository(s3_dag_settings)
+@lru_cache
+def get_s3_client() -> BaseClient:
+    return create_s3_client(get_s3_dag_settings())
+
+
+@lru_cache
+def get_provision_settings() -> ProvisionSettings:
+    return ProvisionSettings()
 
 
-def get_provision_service(
-    dag_repository: Annotated[DagRepository, Depends(get_dag_repository)],
-    template_service: Annotated[TemplateService, Depends(get_template_service)],
-    cgp_settings: Annotated[CGPSettings, Depends(get_cgp_settings)],
-    airflow_settings: Annotated[AirflowSettings, Depends(get_airflow_settings)],
-) -> ProvisionService:
+@lru_cache
+def get_dag_repository() -> DagRepository:
+    return S3DagRepository(get_s3_dag_settings(), get_s3_client())
+
+
+@lru_cache
+def get_async_dag_repository() -> AsyncDagRepository:
+    # shares the connection pool of the synchronous repository, with a capacity
+    # limiter shared by all the requests
+    return AsyncS3DagRepository(S3DagRepository(get_s3_dag_settings(), get_s3_client()))
+
+
+@lru_cache
+def get_provision_service() -> ProvisionService:
     return ProvisionService(
-        dag_repository, template_service, cgp_settings, airflow_settings
+        get_dag_repository(),
+        get_template_service(),
+        get_cgp_settings(),
+        get_airflow_settings(),
+        get_provision_settings(),
+        get_async_dag_repository(),
     )
 
 
 ProvisionServiceDep = Annotated[ProvisionService, Depends(get_provision_service)]
+
+
+@lru_cache
+def get_task_settings() -> TaskSettings:
+    return TaskSettings()
+
+
+@lru_cache
+def get_task_repository() -> TaskRepository:
+    task_settings = get_task_settings()
+    if task_settings.store == "sqlite":
+        return SqliteTaskRepository(
+            task_settings.sqlite_path, task_settings.ttl_seconds
+        )
+    return InMemoryTaskRepository(task_settings.max_entries, task_settings.ttl_seconds)
+
+
+@lru_cache
+def get_task_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(
+        max_workers=get_task_settings().max_workers,
+        thread_name_prefix="provisioning-task",
+    )
+
+
+@lru_cache
+def get_provisioning_task_service() -> ProvisioningTaskService:
+    task_repository = get_task_repository()
+    # the tasks still running of the processes that are gone will never complete
+    interrupted_tasks = task_repository.fail_orphaned_tasks(
+        "The provisioning has been interrupted by a restart of the service, please retry"  # noqa: E501
+    )
+    if interrupted_tasks:
+        logger.warning(
+            "%d provisioning tasks interrupted by a restart marked as failed",
+            interrupted_tasks,
+        )
+    return ProvisioningTaskService(task_repository, get_task_executor())
+
+
+ProvisioningTaskServiceDep = Annotated[
+    ProvisioningTaskService, Depends(get_provisioning_task_service)
+]
+
+
+def get_blocking_portal(request: Request) -> BlockingPortal | None:
+    # None when the application runs without its lifespan
+    return request.app.state.blocking_portal
+
+
+BlockingPortalDep = Annotated[BlockingPortal | None, Depends(get_blocking_portal)]
+
+
+@lru_cache
+def get_validation_settings() -> ValidationSettings:
+    return ValidationSettings()
+
+
+@lru_cache
+def get_validation_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(
+        max_workers=get_validation_settings().max_workers,
+        thread_name_prefix="validation-task",
+    )
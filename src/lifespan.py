@@ -0,0 +1,86 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import anyio.to_thread
+from anyio.from_thread import BlockingPortal
+from fastapi import FastAPI
+
+from src.dependencies import (
+    get_dag_repository,
+    get_provision_service,
+    get_provisioning_task_service,
+    get_s3_client,
+    get_s3_dag_settings,
+    get_task_executor,
+    get_validation_executor,
+)
+from src.services.validation_service import get_validation_task_service
+from src.utility.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def warm_up() -> None:
+    """
+    Builds the services shared by all the requests, so that the first requests do not
+    pay for it: settings are resolved, which fails the startup if any of them is
+    invalid, the templates are compiled and a first connection of the S3 pool is
+    opened.
+    """
+    get_provision_service()
+    get_dag_repository()
+    get_provisioning_task_service()
+    get_validation_task_service()
+    s3_dag_settings = get_s3_dag_settings()
+    try:
+        get_s3_client().head_bucket(Bucket=s3_dag_settings.bucket_name)
+    except Exception:
+        # S3 may be temporarily unavailable, the requests report their own errors
+        logger.warning(
+            "Unable to reach the DAG bucket %s during the warm-up",
+            s3_dag_settings.bucket_name,
+            exc_info=True,
+        )
+
+
+def drain() -> None:
+    """
+    Waits for the provisioning and validation requests running in the background to
+    complete.
+
+    The executors that have been shut down are discarded, together with the services
+    holding them, so that a following startup of the service in the same process
+    builds new ones.
+    """
+    logger.info("Waiting for the requests running in the background to complete")
+    get_task_executor().shutdown(wait=True)
+    get_validation_executor().shutdown(wait=True)
+    for getter in (
+        get_task_executor,
+        get_provisioning_task_service,
+        get_validation_executor,
+        get_validation_task_service,
+    ):
+        getter.cache_clear()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Warms the service up before it is reported as ready on `/health/ready`, and drains
+    the work in progress when it shuts down.
+
+    The provisioning requests running in the background upload their DAGs on the event
+    loop through a blocking portal, which is closed once they are drained.
+    """
+    async with BlockingPortal() as portal:
+        app.state.ready = False
+        app.state.blocking_portal = portal
+        await anyio.to_thread.run_sync(warm_up)
+        app.state.ready = True
+        logger.info("Service ready")
+        yield
+        app.state.ready = False
+        await anyio.to_thread.run_sync(drain)
+        app.state.blocking_portal = None
+    logger.info("Service stopped")
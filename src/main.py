@@ -1,19 +1,17 @@
 from __future__ import annotations
 
-import uuid
-
-from fastapi import Request
-from starlette.background import BackgroundTask
-from starlette.responses import Response
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
 
 from src.app_config import app
 from src.check_return_type import check_response
 from src.dependencies import (
+    BlockingPortalDep,
+    ProvisioningTaskServiceDep,
     ProvisionServiceDep,
     UnpackedUpdateAclRequestDep,
 )
 from src.models.api_models import (
-    ProvisioningRequest,
     ProvisioningStatus,
     SystemErr,
     ValidationError,
@@ -21,34 +19,21 @@ from src.models.api_models import (
     ValidationResult,
     ValidationStatus,
 )
-from src.services.validation_service import ValidateComponentsDep
+from src.services.validation_service import (
+    ValidateComponentsDep,
+    ValidationTaskServiceDep,
+)
+from src.settings.logging_settings import LoggingSettings
 from src.utility.logger import get_logger
+from src.utility.logging_middleware import RequestResponseLoggingMiddleware
+from src.utility.metrics import generate_metrics
+from src.utility.metrics_middleware import MetricsMiddleware
 
 logger = get_logger()
 
 
-def log_info(req_body, res_body):
-    id = str(uuid.uuid4())
-    logger.info("[%s] REQUEST: %s", id, req_body.decode("utf-8"))
-    logger.info("[%s] RESPONSE: %s", id, res_body.decode("utf-8"))
-
-
-@app.middleware("http")
-async def log_request_response_middleware(request: Request, call_next):
-    req_body = await request.body()
-    response = await call_next(request)
-    chunks = []
-    async for chunk in response.body_iterator:
-        chunks.append(chunk)
-    res_body = b"".join(chunks)
-    task = BackgroundTask(log_info, req_body, res_body)
-    return Response(
-        content=res_body,
-        status_code=response.status_code,
-        headers=dict(response.headers),
-        media_type=response.media_type,
-        background=task,
-    )
+app.add_middleware(RequestResponseLoggingMiddleware, logging_settings=LoggingSettings())
+app.add_middleware(MetricsMiddleware)
 
 
 @app.post(
@@ -65,22 +50,25 @@ async def log_request_response_middleware(request: Request, call_next):
 def provision(
     request: ValidateComponentsDep,
     provision_service: ProvisionServiceDep,
-    provisioning_request: ProvisioningRequest,
+    provisioning_task_service: ProvisioningTaskServiceDep,
+    portal: BlockingPortalDep,
 ) -> Response:
     """
     Deploy a data product or a single component starting from a provisioning descriptor
-    """
+
+    The provisioning runs in the background: the returned token can be used to poll its status
+    """  # noqa: E501
 
     if isinstance(request, ValidationError):
-        return check_response(out_response=request)
+        return check_response(out_response=request, endpoint=provision)
 
-    data_product, workload, data_contracts = request
+    descriptor, workload, data_contracts = request
 
-    resp = provision_service.provision(
-        data_product, workload, data_contracts, provisioning_request.descriptor
+    token = provisioning_task_service.submit(
+        provision_service, descriptor, workload, data_contracts, portal
     )
 
-    return check_response(out_response=resp)
+    return check_response(out_response=token, endpoint=provision)
 
 
 @app.get(
@@ -93,15 +81,16 @@ def provision(
     },
     tags=["SpecificProvisioner"],
 )
-def get_status(token: str) -> Response:
+def get_status(
+    token: str, provisioning_task_service: ProvisioningTaskServiceDep
+) -> Response:
     """
     Get the status for a provisioning request
     """
 
-    # todo: define correct response
-    resp = SystemErr(error="Response not yet implemented")
+    resp = provisioning_task_service.get_status(token)
 
-    return check_response(out_response=resp)
+    return check_response(out_response=resp, endpoint=get_status)
 
 
 @app.post(
@@ -115,10 +104,9 @@ def get_status(token: str) -> Response:
     },
     tags=["SpecificProvisioner"],
 )
-def unprovision(
+async def unprovision(
     request: ValidateComponentsDep,
     provision_service: ProvisionServiceDep,
-    provisioning_request: ProvisioningRequest,
 ) -> Response:
     """
     Undeploy a data product or a single component
@@ -126,15 +114,15 @@ def unprovision(
     """  # noqa: E501
 
     if isinstance(request, ValidationError):
-        return check_response(out_response=request)
+        return check_response(out_response=request, endpoint=unprovision)
 
-    data_product, workload, data_contracts = request
+    descriptor, workload, data_contracts = request
 
-    resp = provision_service.unprovision(
-        data_product, workload, data_contracts, provisioning_request.descriptor
+    resp = await provision_service.unprovision_async(
+        descriptor, workload, data_contracts
     )
 
-    return check_response(out_response=resp)
+    return check_response(out_response=resp, endpoint=unprovision)
 
 
 @app.post(
@@ -154,7 +142,7 @@ def updateacl(request: UnpackedUpdateAclRequestDep) -> Response:
     """
 
     if isinstance(request, ValidationError):
-        return check_response(out_response=request)
+        return check_response(out_response=request, endpoint=updateacl)
 
     data_product, component_id, witboost_users = request
 
@@ -165,7 +153,7 @@ def updateacl(request: UnpackedUpdateAclRequestDep) -> Response:
 
     resp = SystemErr(error="Response not yet implemented")
 
-    return check_response(out_response=resp)
+    return check_response(out_response=resp, endpoint=updateacl)
 
 
 @app.post(
@@ -180,9 +168,11 @@ def validate(request: ValidateComponentsDep) -> Response:
     """
 
     if isinstance(request, ValidationError):
-        return check_response(ValidationResult(valid=False, error=request))
+        return check_response(
+            ValidationResult(valid=False, error=request), endpoint=validate
+        )
 
-    return check_response(out_response=ValidationResult(valid=True))
+    return check_response(out_response=ValidationResult(valid=True), endpoint=validate)
 
 
 @app.post(
@@ -197,19 +187,15 @@ def validate(request: ValidateComponentsDep) -> Response:
 )
 def async_validate(
     body: ValidationRequest,
+    validation_task_service: ValidationTaskServiceDep,
 ) -> Response:
     """
     Validate a deployment request
     """
 
-    # todo: define correct response. You can define your pydantic component type with the expected specific schema
-    #  and use `.get_type_component_by_id` to extract it from the data product
+    token = validation_task_service.submit(body.descriptor)
 
-    # componentToProvision = data_product.get_typed_component_by_id(component_id, MyTypedComponent)
-
-    resp = SystemErr(error="Response not yet implemented")
-
-    return check_response(out_response=resp)
+    return check_response(out_response=token, endpoint=async_validate)
 
 
 @app.get(
@@ -224,12 +210,42 @@ def async_validate(
 )
 def get_validation_status(
     token: str,
+    validation_task_service: ValidationTaskServiceDep,
 ) -> Response:
     """
     Get the status for a provisioning request
     """
 
-    # todo: define correct response
-    resp = SystemErr(error="Response not yet implemented")
+    resp = validation_task_service.get_status(token)
+
+    return check_response(out_response=resp, endpoint=get_validation_status)
+
+
+@app.get("/health/live", tags=["Health"])
+async def live() -> Response:
+    """
+    Liveness probe: the service is up and serving requests
+    """
+
+    return JSONResponse(content={"status": "live"})
+
+
+@app.get("/health/ready", tags=["Health"])
+async def ready(request: Request) -> Response:
+    """
+    Readiness probe: the service is warmed up and not shutting down
+    """
+
+    if not request.app.state.ready:
+        return JSONResponse(status_code=503, content={"status": "not ready"})
+    return JSONResponse(content={"status": "ready"})
+
+
+@app.get("/metrics", tags=["Metrics"])
+def metrics() -> Response:
+    """
+    Metrics of the service in the Prometheus text format
+    """
 
-    return check_response(out_response=resp)
+    content, content_type = generate_metrics()
+    return Response(content=content, media_type=content_type)
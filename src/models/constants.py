@@ -1,45 +1,47 @@
-OPENMETADATA_SUPPORTED_DATATYPES = [
-    "NUMBER",
-    "TINYINT",
-    "SMALLINT",
-    "INT",
-    "BIGINT",
-    "BYTEINT",
-    "BYTES",
-    "FLOAT",
-    "DOUBLE",
-    "DECIMAL",
-    "NUMERIC",
-    "TIMESTAMP",
-    "TIMESTAMPZ",
-    "TIME",
-    "DATE",
-    "DATETIME",
-    "INTERVAL",
-    "STRING",
-    "MEDIUMTEXT",
-    "TEXT",
-    "CHAR",
-    "LONG",
-    "VARCHAR",
-    "BOOLEAN",
-    "BINARY",
-    "VARBINARY",
-    "ARRAY",
-    "BLOB",
-    "LONGBLOB",
-    "MEDIUMBLOB",
-    "MAP",
-    "STRUCT",
-    "UNION",
-    "SET",
-    "GEOGRAPHY",
-    "ENUM",
-    "JSON",
-    "UUID",
-    "VARIANT",
-    "GEOMETRY",
-    "POINT",
-    "POLYGON",
-    "BYTEA",
-]
+OPENMETADATA_SUPPORTED_DATATYPES = frozenset(
+    {
+        "NUMBER",
+        "TINYINT",
+        "SMALLINT",
+        "INT",
+        "BIGINT",
+        "BYTEINT",
+        "BYTES",
+        "FLOAT",
+        "DOUBLE",
+        "DECIMAL",
+        "NUMERIC",
+        "TIMESTAMP",
+        "TIMESTAMPZ",
+        "TIME",
+        "DATE",
+        "DATETIME",
+        "INTERVAL",
+        "STRING",
+        "MEDIUMTEXT",
+        "TEXT",
+        "CHAR",
+        "LONG",
+        "VARCHAR",
+        "BOOLEAN",
+        "BINARY",
+        "VARBINARY",
+        "ARRAY",
+        "BLOB",
+        "LONGBLOB",
+        "MEDIUMBLOB",
+        "MAP",
+        "STRUCT",
+        "UNION",
+        "SET",
+        "GEOGRAPHY",
+        "ENUM",
+        "JSON",
+        "UUID",
+        "VARIANT",
+        "GEOMETRY",
+        "POINT",
+        "POLYGON",
+        "BYTEA",
+    }
+)
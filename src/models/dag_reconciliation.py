@@ -0,0 +1,14 @@
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+
+class DagReconciliationReport(BaseModel):
+    dryRun: bool
+    # number of DAGs of the data product found in the DAG folder
+    listed: int = 0
+    # keys of the DAGs of data contracts not guarded anymore
+    orphans: List[str] = []
+    deleted: List[str] = []
+    # key -> error detail, for the orphans that could not be deleted
+    failed: Dict[str, str] = dict()
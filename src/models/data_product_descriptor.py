@@ -2,12 +2,15 @@ from datetime import datetime
 from enum import StrEnum
 from typing import Annotated, Any, List, Literal, Optional, Type
 
+import pydantic
 from pydantic import (
     AnyUrl,
     BaseModel,
     BeforeValidator,
     ConfigDict,
     Field,
+    PrivateAttr,
+    ValidationInfo,
     field_validator,
     model_validator,
 )
@@ -65,11 +68,11 @@ class OpenMetadataColumn(BaseModel):
 
     @field_validator("dataType")
     @classmethod
-    def check_dataType(cls, value, values):
+    def check_dataType(cls, value: str, info: ValidationInfo) -> str:
         if value.upper() not in OPENMETADATA_SUPPORTED_DATATYPES:
             raise ValueError(
                 'Column "'
-                + values["name"]
+                + info.data.get("name", "")
                 + '" specifies dataType of "'
                 + value
                 + '" but this is not a valid OpenMetadata data type'
@@ -234,6 +237,56 @@ component_map: dict[str, Type[Component]] = {
 }
 
 
+# (kind, technology, use case template without version) -> specialized model
+ComponentModelKey = tuple[str, str | None, str | None]
+specialized_component_map: dict[ComponentModelKey, Type[Component]] = dict()
+
+
+def _get_use_case_template(use_case_template_id: str | None) -> str | None:
+    """
+    Drops the version from a use case template ID,
+    e.g. urn:dmb:utm:gx-guardian-template:0.0.0 -> urn:dmb:utm:gx-guardian-template
+    """
+    if use_case_template_id is None:
+        return None
+    return use_case_template_id.rsplit(":", 1)[0]
+
+
+def register_component_model(
+    model: Type[Component],
+    kind: ComponentKind,
+    technology: str | None = None,
+    use_case_template: str | None = None,
+) -> None:
+    """
+    Registers a specialized model to use when parsing the components of the given kind
+    whose technology and use case template ID (without version) match the given ones.
+    A None technology or use case template matches any value.
+
+    Specialized models are tried first by `parse_component`, so that components are
+    validated once with their most specific model. A component not valid for its
+    specialized model is parsed with the generic model of its kind.
+
+    Example:
+        >>> register_component_model(SnowflakeOutputPort, ComponentKind.OUTPUTPORT, technology="Snowflake")
+    """  # noqa: E501
+    specialized_component_map[(kind, technology, use_case_template)] = model
+
+
+def _get_specialized_component_model(kind: str, data: dict) -> Type[Component] | None:
+    technology = data.get("technology")
+    use_case_template = _get_use_case_template(data.get("useCaseTemplateId"))
+    for key in (
+        (kind, technology, use_case_template),
+        (kind, technology, None),
+        (kind, None, use_case_template),
+    ):
+        model = specialized_component_map.get(key)
+        if model is not None:
+            return model
+    return None
+
+
 def parse_component(data: dict | Component) -> Component:
     if isinstance(data, Component):  # happens if DP is created in code
         if data.kind not in component_map:
@@ -243,11 +296,47 @@ def parse_component(data: dict | Component) -> Component:
         kind = data.get("kind")
         if kind not in component_map:
             raise ValueError(f"Unknown component kind: {kind}")
+        specialized_model = _get_specialized_component_model(kind, data)
+        if specialized_model is not None:
+            try:
+                component = specialized_model(**data)
+                logger.debug("Parsed component: " + str(component))
+                return component
+            except pydantic.ValidationError as ve:
+                logger.debug(
+                    "Component %s is not a valid %s, parsing it as a %s: %s",
+                    data.get("id"),
+                    specialized_model.__name__,
+                    component_map[kind].__name__,
+                    ve,
+                )
         component = component_map[kind](**data)
         logger.debug("Parsed component: " + str(component))
         return component
 
 
+class _ComponentIndex:
+    """
+    Indexes of the components of a data product, by ID, by kind and by
+    `__dataContractEnabled`. Components keep the order they have in the data product.
+    """
+
+    def __init__(self, components: List[Component]):
+        # the indexed list and its length, to detect when the indexes are stale: the
+        # list is referenced so that its identity cannot be reused by another list
+        self.components = components
+        self.length = len(components)
+        self.by_id: dict[str, Component] = dict()
+        self.by_kind: dict[str, List[Component]] = dict()
+        self.data_contracts: List[Component] = []
+        for component in components:
+            # the first component with a given ID wins, as in a linear scan
+            self.by_id.setdefault(component.id, component)
+            self.by_kind.setdefault(component.kind, []).append(component)
+            if component.dataContractEnabled:
+                self.data_contracts.append(component)
+
+
 class DataProduct(BaseModel):
     id: str
     name: str
@@ -270,6 +359,32 @@ class DataProduct(BaseModel):
     specific: dict
     components: List[Annotated[Component, BeforeValidator(parse_component)]]
 
+    _component_index: _ComponentIndex | None = PrivateAttr(default=None)
+
+    def _get_component_index(self) -> _ComponentIndex:
+        """
+        Returns the indexes of the components, building them the first time they are
+        needed. They are rebuilt whenever `components` is reassigned or components are
+        added or removed; after replacing or editing components in place, call
+        `invalidate_component_index`.
+        """
+        component_index = self._component_index
+        if (
+            component_index is None
+            or component_index.components is not self.components
+            or component_index.length != len(self.components)
+        ):
+            component_index = _ComponentIndex(self.components)
+            self._component_index = component_index
+        return component_index
+
+    def invalidate_component_index(self) -> None:
+        """
+        Discards the indexes of the components, so that they are rebuilt by the next
+        lookup.
+        """
+        self._component_index = None
+
     def get_components_by_kind(self, kind: str) -> List[Component]:
         """
         Filters the components associated with the data product and returns
@@ -287,11 +402,7 @@ class DataProduct(BaseModel):
             >>> outputport_components = my_data_product.get_components_by_kind('outputport')
         """  # noqa: E501
 
-        new_components_list = [
-            component for component in self.components if component.kind == kind
-        ]
-
-        return new_components_list
+        return list(self._get_component_index().by_kind.get(kind, []))
 
     def get_component_by_id(self, component_id: str) -> Component | None:
         """
@@ -315,19 +426,18 @@ class DataProduct(BaseModel):
            ... else:
            ...     print("Component not found.")
         """  # noqa: E501
-        for component in self.components:
-            if component.id == component_id:
-                return component
-        return None
+        return self._get_component_index().by_id.get(component_id)
 
     def get_typed_component_by_id(
         self, component_id: str, component_type: Type[BaseModel]
     ):
         component = self.get_component_by_id(component_id)
-        if component is not None:
-            return component_type.parse_obj(component.dict(by_alias=True))
-        else:
+        if component is None:
             return None
+        if isinstance(component, component_type):
+            # already parsed with the requested model by `parse_component`
+            return component
+        return component_type.model_validate(component.model_dump(by_alias=True))
 
     def get_output_ports(self) -> List[OutputPort]:
         """
@@ -347,7 +457,7 @@ class DataProduct(BaseModel):
 
         output_ports: List[OutputPort] = []
         for op in self.get_components_by_kind("outputport"):
-            if type(op) is OutputPort:
+            if isinstance(op, OutputPort):
                 output_ports.append(op)
         return output_ports
 
@@ -368,7 +478,7 @@ class DataProduct(BaseModel):
         """  # noqa: E501
         workloads: List[Workload] = []
         for wl in self.get_components_by_kind("workload"):
-            if type(wl) is Workload:
+            if isinstance(wl, Workload):
                 workloads.append(wl)
         return workloads
 
@@ -389,7 +499,7 @@ class DataProduct(BaseModel):
         """  # noqa: E501
         storage_areas: List[StorageArea] = []
         for st in self.get_components_by_kind("storage"):
-            if type(st) is StorageArea:
+            if isinstance(st, StorageArea):
                 storage_areas.append(st)
         return storage_areas
 
@@ -410,7 +520,7 @@ class DataProduct(BaseModel):
         """  # noqa: E501
         observability_APIs: List[Observability] = []
         for obs in self.get_components_by_kind("observability"):
-            if type(obs) is Observability:
+            if isinstance(obs, Observability):
                 observability_APIs.append(obs)
         return observability_APIs
 
@@ -424,6 +534,4 @@ class DataProduct(BaseModel):
             If no matching components are found, an empty list is returned.
         """  # noqa: E501
 
-        return [
-            component for component in self.components if component.dataContractEnabled
-        ]
+        return list(self._get_component_index().data_contracts)
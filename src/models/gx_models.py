@@ -2,7 +2,13 @@ from typing import Any, Literal, Protocol
 
 from pydantic import BaseModel, Field
 
-from src.models.data_product_descriptor import DataContract, OutputPort, Workload
+from src.models.data_product_descriptor import (
+    ComponentKind,
+    DataContract,
+    OutputPort,
+    Workload,
+    register_component_model,
+)
 
 
 class GXWorkloadSpecific(BaseModel):
@@ -84,6 +90,17 @@ class SnowflakeOutputPort(OutputPort):
         return self.specific.tableName
 
 
+# components are parsed straight into these models when the descriptor is parsed
+register_component_model(
+    GXGuardianWorkload,
+    ComponentKind.WORKLOAD,
+    use_case_template="urn:dmb:utm:gx-guardian-template",
+)
+register_component_model(
+    SnowflakeOutputPort, ComponentKind.OUTPUTPORT, technology="Snowflake"
+)
+
+
 class GXComponent(Protocol):
     def get_id(self) -> str:
         pass
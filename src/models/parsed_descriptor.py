@@ -0,0 +1,28 @@
+import json
+from functools import cached_property
+
+from fastapi.encoders import jsonable_encoder
+
+from src.models.data_product_descriptor import DataProduct
+
+
+class ParsedDescriptor:
+    """
+    A provisioning descriptor parsed once per request.
+
+    It carries the raw dictionary loaded from the YAML descriptor, the validated
+    `DataProduct` and the ID of the component to provision, so that services never
+    need to parse the descriptor string again. The JSON serialization of the
+    descriptor is computed lazily, the first time it is needed.
+    """
+
+    def __init__(
+        self, descriptor_dict: dict, data_product: DataProduct, component_id: str
+    ):
+        self.descriptor_dict = descriptor_dict
+        self.data_product = data_product
+        self.component_id = component_id
+
+    @cached_property
+    def json(self) -> str:
+        return json.dumps(jsonable_encoder(self.descriptor_dict))
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from enum import StrEnum
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+from src.models.api_models import Status1
+
+
+class DagProgress(StrEnum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    WRITTEN = "WRITTEN"
+    SKIPPED = "SKIPPED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+
+class ProvisioningTask(BaseModel):
+    token: str
+    status: Status1
+    result: str = ""
+    # privateInfo returned by the provisioning, once it is over
+    privateInfo: Optional[Dict[str, Any]] = None
+    # data contract ID -> progress of its DAG
+    dataContracts: Dict[str, DagProgress] = dict()
@@ -0,0 +1,88 @@
+from functools import partial
+from typing import Callable, TypeVar
+
+import anyio
+import anyio.to_thread
+
+from src.repositories.dag_repository import (
+    AsyncDagRepository,
+    DagRepositoryError,
+    DagWriteOutcome,
+)
+from src.repositories.s3_dag_repository import S3DagRepository
+
+T = TypeVar("T")
+
+
+class AsyncS3DagRepository(AsyncDagRepository):
+    """
+    Asynchronous S3 DAG repository sharing the connection pool of the given
+    `S3DagRepository`.
+
+    The S3 calls are run on worker threads bounded by a capacity limiter of their own,
+    sized by `async_max_concurrency`, instead of the limiter of the request threadpool:
+    the event loop never blocks, and the number of S3 calls in flight is not bounded by
+    the threads available to serve requests.
+    """
+
+    def __init__(self, s3_dag_repository: S3DagRepository):
+        self.s3_dag_repository = s3_dag_repository
+        self.limiter = anyio.CapacityLimiter(
+            s3_dag_repository.s3_dag_settings.async_max_concurrency
+        )
+
+    async def _run(self, func: Callable[[], T]) -> T:
+        return await anyio.to_thread.run_sync(func, limiter=self.limiter)
+
+    async def create_or_update_dag(
+        self, data_contract_id: str, content: str, environment: str
+    ) -> DagWriteOutcome | DagRepositoryError:
+        return await self._run(
+            partial(
+                self.s3_dag_repository.create_or_update_dag,
+                data_contract_id,
+                content,
+                environment,
+            )
+        )
+
+    async def create_or_update_dags(
+        self, dags: dict[str, str], environment: str
+    ) -> dict[str, DagWriteOutcome | DagRepositoryError]:
+        """
+        Uploads the DAGs concurrently, as many at a time as the capacity limiter allows.
+
+        Args:
+            dags (dict[str, str]): the content of the DAGs, by data contract ID
+
+        Returns:
+            dict[str, DagWriteOutcome | DagRepositoryError]: the outcome of the upload
+            of each DAG, by data contract ID.
+        """
+        outcomes: dict[str, DagWriteOutcome | DagRepositoryError] = dict()
+
+        async def upload(data_contract_id: str, content: str) -> None:
+            outcomes[data_contract_id] = await self.create_or_update_dag(
+                data_contract_id, content, environment
+            )
+
+        async with anyio.create_task_group() as task_group:
+            for data_contract_id, content in dags.items():
+                task_group.start_soon(upload, data_contract_id, content)
+        return {
+            data_contract_id: outcomes[data_contract_id] for data_contract_id in dags
+        }
+
+    async def delete_dags(
+        self, data_contract_ids: list[str], environment: str
+    ) -> None | DagRepositoryError:
+        return await self._run(
+            partial(self.s3_dag_repository.delete_dags, data_contract_ids, environment)
+        )
+
+    async def delete_manifest(
+        self, guardian_id: str, environment: str
+    ) -> None | DagRepositoryError:
+        return await self._run(
+            partial(self.s3_dag_repository.delete_manifest, guardian_id, environment)
+        )
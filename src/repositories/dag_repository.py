@@ -1,18 +1,88 @@
+from enum import StrEnum
 from typing import Protocol
 
 
 class DagRepositoryError:
-    def __init__(self, error_msg: str):
+    def __init__(self, error_msg: str, failed_dags: dict[str, str] | None = None):
         self.error_msg = error_msg
+        # data contract ID -> error detail, for the operations that act on many DAGs
+        self.failed_dags = failed_dags if failed_dags is not None else dict()
+
+
+# data contract ID -> fingerprint of the inputs its DAG has been rendered from
+DagManifest = dict[str, str]
+
+
+class DagWriteOutcome(StrEnum):
+    WRITTEN = "WRITTEN"
+    SKIPPED = "SKIPPED"
 
 
 class DagRepository(Protocol):
     def create_or_update_dag(
         self, data_contract_id: str, content: str, environment: str
-    ) -> None | DagRepositoryError:
+    ) -> DagWriteOutcome | DagRepositoryError:
         pass
 
     def delete_dags(
         self, data_contract_ids: list[str], environment: str
     ) -> None | DagRepositoryError:
         pass
+
+    def find_existing_dags(
+        self, data_contract_ids: list[str], environment: str
+    ) -> set[str] | DagRepositoryError:
+        pass
+
+    def find_orphan_dags(
+        self,
+        data_contract_id_prefix: str,
+        data_contract_ids: list[str],
+        environment: str,
+    ) -> tuple[int, list[str]] | DagRepositoryError:
+        pass
+
+    def delete_dag_keys(self, keys: list[str]) -> None | DagRepositoryError:
+        pass
+
+    def get_manifest(
+        self, guardian_id: str, environment: str
+    ) -> DagManifest | DagRepositoryError:
+        pass
+
+    def put_manifest(
+        self, guardian_id: str, environment: str, manifest: DagManifest
+    ) -> None | DagRepositoryError:
+        pass
+
+    def delete_manifest(
+        self, guardian_id: str, environment: str
+    ) -> None | DagRepositoryError:
+        pass
+
+
+class AsyncDagRepository(Protocol):
+    """
+    Non-blocking counterpart of `DagRepository`, meant to be awaited from the event
+    loop without holding a thread of the request threadpool while waiting for I/O.
+    """
+
+    async def create_or_update_dag(
+        self, data_contract_id: str, content: str, environment: str
+    ) -> DagWriteOutcome | DagRepositoryError:
+        pass
+
+    async def create_or_update_dags(
+        self, dags: dict[str, str], environment: str
+    ) -> dict[str, DagWriteOutcome | DagRepositoryError]:
+        pass
+
+    async def delete_dags(
+        self, data_contract_ids: list[str], environment: str
+    ) -> None | DagRepositoryError:
+        pass
+
+    async def delete_manifest(
+        self, guardian_id: str, environment: str
+    ) -> None | DagRepositoryError:
+        pass
@@ -0,0 +1,64 @@
+import time
+from threading import Lock
+from typing import Any, Callable
+
+from src.models.api_models import Status1
+from src.models.provisioning_task import DagProgress, ProvisioningTask
+from src.repositories.task_repository import TaskRepository
+from src.utility.lru_ttl_cache import LruTtlCache
+
+
+class InMemoryTaskRepository(TaskRepository):
+    """
+    Keeps the provisioning tasks in the memory of the process: they are lost when the
+    service restarts and are not shared between replicas.
+
+    At most `max_entries` tasks are kept, for `ttl_seconds` since they started: when
+    the repository is full, the least recently updated task is evicted.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 86400,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._tasks: LruTtlCache[str, ProvisioningTask] = LruTtlCache(
+            max_entries, ttl_seconds, clock
+        )
+        self._lock = Lock()
+
+    def create_task(self, task: ProvisioningTask) -> None:
+        with self._lock:
+            self._tasks.put(task.token, task.model_copy(deep=True))
+
+    def get_task(self, token: str) -> ProvisioningTask | None:
+        with self._lock:
+            task = self._tasks.get(token)
+            return task.model_copy(deep=True) if task is not None else None
+
+    def set_dag_progress(
+        self, token: str, data_contract_id: str, progress: DagProgress
+    ) -> None:
+        with self._lock:
+            task = self._tasks.get(token)
+            if task is not None:
+                task.dataContracts[data_contract_id] = progress
+
+    def complete_task(
+        self,
+        token: str,
+        status: Status1,
+        result: str,
+        private_info: dict[str, Any] | None = None,
+    ) -> None:
+        with self._lock:
+            task = self._tasks.get(token)
+            if task is not None:
+                task.status = status
+                task.result = result
+                task.privateInfo = private_info
+
+    def fail_orphaned_tasks(self, result: str) -> int:
+        # the tasks are owned by this process, which is running
+        return 0
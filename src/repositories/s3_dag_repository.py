@@ -1,50 +1,454 @@
+import contextvars
+import hashlib
+import json
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 
 import boto3
+from botocore.client import BaseClient
+from botocore.config import Config
+from botocore.exceptions import ClientError
 
-from src.repositories.dag_repository import DagRepositoryError
+from src.repositories.dag_repository import (
+    DagManifest,
+    DagRepositoryError,
+    DagWriteOutcome,
+)
 from src.settings.s3_dag_settings import S3DagSettings
 from src.utility.logger import get_logger
+from src.utility.metrics import (
+    S3_DELETE_OBJECT_SECONDS,
+    S3_DELETE_OBJECTS_SECONDS,
+    S3_PUT_OBJECT_SECONDS,
+)
+from src.utility.tracing import (
+    COMPONENT_ID,
+    DAG_COUNT,
+    DATA_CONTRACT_ID,
+    ENVIRONMENT,
+    PAYLOAD_SIZE,
+    S3_BUCKET,
+    S3_KEY,
+    UPLOAD_SKIPPED,
+    set_error,
+    start_span,
+)
+
+# Maximum number of keys accepted by a single S3 DeleteObjects request
+DELETE_OBJECTS_MAX_KEYS = 1000
+# User metadata holding the SHA-256 of the DAG content, used to skip unchanged uploads
+CONTENT_DIGEST_METADATA_KEY = "content-sha256"
+# User metadata holding the unsanitized ID the DAG is published with, since different
+# IDs can be sanitized to the same key
+DATA_CONTRACT_ID_METADATA_KEY = "data-contract-id"
+# Number of bytes read from the top of the DAGs published without the data contract ID
+# metadata, enough to cover the module-level assignment of the ID in the templates
+DAG_HEADER_MAX_BYTES = 4096
+# Module-level assignment of the ID in the DAGs rendered from the templates
+DAG_ID_ASSIGNMENT_PATTERN = re.compile(
+    r'^(?:data_contract_id|guardian_id) = "([^"]*)"$', re.MULTILINE
+)
+
+
+def create_s3_client(s3_dag_settings: S3DagSettings) -> BaseClient:
+    """
+    Creates an S3 client configured with the connection pool, keep-alive and retry
+    policy defined in the settings.
+
+    boto3 clients are thread-safe, so the returned client is meant to be created once
+    and shared by all the requests served by the process.
+    """
+    config = Config(
+        max_pool_connections=s3_dag_settings.max_pool_connections,
+        tcp_keepalive=s3_dag_settings.tcp_keepalive,
+        retries={
+            "mode": s3_dag_settings.retry_mode,
+            "max_attempts": s3_dag_settings.max_attempts,
+        },
+    )
+    return boto3.client("s3", config=config)
 
 
 class S3DagRepository:
-    def __init__(self, s3_dag_settings: S3DagSettings):
+    def __init__(
+        self, s3_dag_settings: S3DagSettings, s3_client: BaseClient | None = None
+    ):
         self.s3_dag_settings = s3_dag_settings
+        self.s3_client = (
+            s3_client if s3_client is not None else create_s3_client(s3_dag_settings)
+        )
         self.logger = get_logger(__name__)
 
     def create_or_update_dag(
         self, data_contract_id: str, content: str, environment: str
+    ) -> DagWriteOutcome | DagRepositoryError:
+        key = self._get_dag_key(data_contract_id, environment)
+        payload = content.encode("utf-8")
+        with start_span(
+            "s3.create_or_update_dag",
+            {
+                DATA_CONTRACT_ID: data_contract_id,
+                ENVIRONMENT: environment,
+                PAYLOAD_SIZE: len(payload),
+                S3_BUCKET: self.s3_dag_settings.bucket_name,
+                S3_KEY: key,
+            },
+        ) as span:
+            try:
+                content_digest = hashlib.sha256(payload).hexdigest()
+                metadata = {
+                    CONTENT_DIGEST_METADATA_KEY: content_digest,
+                    DATA_CONTRACT_ID_METADATA_KEY: data_contract_id,
+                }
+                if (
+                    self.s3_dag_settings.skip_unchanged
+                    and self._get_stored_metadata(key) == metadata
+                ):
+                    self.logger.info(
+                        "DAG related to %s is unchanged, skipping upload",
+                        data_contract_id,
+                    )
+                    span.set_attribute(UPLOAD_SKIPPED, True)
+                    return DagWriteOutcome.SKIPPED
+                span.set_attribute(UPLOAD_SKIPPED, False)
+                with S3_PUT_OBJECT_SECONDS.time(), start_span("s3.put_object"):
+                    self.s3_client.put_object(
+                        Body=content,
+                        Bucket=self.s3_dag_settings.bucket_name,
+                        Key=key,
+                        Metadata=metadata,
+                    )
+                return DagWriteOutcome.WRITTEN
+            except Exception as e:
+                set_error(span, e)
+                error_msg = f"An error occurred while publishing the DAG related to {data_contract_id}. Please try again later. Details: {str(e)}"  # noqa: E501
+                self.logger.exception(error_msg)
+                return DagRepositoryError(error_msg=error_msg)
+
+    def _get_stored_metadata(self, key: str) -> dict[str, str] | None:
+        """
+        Returns the user metadata of the given key, or None if the key does not exist.
+        """
+        with start_span("s3.head_object"):
+            try:
+                response = self.s3_client.head_object(
+                    Bucket=self.s3_dag_settings.bucket_name, Key=key
+                )
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                    return None
+                raise
+        return response.get("Metadata", {})
+
+    def _get_stored_data_contract_id(self, key: str) -> str | None:
+        """
+        Returns the unsanitized ID the DAG of the given key has been published with,
+        read from its metadata or, for the DAGs published before that metadata was
+        introduced, from the ID assigned at the top of the rendered DAG. Returns None
+        if the key does not exist or the ID cannot be found.
+        """
+        metadata = self._get_stored_metadata(key)
+        if metadata is None:
+            return None
+        if DATA_CONTRACT_ID_METADATA_KEY in metadata:
+            return metadata[DATA_CONTRACT_ID_METADATA_KEY]
+        with start_span("s3.get_object", {S3_KEY: key}):
+            try:
+                response = self.s3_client.get_object(
+                    Bucket=self.s3_dag_settings.bucket_name,
+                    Key=key,
+                    Range=f"bytes=0-{DAG_HEADER_MAX_BYTES - 1}",
+                )
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                    return None
+                raise
+            header = response["Body"].read().decode("utf-8", errors="replace")
+        match = DAG_ID_ASSIGNMENT_PATTERN.search(header)
+        return match.group(1) if match is not None else None
+
+    def delete_dags(
+        self, data_contract_ids: list[str], environment: str
+    ) -> None | DagRepositoryError:
+        keys_to_ids = {
+            self._get_dag_key(data_contract_id, environment): data_contract_id
+            for data_contract_id in data_contract_ids
+        }
+        failed_dags = {
+            keys_to_ids[key]: error
+            for key, error in self._delete_keys(list(keys_to_ids.keys())).items()
+        }
+        if failed_dags:
+            error_msg = f"An error occurred while deleting the DAGs related to {', '.join(failed_dags.keys())}. Please try again later. Details: {'; '.join(failed_dags.values())}"  # noqa: E501
+            self.logger.error(error_msg)
+            return DagRepositoryError(error_msg=error_msg, failed_dags=failed_dags)
+        return None
+
+    def find_existing_dags(
+        self, data_contract_ids: list[str], environment: str
+    ) -> set[str] | DagRepositoryError:
+        """
+        Returns the IDs, among `data_contract_ids`, of the data contracts whose DAG
+        exists in the given environment, paginating through ListObjectsV2 with the
+        longest prefix shared by their keys.
+        """
+        keys_to_ids = {
+            self._get_dag_key(data_contract_id, environment): data_contract_id
+            for data_contract_id in data_contract_ids
+        }
+        if not keys_to_ids:
+            return set()
+        key_prefix = os.path.commonprefix(list(keys_to_ids.keys()))
+        existing_ids: set[str] = set()
+        with start_span(
+            "s3.list_objects_v2",
+            {
+                ENVIRONMENT: environment,
+                S3_BUCKET: self.s3_dag_settings.bucket_name,
+                S3_KEY: key_prefix,
+            },
+        ) as span:
+            try:
+                paginator = self.s3_client.get_paginator("list_objects_v2")
+                for page in paginator.paginate(
+                    Bucket=self.s3_dag_settings.bucket_name, Prefix=key_prefix
+                ):
+                    for s3_object in page.get("Contents", []):
+                        data_contract_id = keys_to_ids.get(s3_object["Key"])
+                        if data_contract_id is not None:
+                            existing_ids.add(data_contract_id)
+            except Exception as e:
+                set_error(span, e)
+                error_msg = f"An error occurred while listing the DAGs with prefix {key_prefix}. Details: {str(e)}"  # noqa: E501
+                self.logger.exception(error_msg)
+                return DagRepositoryError(error_msg=error_msg)
+            span.set_attribute(DAG_COUNT, len(existing_ids))
+        return existing_ids
+
+    def find_orphan_dags(
+        self,
+        data_contract_id_prefix: str,
+        data_contract_ids: list[str],
+        environment: str,
+    ) -> tuple[int, list[str]] | DagRepositoryError:
+        """
+        Lists the DAGs of the given environment whose data contract ID starts with
+        `data_contract_id_prefix`, paginating through ListObjectsV2 with the
+        corresponding key prefix, and returns the keys of the ones not related to any
+        of `data_contract_ids`.
+
+        Since different IDs can be sanitized to the same key prefix, the keys not
+        related to `data_contract_ids` are only reported once the unsanitized ID they
+        have been published with confirms they belong to `data_contract_id_prefix`.
+        That ID is read from their metadata or, for the DAGs published without it, from
+        the top of the DAG, with up to `max_pool_connections` keys checked at a time.
+
+        Returns:
+            tuple[int, list[str]] | DagRepositoryError: the number of DAGs listed for
+            the prefix and the keys of the orphan DAGs, or an error if the folder cannot
+            be listed.
+        """
+        expected_keys = {
+            self._get_dag_key(data_contract_id, environment)
+            for data_contract_id in data_contract_ids
+        }
+        key_prefix = self._get_dag_key(
+            data_contract_id_prefix, environment
+        ).removesuffix(f"_{environment}.py")
+        key_suffix = f"_{environment}.py"
+        listed = 0
+        unexpected_keys: list[str] = []
+        with start_span(
+            "s3.list_objects_v2",
+            {
+                ENVIRONMENT: environment,
+                S3_BUCKET: self.s3_dag_settings.bucket_name,
+                S3_KEY: key_prefix,
+            },
+        ) as span:
+            try:
+                paginator = self.s3_client.get_paginator("list_objects_v2")
+                for page in paginator.paginate(
+                    Bucket=self.s3_dag_settings.bucket_name, Prefix=key_prefix
+                ):
+                    for s3_object in page.get("Contents", []):
+                        key = s3_object["Key"]
+                        if not key.endswith(key_suffix):
+                            continue
+                        if key in expected_keys:
+                            listed += 1
+                        else:
+                            unexpected_keys.append(key)
+                orphan_keys = [
+                    key
+                    for key, stored_id in zip(
+                        unexpected_keys,
+                        self._get_stored_data_contract_ids(unexpected_keys),
+                    )
+                    if stored_id is not None
+                    and stored_id.startswith(data_contract_id_prefix)
+                ]
+                listed += len(orphan_keys)
+            except Exception as e:
+                set_error(span, e)
+                error_msg = f"An error occurred while listing the DAGs with prefix {key_prefix}. Details: {str(e)}"  # noqa: E501
+                self.logger.exception(error_msg)
+                return DagRepositoryError(error_msg=error_msg)
+            span.set_attribute(DAG_COUNT, listed)
+        return listed, orphan_keys
+
+    def _get_stored_data_contract_ids(self, keys: list[str]) -> list[str | None]:
+        """
+        Returns the unsanitized ID of the DAG of each of the given keys, in the same
+        order, checking up to `max_pool_connections` keys at a time.
+        """
+        if not keys:
+            return []
+        max_workers = min(self.s3_dag_settings.max_pool_connections, len(keys))
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="s3-head"
+        ) as executor:
+            # each key is checked in a copy of the context of the listing, so that its
+            # spans are children of the span of the listing
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run,
+                    self._get_stored_data_contract_id,
+                    key,
+                )
+                for key in keys
+            ]
+            return [future.result() for future in futures]
+
+    def delete_dag_keys(self, keys: list[str]) -> None | DagRepositoryError:
+        failed_keys = self._delete_keys(keys)
+        if failed_keys:
+            error_msg = f"An error occurred while deleting {len(failed_keys)} DAGs. Details: {'; '.join(set(failed_keys.values()))}"  # noqa: E501
+            self.logger.error(error_msg)
+            return DagRepositoryError(error_msg=error_msg, failed_dags=failed_keys)
+        return None
+
+    def _delete_keys(self, keys: list[str]) -> dict[str, str]:
+        """
+        Deletes the given keys with batched DeleteObjects requests.
+
+        Returns:
+            dict[str, str]: the error detail of each key that could not be deleted.
+        """
+        failed_keys: dict[str, str] = dict()
+        for i in range(0, len(keys), DELETE_OBJECTS_MAX_KEYS):
+            chunk = keys[i : i + DELETE_OBJECTS_MAX_KEYS]
+            with start_span(
+                "s3.delete_objects",
+                {S3_BUCKET: self.s3_dag_settings.bucket_name, DAG_COUNT: len(chunk)},
+            ) as span:
+                try:
+                    with S3_DELETE_OBJECTS_SECONDS.time():
+                        response = self.s3_client.delete_objects(
+                            Bucket=self.s3_dag_settings.bucket_name,
+                            Delete={
+                                "Objects": [{"Key": key} for key in chunk],
+                                "Quiet": True,
+                            },
+                        )
+                    for error in response.get("Errors", []):
+                        failed_keys[error["Key"]] = (
+                            f"{error.get('Code')}: {error.get('Message')}"
+                        )
+                except Exception as e:
+                    set_error(span, e)
+                    self.logger.exception(
+                        "An error occurred while deleting a batch of DAGs"
+                    )
+                    for key in chunk:
+                        failed_keys[key] = str(e)
+        return failed_keys
+
+    def get_manifest(
+        self, guardian_id: str, environment: str
+    ) -> DagManifest | DagRepositoryError:
+        with start_span(
+            "s3.get_object", self._get_manifest_attributes(guardian_id, environment)
+        ) as span:
+            try:
+                response = self.s3_client.get_object(
+                    Bucket=self.s3_dag_settings.bucket_name,
+                    Key=self._get_manifest_key(guardian_id, environment),
+                )
+                return json.loads(response["Body"].read())["dataContracts"]
+            except Exception as e:
+                if isinstance(e, ClientError) and e.response.get("Error", {}).get(
+                    "Code"
+                ) in ("404", "NoSuchKey"):
+                    # nothing has been provisioned yet
+                    return dict()
+                set_error(span, e)
+                error_msg = f"An error occurred while reading the DAG manifest of {guardian_id}. Details: {str(e)}"  # noqa: E501
+                self.logger.exception(error_msg)
+                return DagRepositoryError(error_msg=error_msg)
+
+    def put_manifest(
+        self, guardian_id: str, environment: str, manifest: DagManifest
     ) -> None | DagRepositoryError:
         try:
-            data_contract_id_sanitized = self._sanitize_string(data_contract_id)
-            s3_client = boto3.client("s3")
-            key = f"{self._ensure_trailing_slash(self.s3_dag_settings.folder)}dag_{data_contract_id_sanitized}_{environment}.py"  # noqa: E501
-            s3_client.put_object(
-                Body=content, Bucket=self.s3_dag_settings.bucket_name, Key=key
-            )
+            body = json.dumps({"dataContracts": manifest}, sort_keys=True)
+            with S3_PUT_OBJECT_SECONDS.time(), start_span(
+                "s3.put_object",
+                {
+                    **self._get_manifest_attributes(guardian_id, environment),
+                    PAYLOAD_SIZE: len(body),
+                },
+            ):
+                self.s3_client.put_object(
+                    Body=body,
+                    Bucket=self.s3_dag_settings.bucket_name,
+                    Key=self._get_manifest_key(guardian_id, environment),
+                    ContentType="application/json",
+                )
             return None
         except Exception as e:
-            error_msg = f"An error occurred while publishing the DAG related to {data_contract_id}. Please try again later. Details: {str(e)}"  # noqa: E501
+            error_msg = f"An error occurred while writing the DAG manifest of {guardian_id}. Details: {str(e)}"  # noqa: E501
             self.logger.exception(error_msg)
             return DagRepositoryError(error_msg=error_msg)
 
-    def delete_dags(
-        self, data_contract_ids: list[str], environment: str
+    def delete_manifest(
+        self, guardian_id: str, environment: str
     ) -> None | DagRepositoryError:
         try:
-            s3_client = boto3.client("s3")
-            for data_contract_id in data_contract_ids:
-                data_contract_id_sanitized = self._sanitize_string(data_contract_id)
-                key = f"{self._ensure_trailing_slash(self.s3_dag_settings.folder)}dag_{data_contract_id_sanitized}_{environment}.py"  # noqa: E501
-                s3_client.delete_object(
-                    Bucket=self.s3_dag_settings.bucket_name, Key=key
+            with S3_DELETE_OBJECT_SECONDS.time(), start_span(
+                "s3.delete_object",
+                self._get_manifest_attributes(guardian_id, environment),
+            ):
+                self.s3_client.delete_object(
+                    Bucket=self.s3_dag_settings.bucket_name,
+                    Key=self._get_manifest_key(guardian_id, environment),
                 )
             return None
         except Exception as e:
-            error_msg = f"An error occurred while deleting the DAGs. Please try again later. Details: {str(e)}"
+            error_msg = f"An error occurred while deleting the DAG manifest of {guardian_id}. Details: {str(e)}"  # noqa: E501
             self.logger.exception(error_msg)
             return DagRepositoryError(error_msg=error_msg)
 
+    def _get_manifest_attributes(
+        self, guardian_id: str, environment: str
+    ) -> dict[str, str]:
+        return {
+            COMPONENT_ID: guardian_id,
+            ENVIRONMENT: environment,
+            S3_BUCKET: self.s3_dag_settings.bucket_name,
+            S3_KEY: self._get_manifest_key(guardian_id, environment),
+        }
+
+    def _get_manifest_key(self, guardian_id: str, environment: str) -> str:
+        guardian_id_sanitized = self._sanitize_string(guardian_id)
+        # Airflow only parses .py files, so the manifests can live in the DAG folder
+        return f"{self._ensure_trailing_slash(self.s3_dag_settings.folder)}manifests/{guardian_id_sanitized}_{environment}.json"  # noqa: E501
+
+    def _get_dag_key(self, data_contract_id: str, environment: str) -> str:
+        data_contract_id_sanitized = self._sanitize_string(data_contract_id)
+        return f"{self._ensure_trailing_slash(self.s3_dag_settings.folder)}dag_{data_contract_id_sanitized}_{environment}.py"  # noqa: E501
+
     def _ensure_trailing_slash(self, input: str) -> str:
         return input if input.endswith("/") else input + "/"
 
@@ -0,0 +1,216 @@
+import json
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from typing import Any, Callable
+
+from src.models.api_models import Status1
+from src.models.provisioning_task import DagProgress, ProvisioningTask
+from src.repositories.task_repository import TaskRepository
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS provisioning_tasks (
+    token TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    result TEXT NOT NULL,
+    private_info TEXT,
+    completed_at REAL,
+    owner TEXT
+);
+CREATE TABLE IF NOT EXISTS provisioning_task_dags (
+    token TEXT NOT NULL REFERENCES provisioning_tasks(token),
+    data_contract_id TEXT NOT NULL,
+    progress TEXT NOT NULL,
+    PRIMARY KEY (token, data_contract_id)
+);
+CREATE TABLE IF NOT EXISTS provisioning_task_owners (
+    owner TEXT PRIMARY KEY,
+    hostname TEXT NOT NULL,
+    pid INTEGER NOT NULL
+);
+"""
+
+# columns added to provisioning_tasks after its first version
+_TASK_COLUMNS = {"completed_at": "REAL", "owner": "TEXT"}
+
+
+class SqliteTaskRepository(TaskRepository):
+    """
+    Keeps the provisioning tasks in a local SQLite database, so that the status of
+    the tasks survives a restart of the service.
+
+    A new connection is opened for every operation, so the repository can be used by
+    the request handlers and by the provisioning threads at the same time.
+
+    Completed tasks are kept for `ttl_seconds`, then they are purged when a new task
+    is created.
+
+    Every repository registers itself as an owner, with the host name and the PID of
+    its process, and the tasks it creates are owned by it. Many worker processes of
+    the same host can share the database: the tasks of a worker are failed as
+    orphaned only once its process is gone. The database is meant to be used by a
+    single host, so the owners registered by another host are considered gone, e.g.
+    the pod that ran the service before a restart.
+    """
+
+    def __init__(
+        self,
+        database_path: str,
+        ttl_seconds: float = 86400,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.database_path = database_path
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self.owner = str(uuid.uuid4())
+        hostname, pid = socket.gethostname(), os.getpid()
+        with closing(self._connect()) as connection, connection:
+            connection.executescript(_SCHEMA)
+            _add_missing_columns(connection, "provisioning_tasks", _TASK_COLUMNS)
+            # an owner registered with the same PID belongs to a process that is gone
+            connection.execute(
+                "DELETE FROM provisioning_task_owners WHERE hostname = ? AND pid = ?",
+                (hostname, pid),
+            )
+            connection.execute(
+                "INSERT INTO provisioning_task_owners (owner, hostname, pid) VALUES (?, ?, ?)",  # noqa: E501
+                (self.owner, hostname, pid),
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.database_path, timeout=30)
+
+    def create_task(self, task: ProvisioningTask) -> None:
+        with closing(self._connect()) as connection, connection:
+            self._purge_expired_tasks(connection)
+            connection.execute(
+                "INSERT INTO provisioning_tasks (token, status, result, private_info, owner) VALUES (?, ?, ?, ?, ?)",  # noqa: E501
+                (
+                    task.token,
+                    task.status.value,
+                    task.result,
+                    _dump_private_info(task.privateInfo),
+                    self.owner,
+                ),
+            )
+            connection.executemany(
+                "INSERT INTO provisioning_task_dags (token, data_contract_id, progress) VALUES (?, ?, ?)",  # noqa: E501
+                [
+                    (task.token, data_contract_id, progress.value)
+                    for data_contract_id, progress in task.dataContracts.items()
+                ],
+            )
+
+    def get_task(self, token: str) -> ProvisioningTask | None:
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT status, result, private_info FROM provisioning_tasks WHERE token = ?",  # noqa: E501
+                (token,),
+            ).fetchone()
+            if row is None:
+                return None
+            dag_rows = connection.execute(
+                "SELECT data_contract_id, progress FROM provisioning_task_dags WHERE token = ?",  # noqa: E501
+                (token,),
+            ).fetchall()
+        status, result, private_info = row
+        return ProvisioningTask(
+            token=token,
+            status=Status1(status),
+            result=result,
+            privateInfo=json.loads(private_info) if private_info is not None else None,
+            dataContracts={
+                data_contract_id: DagProgress(progress)
+                for data_contract_id, progress in dag_rows
+            },
+        )
+
+    def set_dag_progress(
+        self, token: str, data_contract_id: str, progress: DagProgress
+    ) -> None:
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "UPDATE provisioning_task_dags SET progress = ? WHERE token = ? AND data_contract_id = ?",  # noqa: E501
+                (progress.value, token, data_contract_id),
+            )
+
+    def complete_task(
+        self,
+        token: str,
+        status: Status1,
+        result: str,
+        private_info: dict[str, Any] | None = None,
+    ) -> None:
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "UPDATE provisioning_tasks SET status = ?, result = ?, private_info = ?, completed_at = ? WHERE token = ?",  # noqa: E501
+                (
+                    status.value,
+                    result,
+                    _dump_private_info(private_info),
+                    self._clock(),
+                    token,
+                ),
+            )
+
+    def _purge_expired_tasks(self, connection: sqlite3.Connection) -> None:
+        expired_before = self._clock() - self.ttl_seconds
+        connection.execute(
+            "DELETE FROM provisioning_task_dags WHERE token IN (SELECT token FROM provisioning_tasks WHERE completed_at < ?)",  # noqa: E501
+            (expired_before,),
+        )
+        connection.execute(
+            "DELETE FROM provisioning_tasks WHERE completed_at < ?", (expired_before,)
+        )
+
+    def fail_orphaned_tasks(self, result: str) -> int:
+        hostname = socket.gethostname()
+        with closing(self._connect()) as connection, connection:
+            gone_owners = [
+                (owner,)
+                for owner, owner_hostname, pid in connection.execute(
+                    "SELECT owner, hostname, pid FROM provisioning_task_owners"
+                )
+                if owner_hostname != hostname or not _is_running(pid)
+            ]
+            connection.executemany(
+                "DELETE FROM provisioning_task_owners WHERE owner = ?", gone_owners
+            )
+            cursor = connection.execute(
+                "UPDATE provisioning_tasks SET status = ?, result = ?, completed_at = ? WHERE status = ? AND (owner IS NULL OR owner NOT IN (SELECT owner FROM provisioning_task_owners))",  # noqa: E501
+                (Status1.FAILED.value, result, self._clock(), Status1.RUNNING.value),
+            )
+            return cursor.rowcount
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # the process exists, but belongs to another user
+        return True
+    return True
+
+
+def _add_missing_columns(
+    connection: sqlite3.Connection, table: str, columns: dict[str, str]
+) -> None:
+    """
+    Adds the given columns, by name and type, missing from a table created by a
+    previous version of the service.
+    """
+    existing_columns = {
+        row[1] for row in connection.execute(f"PRAGMA table_info({table})")
+    }
+    for name, column_type in columns.items():
+        if name not in existing_columns:
+            connection.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+
+
+def _dump_private_info(private_info: dict[str, Any] | None) -> str | None:
+    return json.dumps(private_info) if private_info is not None else None
@@ -0,0 +1,33 @@
+from typing import Any, Protocol
+
+from src.models.api_models import Status1
+from src.models.provisioning_task import DagProgress, ProvisioningTask
+
+
+class TaskRepository(Protocol):
+    def create_task(self, task: ProvisioningTask) -> None:
+        pass
+
+    def get_task(self, token: str) -> ProvisioningTask | None:
+        pass
+
+    def set_dag_progress(
+        self, token: str, data_contract_id: str, progress: DagProgress
+    ) -> None:
+        pass
+
+    def complete_task(
+        self,
+        token: str,
+        status: Status1,
+        result: str,
+        private_info: dict[str, Any] | None = None,
+    ) -> None:
+        pass
+
+    def fail_orphaned_tasks(self, result: str) -> int:
+        """
+        Marks as failed, with the given result, the running tasks of the processes that
+        are gone, e.g. because the service has been restarted, and returns how many.
+        """
+        pass
@@ -1,16 +1,58 @@
+import contextvars
+import hashlib
 import json
+import posixpath
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable
 
-import yaml
+import anyio.to_thread
+from anyio.from_thread import BlockingPortal
 from fastapi.encoders import jsonable_encoder
 
 from src.models.api_models import Info, ProvisioningStatus, Status1, SystemErr
+from src.models.dag_reconciliation import DagReconciliationReport
 from src.models.data_product_descriptor import DataProduct
-from src.models.gx_models import GXComponent, GXGuardianWorkload
-from src.repositories.dag_repository import DagRepository, DagRepositoryError
+from src.models.gx_models import (
+    DataContractGuardianSpec,
+    GXComponent,
+    GXGuardianWorkload,
+)
+from src.models.parsed_descriptor import ParsedDescriptor
+from src.models.provisioning_task import DagProgress
+from src.repositories.dag_repository import (
+    AsyncDagRepository,
+    DagManifest,
+    DagRepository,
+    DagRepositoryError,
+    DagWriteOutcome,
+)
 from src.services.template_service import TemplateService, TemplateServiceError
 from src.settings.airflow_settings import AirflowSettings
 from src.settings.cgp_settings import CGPSettings
+from src.settings.provision_settings import ProvisionSettings
 from src.utility.logger import get_logger
+from src.utility.metrics import count_dags
+
+# Called with the ID of a data contract whenever the progress of its DAG changes
+ProgressCallback = Callable[[str, DagProgress], None]
+
+DATA_PRODUCT_URN_PREFIX = "urn:dmb:dp:"
+COMPONENT_URN_PREFIX = "urn:dmb:cmp:"
+
+# Fields of a data contract component read by the generated DAGs
+EMBEDDED_COMPONENT_FIELDS = ("id", "kind", "technology", "specific")
+
+
+def _get_component_slice(component: dict) -> dict:
+    component_slice = {
+        field: component[field]
+        for field in EMBEDDED_COMPONENT_FIELDS
+        if field in component
+    }
+    component_slice["dataContract"] = {
+        "quality": component.get("dataContract", {}).get("quality", [])
+    }
+    return component_slice
 
 
 class ProvisionService:
@@ -20,73 +62,954 @@ class ProvisionService:
         template_service: TemplateService,
         cgp_settings: CGPSettings,
         airflow_settings: AirflowSettings,
+        provision_settings: ProvisionSettings | None = None,
+        async_dag_repository: AsyncDagRepository | None = None,
     ):
         self.dag_repository = dag_repository
+        self.async_dag_repository = async_dag_repository
         self.template_service = template_service
         self.cgp_settings = cgp_settings
         self.airflow_settings = airflow_settings
+        self.provision_settings = (
+            provision_settings
+            if provision_settings is not None
+            else ProvisionSettings()
+        )
         self.logger = get_logger(__name__)
 
     def provision(
         self,
-        data_product: DataProduct,
+        descriptor: ParsedDescriptor,
         workload: GXGuardianWorkload,
         data_contracts: list[GXComponent],
-        full_descriptor: str,
+        progress_callback: ProgressCallback | None = None,
+        portal: BlockingPortal | None = None,
     ) -> ProvisioningStatus | SystemErr:
-        descriptor_json_str = json.dumps(
-            jsonable_encoder(yaml.safe_load(full_descriptor))
-        )
+        """
+        Publishes the DAGs of the data contracts of the guardian.
+
+        When a `portal` to the event loop is given, the DAGs are uploaded through the
+        asynchronous DAG repository, if any, on that event loop.
+        """
         if workload.info is None:
             error_msg = "Missing passive policy infos in Guardian descriptor"
             self.logger.error(error_msg)
             return SystemErr(error=error_msg)
-        for data_contract in data_contracts:
-            self.logger.info(
-                "Rendering DAG Template for data contract with ID: %s",
-                data_contract.get_id(),
-            )
-            params = {
-                "data_contract_id": data_contract.get_id(),
-                "environment": data_product.environment,
-                "descriptor": descriptor_json_str,
-                "passive_policy_id": workload.info.privateInfo.dataContractGuardian.policyId,
-                "cgp_base_url": self.cgp_settings.base_url,
-                "airflow_connection_id": self.airflow_settings.connection_id,
-            }
-            rendered_dag = self.template_service.render_template(
-                data_contract.get_technology(), params
+        task_python_error = self._get_task_python_error()
+        if task_python_error is not None:
+            self.logger.error(task_python_error)
+            return SystemErr(error=task_python_error)
+        if self.provision_settings.dag_grouping == "guardian":
+            return self._provision_grouped(
+                descriptor,
+                workload.info.privateInfo.dataContractGuardian.policyId,
+                data_contracts,
+                progress_callback,
+                portal,
             )
-            if isinstance(rendered_dag, TemplateServiceError):
-                return SystemErr(error=rendered_dag.error_msg)
-            self.logger.info(
-                "Publishing DAG for data contract with ID: %s", data_contract.get_id()
+        descriptors = self._get_embedded_descriptors(data_contracts, descriptor)
+        self.logger.info(
+            "Embedding %d bytes of descriptor in %d DAGs (mode: %s)",
+            sum(len(descriptor) for descriptor in descriptors.values()),
+            len(descriptors),
+            self.provision_settings.descriptor_embedding,
+        )
+        data_product = descriptor.data_product
+        passive_policy_id = workload.info.privateInfo.dataContractGuardian.policyId
+        fingerprints = {
+            data_contract.get_id(): self._get_fingerprint(
+                data_contract.get_technology(),
+                self._get_template_params(
+                    data_product,
+                    data_contract,
+                    descriptors[data_contract.get_id()],
+                    passive_policy_id,
+                ),
+            )
+            for data_contract in data_contracts
+        }
+        previous_manifest = self._get_previous_manifest(
+            descriptor.component_id, data_product.environment
+        )
+        # the DAGs deleted out of band since the last provisioning are rendered again
+        existing_ids = self._get_existing_dag_ids(
+            [
+                data_contract.get_id()
+                for data_contract in data_contracts
+                if fingerprints[data_contract.get_id()] is not None
+                and fingerprints[data_contract.get_id()]
+                == previous_manifest.get(data_contract.get_id())
+            ],
+            data_product.environment,
+        )
+        changed_data_contracts = [
+            data_contract
+            for data_contract in data_contracts
+            if data_contract.get_id() not in existing_ids
+        ]
+        changed_ids = {
+            data_contract.get_id() for data_contract in changed_data_contracts
+        }
+        unchanged_ids = [
+            data_contract.get_id()
+            for data_contract in data_contracts
+            if data_contract.get_id() not in changed_ids
+        ]
+        if progress_callback is not None:
+            for data_contract_id in unchanged_ids:
+                progress_callback(data_contract_id, DagProgress.SKIPPED)
+        self.logger.info(
+            "%d DAGs to render, %d unchanged since the last provisioning",
+            len(changed_data_contracts),
+            len(unchanged_ids),
+        )
+        outcomes, errors = self._render_and_publish_dags(
+            data_product,
+            changed_data_contracts,
+            descriptors,
+            passive_policy_id,
+            progress_callback,
+            portal,
+        )
+        dags_written = list(outcomes.values()).count(DagWriteOutcome.WRITTEN)
+        return self._complete_provisioning(
+            descriptor,
+            previous_manifest,
+            fingerprints,
+            [*unchanged_ids, *outcomes.keys()],
+            errors,
+            dags_written,
+            len(outcomes) - dags_written + len(unchanged_ids),
+        )
+
+    def _provision_grouped(
+        self,
+        descriptor: ParsedDescriptor,
+        passive_policy_id: str,
+        data_contracts: list[GXComponent],
+        progress_callback: ProgressCallback | None = None,
+        portal: BlockingPortal | None = None,
+    ) -> ProvisioningStatus | SystemErr:
+        """
+        Publishes a single DAG, identified by the ID of the guardian, that evaluates all
+        the data contracts of the guardian. The data contracts are split in batches
+        evaluated by the mapped tasks of the DAG, each one with a single GX context, and
+        the results of all the data contracts are pushed with a single request.
+
+        The DAG is rendered again only when its inputs change; once it is published, the
+        DAGs previously published for the single data contracts are deleted like the
+        ones of the data contracts not guarded anymore.
+        """
+        technologies = {
+            data_contract.get_technology() for data_contract in data_contracts
+        }
+        if len(technologies) > 1:
+            error_msg = f"The data contracts of a guardian DAG must share the same technology, found: {', '.join(sorted(technologies))}"  # noqa: E501
+            self.logger.error(error_msg)
+            return SystemErr(error=error_msg)
+        if self.airflow_settings.gx_context_mode == "file":
+            error_msg = "The file GX context mode is not supported by guardian DAGs"
+            self.logger.error(error_msg)
+            return SystemErr(error=error_msg)
+        guardian_id = descriptor.component_id
+        previous_manifest = self._get_previous_manifest(
+            guardian_id, descriptor.data_product.environment
+        )
+        if not data_contracts:
+            return self._complete_provisioning(
+                descriptor, previous_manifest, dict(), [], [], 0, 0
+            )
+        technology = technologies.pop()
+        data_contract_ids = [data_contract.get_id() for data_contract in data_contracts]
+        params = self._get_grouped_template_params(
+            descriptor, data_contract_ids, passive_policy_id
+        )
+        fingerprint = self._get_fingerprint(technology, params, grouped=True)
+        fingerprints = {guardian_id: fingerprint}
+        if (
+            fingerprint is not None
+            and fingerprint == previous_manifest.get(guardian_id)
+            and self._get_existing_dag_ids(
+                [guardian_id], descriptor.data_product.environment
+            )
+        ):
+            self.logger.info("Guardian DAG unchanged since the last provisioning")
+            if progress_callback is not None:
+                for data_contract_id in data_contract_ids:
+                    progress_callback(data_contract_id, DagProgress.SKIPPED)
+            return self._complete_provisioning(
+                descriptor, previous_manifest, fingerprints, [guardian_id], [], 0, 1
+            )
+        res = self._render_and_publish_grouped_dag(
+            descriptor, technology, params, data_contract_ids, progress_callback, portal
+        )
+        if isinstance(res, (TemplateServiceError, DagRepositoryError)):
+            # the DAGs of the last provisioning are kept until the guardian DAG is
+            # published, and the guardian DAG is rendered again by the next one
+            kept_ids = [dag_id for dag_id in previous_manifest if dag_id != guardian_id]
+            return self._complete_provisioning(
+                descriptor,
+                previous_manifest,
+                {**previous_manifest, **fingerprints},
+                kept_ids,
+                [res.error_msg],
+                0,
+                0,
             )
+        dags_written = 1 if res == DagWriteOutcome.WRITTEN else 0
+        return self._complete_provisioning(
+            descriptor,
+            previous_manifest,
+            fingerprints,
+            [guardian_id],
+            [],
+            dags_written,
+            1 - dags_written,
+        )
+
+    def _render_and_publish_grouped_dag(
+        self,
+        descriptor: ParsedDescriptor,
+        technology: str,
+        params: dict[str, Any],
+        data_contract_ids: list[str],
+        progress_callback: ProgressCallback | None = None,
+        portal: BlockingPortal | None = None,
+    ) -> DagWriteOutcome | TemplateServiceError | DagRepositoryError:
+        def notify(progress: DagProgress) -> None:
+            if progress_callback is not None:
+                for data_contract_id in data_contract_ids:
+                    progress_callback(data_contract_id, progress)
+
+        notify(DagProgress.RUNNING)
+        self.logger.info(
+            "Rendering guardian DAG for %d data contracts", len(data_contract_ids)
+        )
+        rendered_dag = self.template_service.render_template(
+            technology, params, grouped=True
+        )
+        if isinstance(rendered_dag, TemplateServiceError):
+            notify(DagProgress.FAILED)
+            return rendered_dag
+        self.logger.info("Publishing guardian DAG %s", descriptor.component_id)
+        environment = descriptor.data_product.environment
+        if portal is not None and self.async_dag_repository is not None:
+            res = portal.call(
+                self.async_dag_repository.create_or_update_dag,
+                descriptor.component_id,
+                rendered_dag,
+                environment,
+            )
+        else:
             res = self.dag_repository.create_or_update_dag(
-                data_contract.get_id(), rendered_dag, data_product.environment
+                descriptor.component_id, rendered_dag, environment
             )
-            if isinstance(res, DagRepositoryError):
-                return SystemErr(error=res.error_msg)
+        notify(
+            DagProgress.FAILED
+            if isinstance(res, DagRepositoryError)
+            else DagProgress(res)
+        )
+        return res
+
+    def _complete_provisioning(
+        self,
+        descriptor: ParsedDescriptor,
+        previous_manifest: DagManifest,
+        fingerprints: dict[str, str | None],
+        published_ids: list[str],
+        errors: list[str],
+        dags_written: int,
+        dags_skipped: int,
+    ) -> ProvisioningStatus | SystemErr:
+        """
+        Deletes the DAGs not published anymore, stores the manifest of the DAGs that
+        have been published and reconciles the DAG folder, then reports the outcome of
+        the provisioning.
+
+        Args:
+            descriptor (ParsedDescriptor): the provisioning request
+            previous_manifest (DagManifest): the manifest of the last provisioning
+            fingerprints (dict[str, str | None]): the fingerprint of every DAG of this
+                provisioning, by the ID its DAG is published with
+            published_ids (list[str]): the IDs of the DAGs that are up to date
+            errors (list[str]): the errors of the DAGs that could not be published
+            dags_written (int): the number of DAGs written
+            dags_skipped (int): the number of DAGs skipped as unchanged
+        """
+        data_product = descriptor.data_product
+        removed_ids, failed_removals = self._delete_unguarded_dags(
+            previous_manifest, fingerprints, data_product.environment
+        )
+        if failed_removals is not None:
+            errors.append(failed_removals.error_msg)
+        self._put_manifest(
+            descriptor.component_id,
+            data_product.environment,
+            {
+                # the DAGs not published are rendered again by the next provisioning
+                **{dag_id: fingerprints[dag_id] for dag_id in published_ids},
+                # the DAGs not deleted are deleted by the next provisioning
+                **{
+                    dag_id: previous_manifest[dag_id]
+                    for dag_id in (
+                        failed_removals.failed_dags
+                        if failed_removals is not None
+                        else dict()
+                    )
+                },
+            },
+        )
+        reconciliation = self._reconcile_after_provisioning(
+            data_product, list(fingerprints.keys())
+        )
+        count_dags(
+            data_product.environment,
+            written=dags_written,
+            skipped=dags_skipped,
+            deleted=len(removed_ids),
+        )
+        if errors:
+            return SystemErr(error="\n".join(errors))
+        self.logger.info(
+            "DAGs published: %d written, %d skipped as unchanged, %d deleted",
+            dags_written,
+            dags_skipped,
+            len(removed_ids),
+        )
         return ProvisioningStatus(
             status=Status1.COMPLETED,
             result="",
-            info=Info(publicInfo=dict(), privateInfo=dict()),
+            info=Info(
+                publicInfo=dict(),
+                privateInfo={
+                    "dags": {
+                        "written": dags_written,
+                        "skipped": dags_skipped,
+                        "deleted": len(removed_ids),
+                    },
+                    **(
+                        {
+                            "orphans": {
+                                "found": len(reconciliation.orphans),
+                                "deleted": len(reconciliation.deleted),
+                            }
+                        }
+                        if reconciliation is not None
+                        else dict()
+                    ),
+                },
+            ),
         )
 
-    def unprovision(
+    def reconcile_dags(
         self,
         data_product: DataProduct,
+        dry_run: bool = True,
+        kept_ids: list[str] | None = None,
+    ) -> DagReconciliationReport | SystemErr:
+        """
+        Lists the DAGs of the data product in the DAG folder and deletes the orphan
+        ones, i.e. the DAGs of data contracts not guarded by any guardian of the data
+        product, such as the ones left behind when a data contract is dropped from the
+        guards of its guardian.
+
+        Args:
+            data_product (DataProduct): the current data product descriptor
+            dry_run (bool): when True, the orphan DAGs are reported but not deleted
+            kept_ids (list[str] | None): the IDs of more DAGs that are not orphans,
+                such as the ones of the provisioning that triggers the reconciliation
+
+        Returns:
+            DagReconciliationReport | SystemErr: the orphan DAGs found and deleted, or
+            an error if the guardians cannot be read or the DAG folder listed.
+        """
+        if not data_product.id.startswith(DATA_PRODUCT_URN_PREFIX):
+            error_msg = f"Unable to reconcile the DAGs of data product {data_product.id}, its ID is not a {DATA_PRODUCT_URN_PREFIX} URN"  # noqa: E501
+            self.logger.error(error_msg)
+            return SystemErr(error=error_msg)
+        data_contract_id_prefix = (
+            COMPONENT_URN_PREFIX
+            + data_product.id.removeprefix(DATA_PRODUCT_URN_PREFIX)
+            + ":"
+        )
+        guardians = self._get_guardian_specs(data_product)
+        if isinstance(guardians, SystemErr):
+            return guardians
+        if self.provision_settings.dag_grouping == "guardian":
+            guarded_ids = list(guardians.keys())
+        else:
+            guarded_ids = [
+                guard.dataContractId
+                for guardian_spec in guardians.values()
+                for guard in guardian_spec.guards
+            ]
+        res = self.dag_repository.find_orphan_dags(
+            data_contract_id_prefix,
+            [*guarded_ids, *(kept_ids if kept_ids is not None else [])],
+            data_product.environment,
+        )
+        if isinstance(res, DagRepositoryError):
+            return SystemErr(error=res.error_msg)
+        listed, orphan_keys = res
+        report = DagReconciliationReport(
+            dryRun=dry_run, listed=listed, orphans=orphan_keys
+        )
+        self.logger.info(
+            "%d orphan DAGs found among the %d DAGs of data product %s%s",
+            len(orphan_keys),
+            listed,
+            data_product.id,
+            f": {', '.join(orphan_keys)}" if orphan_keys else "",
+        )
+        if dry_run or not orphan_keys:
+            return report
+        delete_res = self.dag_repository.delete_dag_keys(orphan_keys)
+        if isinstance(delete_res, DagRepositoryError):
+            report.failed = delete_res.failed_dags
+        report.deleted = [key for key in orphan_keys if key not in report.failed]
+        self.logger.info("%d orphan DAGs deleted", len(report.deleted))
+        return report
+
+    def _get_guardian_specs(
+        self, data_product: DataProduct
+    ) -> dict[str, DataContractGuardianSpec] | SystemErr:
+        """
+        Returns the guardian spec of every guardian of the data product, by guardian
+        ID. The guardians are the workloads with a guardian spec, whatever model they
+        have been parsed with: the ones with another use case template are not parsed
+        as `GXGuardianWorkload`.
+        """
+        guardian_specs: dict[str, DataContractGuardianSpec] = dict()
+        for workload in data_product.get_workloads():
+            if isinstance(workload, GXGuardianWorkload):
+                guardian_specs[workload.id] = workload.dataContractGuardianSpec
+                continue
+            guardian_spec = (workload.model_extra or dict()).get(
+                "__dataContractGuardianSpec"
+            )
+            if guardian_spec is None:
+                continue
+            try:
+                guardian_specs[workload.id] = DataContractGuardianSpec.model_validate(
+                    guardian_spec
+                )
+            except ValueError as e:
+                # the DAGs of its guards would be reported as orphans
+                error_msg = f"Unable to reconcile the DAGs of data product {data_product.id}, the guardian spec of {workload.id} is not valid: {str(e)}"  # noqa: E501
+                self.logger.error(error_msg)
+                return SystemErr(error=error_msg)
+        return guardian_specs
+
+    def _reconcile_after_provisioning(
+        self, data_product: DataProduct, provisioned_ids: list[str]
+    ) -> DagReconciliationReport | None:
+        """
+        Reconciles the DAGs of the data product according to the reconcile setting,
+        never reporting the DAGs of the provisioning as orphans. Reconciliation is
+        housekeeping: its errors are logged but do not fail the provisioning.
+        """
+        if self.provision_settings.reconcile == "off":
+            return None
+        report = self.reconcile_dags(
+            data_product,
+            dry_run=self.provision_settings.reconcile == "dry_run",
+            kept_ids=provisioned_ids,
+        )
+        if isinstance(report, SystemErr):
+            self.logger.warning("DAG reconciliation skipped: %s", report.error)
+            return None
+        return report
+
+    def _get_task_python_error(self) -> str | None:
+        """
+        Checks the Python environment and the GX context directory the DAG tasks are
+        rendered with: the paths are embedded in the DAGs as string literals and
+        resolved on the Airflow workers, so they must be absolute and cannot contain
+        quotes, backslashes or newlines.
+
+        Returns:
+            str | None: the error message, or None if the options are valid.
+        """
+        paths = {
+            "python_executable": self.airflow_settings.python_executable,
+            "venv_cache_path": self.airflow_settings.venv_cache_path,
+            "gx_context_root_dir": self.airflow_settings.gx_context_root_dir,
+        }
+        if (
+            self.airflow_settings.task_python == "external_python"
+            and paths["python_executable"] is None
+        ):
+            return "The Python executable of the DAG tasks must be set when they run with external_python"  # noqa: E501
+        for name, path in paths.items():
+            if path is None:
+                continue
+            if not posixpath.isabs(path) or any(c in path for c in '"\\\n\r'):
+                return f"Invalid {name} '{path}' for the DAG tasks: it must be an absolute path without quotes, backslashes or newlines"  # noqa: E501
+        return None
+
+    def _get_fingerprint(
+        self, technology: str, params: dict[str, Any], grouped: bool = False
+    ) -> str | None:
+        """
+        Returns the fingerprint of the inputs the DAG of a data contract is rendered
+        from: the template parameters and the version of the template. It is None if
+        the template cannot be found, so that the DAG is rendered and the error reported.
+        """
+        template_digest = self.template_service.get_template_digest(technology, grouped)
+        if isinstance(template_digest, TemplateServiceError):
+            return None
+        return hashlib.sha256(
+            json.dumps([template_digest, params], sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    def _get_previous_manifest(self, guardian_id: str, environment: str) -> DagManifest:
+        """
+        Returns the fingerprints of the DAGs published by the last provisioning of the
+        guardian. It is empty, so that all the DAGs are rendered, when incremental
+        provisioning is disabled or the manifest cannot be read.
+        """
+        if not self.provision_settings.incremental:
+            return dict()
+        manifest = self.dag_repository.get_manifest(guardian_id, environment)
+        if isinstance(manifest, DagRepositoryError):
+            self.logger.warning(
+                "Rendering all the DAGs, the manifest of the last provisioning is not available: %s",  # noqa: E501
+                manifest.error_msg,
+            )
+            return dict()
+        return manifest
+
+    def _get_existing_dag_ids(self, dag_ids: list[str], environment: str) -> set[str]:
+        """
+        Returns the IDs, among the ones of the DAGs unchanged since the last
+        provisioning, of the DAGs that still exist, so that the ones deleted out of
+        band are rendered again. It is empty, so that all the DAGs are rendered, when
+        the DAGs cannot be listed.
+        """
+        if not dag_ids:
+            return set()
+        existing_ids = self.dag_repository.find_existing_dags(dag_ids, environment)
+        if isinstance(existing_ids, DagRepositoryError):
+            self.logger.warning(
+                "Rendering all the DAGs, unable to check that the unchanged ones still exist: %s",  # noqa: E501
+                existing_ids.error_msg,
+            )
+            return set()
+        if len(existing_ids) < len(dag_ids):
+            self.logger.info(
+                "%d unchanged DAGs missing from the DAG folder, rendering them again",
+                len(dag_ids) - len(existing_ids),
+            )
+        return existing_ids
+
+    def _delete_unguarded_dags(
+        self,
+        previous_manifest: DagManifest,
+        fingerprints: dict[str, str | None],
+        environment: str,
+    ) -> tuple[list[str], DagRepositoryError | None]:
+        """
+        Deletes the DAGs of the data contracts guarded by the last provisioning that are
+        not guarded anymore.
+
+        Returns:
+            tuple[list[str], DagRepositoryError | None]: the IDs of the data contracts
+            whose DAG has been deleted, and the error of the DAGs that could not be.
+        """
+        unguarded_ids = [
+            data_contract_id
+            for data_contract_id in previous_manifest
+            if data_contract_id not in fingerprints
+        ]
+        if not unguarded_ids:
+            return [], None
+        self.logger.info(
+            "Deleting DAGs for data contracts not guarded anymore: %s",
+            ",".join(unguarded_ids),
+        )
+        res = self.dag_repository.delete_dags(unguarded_ids, environment)
+        if isinstance(res, DagRepositoryError):
+            return [
+                data_contract_id
+                for data_contract_id in unguarded_ids
+                if data_contract_id not in res.failed_dags
+            ], res
+        return unguarded_ids, None
+
+    def _put_manifest(
+        self, guardian_id: str, environment: str, manifest: dict[str, str | None]
+    ) -> None:
+        if not self.provision_settings.incremental:
+            return
+        res = self.dag_repository.put_manifest(
+            guardian_id,
+            environment,
+            {
+                data_contract_id: fingerprint
+                for data_contract_id, fingerprint in manifest.items()
+                if fingerprint is not None
+            },
+        )
+        if isinstance(res, DagRepositoryError):
+            # the next provisioning renders all the DAGs again
+            self.logger.warning(
+                "Unable to store the manifest of the provisioning: %s", res.error_msg
+            )
+
+    def _get_embedded_descriptors(
+        self, data_contracts: list[GXComponent], descriptor: ParsedDescriptor
+    ) -> dict[str, str]:
+        """
+        Builds the JSON descriptor to embed in the DAG of each data contract.
+
+        In "full" mode every DAG gets the whole provisioning descriptor. In "component"
+        mode every DAG gets a descriptor with the same structure, whose only component
+        is the slice of the data contract component read by the DAG, so that the size
+        of each DAG does not grow with the size of the data product.
+
+        Returns:
+            dict[str, str]: the JSON descriptor to embed, by data contract ID.
+        """
+        if self.provision_settings.descriptor_embedding == "full":
+            return {
+                data_contract.get_id(): descriptor.json
+                for data_contract in data_contracts
+            }
+        components_by_id = {
+            component.get("id"): component
+            for component in descriptor.descriptor_dict["dataProduct"]["components"]
+        }
+        return {
+            data_contract.get_id(): json.dumps(
+                jsonable_encoder(
+                    {
+                        "dataProduct": {
+                            "components": [
+                                _get_component_slice(
+                                    components_by_id[data_contract.get_id()]
+                                )
+                            ]
+                        }
+                    }
+                )
+            )
+            for data_contract in data_contracts
+        }
+
+    def _render_and_publish_dags(
+        self,
+        data_product: DataProduct,
+        data_contracts: list[GXComponent],
+        descriptors: dict[str, str],
+        passive_policy_id: str,
+        progress_callback: ProgressCallback | None = None,
+        portal: BlockingPortal | None = None,
+    ) -> tuple[dict[str, DagWriteOutcome], list[str]]:
+        """
+        Renders and publishes the DAGs of the data contracts concurrently, using at most
+        `max_concurrency` threads, so that rendering and uploads of different data
+        contracts overlap. When a `portal` to the event loop is given and there is an
+        asynchronous DAG repository, the threads only render the DAGs, which are then
+        uploaded together on the event loop, as many at a time as the asynchronous DAG
+        repository allows.
+
+        Failures reported by the template service or the DAG repository do not stop the
+        other data contracts. An unexpected exception is instead considered a hard
+        failure: the data contracts not yet started are cancelled.
+
+        If a `progress_callback` is given, it is notified when the DAG of each data
+        contract starts and when it ends.
+
+        Returns:
+            tuple[dict[str, DagWriteOutcome], list[str]]: the outcomes of the DAGs that
+            have been published, by data contract ID, and the error messages in the same
+            order as `data_contracts`. An empty list of errors means all the DAGs have
+            been published.
+        """
+        if not data_contracts:
+            return dict(), []
+        upload_async = portal is not None and self.async_dag_repository is not None
+        max_workers = min(self.provision_settings.max_concurrency, len(data_contracts))
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="provision"
+        ) as executor:
+            futures: list[
+                Future[
+                    str | DagWriteOutcome | TemplateServiceError | DagRepositoryError
+                ]
+            ] = [
+                # each DAG is handled in a copy of the context of the provisioning,
+                # so that its spans are children of the span of the provisioning
+                executor.submit(
+                    contextvars.copy_context().run,
+                    self._render_dag if upload_async else self._render_and_publish_dag,
+                    data_product,
+                    data_contract,
+                    descriptors[data_contract.get_id()],
+                    passive_policy_id,
+                    progress_callback,
+                )
+                for data_contract in data_contracts
+            ]
+            done, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+            if any(future.exception() is not None for future in done):
+                for future in not_done:
+                    future.cancel()
+
+            outcomes: dict[str, DagWriteOutcome] = dict()
+            errors: dict[str, str] = dict()
+            rendered_dags: dict[str, str] = dict()
+            for data_contract, future in zip(data_contracts, futures):
+                if future.cancelled():
+                    if progress_callback is not None:
+                        progress_callback(data_contract.get_id(), DagProgress.CANCELLED)
+                    errors[data_contract.get_id()] = (
+                        f"Publishing of the DAG related to {data_contract.get_id()} has been cancelled due to a previous error"  # noqa: E501
+                    )
+                    continue
+                exception = future.exception()
+                if exception is not None:
+                    error_msg = f"An unexpected error occurred while provisioning the DAG related to {data_contract.get_id()}. Details: {str(exception)}"  # noqa: E501
+                    self.logger.error(error_msg, exc_info=exception)
+                    if progress_callback is not None:
+                        progress_callback(data_contract.get_id(), DagProgress.FAILED)
+                    errors[data_contract.get_id()] = error_msg
+                    continue
+                res = future.result()
+                if isinstance(res, (TemplateServiceError, DagRepositoryError)):
+                    errors[data_contract.get_id()] = res.error_msg
+                elif isinstance(res, DagWriteOutcome):
+                    outcomes[data_contract.get_id()] = res
+                else:
+                    rendered_dags[data_contract.get_id()] = res
+        if (
+            rendered_dags
+            and portal is not None
+            and self.async_dag_repository is not None
+        ):
+            self.logger.info("Publishing %d DAGs", len(rendered_dags))
+            published = portal.call(
+                self.async_dag_repository.create_or_update_dags,
+                rendered_dags,
+                data_product.environment,
+            )
+            for data_contract_id, published_res in published.items():
+                self._notify_published(
+                    data_contract_id, published_res, progress_callback
+                )
+                if isinstance(published_res, DagRepositoryError):
+                    errors[data_contract_id] = published_res.error_msg
+                else:
+                    outcomes[data_contract_id] = published_res
+        return outcomes, [
+            errors[data_contract.get_id()]
+            for data_contract in data_contracts
+            if data_contract.get_id() in errors
+        ]
+
+    def _render_and_publish_dag(
+        self,
+        data_product: DataProduct,
+        data_contract: GXComponent,
+        descriptor_json_str: str,
+        passive_policy_id: str,
+        progress_callback: ProgressCallback | None = None,
+    ) -> DagWriteOutcome | TemplateServiceError | DagRepositoryError:
+        rendered_dag = self._render_dag(
+            data_product,
+            data_contract,
+            descriptor_json_str,
+            passive_policy_id,
+            progress_callback,
+        )
+        if isinstance(rendered_dag, TemplateServiceError):
+            return rendered_dag
+        self.logger.info(
+            "Publishing DAG for data contract with ID: %s", data_contract.get_id()
+        )
+        res = self.dag_repository.create_or_update_dag(
+            data_contract.get_id(), rendered_dag, data_product.environment
+        )
+        self._notify_published(data_contract.get_id(), res, progress_callback)
+        return res
+
+    def _render_dag(
+        self,
+        data_product: DataProduct,
+        data_contract: GXComponent,
+        descriptor_json_str: str,
+        passive_policy_id: str,
+        progress_callback: ProgressCallback | None = None,
+    ) -> str | TemplateServiceError:
+        if progress_callback is not None:
+            progress_callback(data_contract.get_id(), DagProgress.RUNNING)
+        self.logger.info(
+            "Rendering DAG Template for data contract with ID: %s",
+            data_contract.get_id(),
+        )
+        params = self._get_template_params(
+            data_product, data_contract, descriptor_json_str, passive_policy_id
+        )
+        rendered_dag = self.template_service.render_template(
+            data_contract.get_technology(), params
+        )
+        if isinstance(rendered_dag, TemplateServiceError):
+            if progress_callback is not None:
+                progress_callback(data_contract.get_id(), DagProgress.FAILED)
+        return rendered_dag
+
+    def _notify_published(
+        self,
+        data_contract_id: str,
+        res: DagWriteOutcome | DagRepositoryError,
+        progress_callback: ProgressCallback | None = None,
+    ) -> None:
+        if progress_callback is not None:
+            progress_callback(
+                data_contract_id,
+                (
+                    DagProgress.FAILED
+                    if isinstance(res, DagRepositoryError)
+                    else DagProgress(res)
+                ),
+            )
+
+    def _get_grouped_template_params(
+        self,
+        descriptor: ParsedDescriptor,
+        data_contract_ids: list[str],
+        passive_policy_id: str,
+    ) -> dict[str, Any]:
+        batch_size = self.provision_settings.group_batch_size
+        if self.provision_settings.descriptor_embedding == "full":
+            descriptor_json_str = descriptor.json
+        else:
+            components_by_id = {
+                component.get("id"): component
+                for component in descriptor.descriptor_dict["dataProduct"]["components"]
+            }
+            descriptor_json_str = json.dumps(
+                jsonable_encoder(
+                    {
+                        "dataProduct": {
+                            "components": [
+                                _get_component_slice(components_by_id[data_contract_id])
+                                for data_contract_id in data_contract_ids
+                            ]
+                        }
+                    }
+                )
+            )
+        return {
+            "guardian_id": descriptor.component_id,
+            "data_contract_batches": [
+                data_contract_ids[i : i + batch_size]
+                for i in range(0, len(data_contract_ids), batch_size)
+            ],
+            "environment": descriptor.data_product.environment,
+            "descriptor": descriptor_json_str,
+            "passive_policy_id": passive_policy_id,
+            "cgp_base_url": self.cgp_settings.base_url,
+            "airflow_connection_id": self.airflow_settings.connection_id,
+            "task_python": self.airflow_settings.task_python,
+            "python_executable": self.airflow_settings.python_executable,
+            "venv_cache_path": self.airflow_settings.venv_cache_path,
+        }
+
+    def _get_template_params(
+        self,
+        data_product: DataProduct,
+        data_contract: GXComponent,
+        descriptor_json_str: str,
+        passive_policy_id: str,
+    ) -> dict[str, Any]:
+        return {
+            "data_contract_id": data_contract.get_id(),
+            "environment": data_product.environment,
+            "descriptor": descriptor_json_str,
+            "passive_policy_id": passive_policy_id,
+            "cgp_base_url": self.cgp_settings.base_url,
+            "airflow_connection_id": self.airflow_settings.connection_id,
+            "gx_context_mode": self.airflow_settings.gx_context_mode,
+            "gx_context_root_dir": self.airflow_settings.gx_context_root_dir,
+            "task_python": self.airflow_settings.task_python,
+            "python_executable": self.airflow_settings.python_executable,
+            "venv_cache_path": self.airflow_settings.venv_cache_path,
+        }
+
+    def unprovision(
+        self,
+        descriptor: ParsedDescriptor,
         workload: GXGuardianWorkload,
         data_contracts: list[GXComponent],
-        full_descriptor: str,
     ) -> ProvisioningStatus | SystemErr:
-        self.logger.info(
-            "Deleting DAGs for data contracts: %s",
-            ",".join(list(map(lambda dc: dc.get_id(), data_contracts))),
+        # removed first, so that a following provisioning never relies on a manifest
+        # listing deleted DAGs
+        manifest_res = self.dag_repository.delete_manifest(
+            descriptor.component_id, descriptor.data_product.environment
         )
+        if isinstance(manifest_res, DagRepositoryError):
+            return SystemErr(error=manifest_res.error_msg)
+        dag_ids = self._get_unprovisioned_dag_ids(descriptor, data_contracts)
+        self.logger.info("Deleting DAGs: %s", ",".join(dag_ids))
         res = self.dag_repository.delete_dags(
-            list(map(lambda dc: dc.get_id(), data_contracts)), data_product.environment
+            dag_ids, descriptor.data_product.environment
+        )
+        return self._get_unprovisioning_result(
+            res, len(dag_ids), descriptor.data_product.environment
         )
+
+    async def unprovision_async(
+        self,
+        descriptor: ParsedDescriptor,
+        workload: GXGuardianWorkload,
+        data_contracts: list[GXComponent],
+    ) -> ProvisioningStatus | SystemErr:
+        """
+        Same as `unprovision`, awaiting the asynchronous DAG repository so that no
+        thread is held while waiting for S3. Without an asynchronous DAG repository,
+        `unprovision` is run on a worker thread.
+        """
+        if self.async_dag_repository is None:
+            return await anyio.to_thread.run_sync(
+                self.unprovision, descriptor, workload, data_contracts
+            )
+        environment = descriptor.data_product.environment
+        manifest_res = await self.async_dag_repository.delete_manifest(
+            descriptor.component_id, environment
+        )
+        if isinstance(manifest_res, DagRepositoryError):
+            return SystemErr(error=manifest_res.error_msg)
+        dag_ids = self._get_unprovisioned_dag_ids(descriptor, data_contracts)
+        self.logger.info("Deleting DAGs: %s", ",".join(dag_ids))
+        res = await self.async_dag_repository.delete_dags(dag_ids, environment)
+        return self._get_unprovisioning_result(res, len(dag_ids), environment)
+
+    def _get_unprovisioned_dag_ids(
+        self, descriptor: ParsedDescriptor, data_contracts: list[GXComponent]
+    ) -> list[str]:
+        """
+        Returns the IDs of the DAGs to delete when the guardian is unprovisioned: the
+        DAGs of its data contracts and, when the DAGs are grouped by guardian, the DAG
+        of the guardian. The DAGs of the data contracts are deleted in both modes, since
+        they are left behind when grouping is enabled after a provisioning.
+        """
+        dag_ids = [data_contract.get_id() for data_contract in data_contracts]
+        if self.provision_settings.dag_grouping == "guardian":
+            dag_ids.append(descriptor.component_id)
+        return dag_ids
+
+    def _get_unprovisioning_result(
+        self, res: None | DagRepositoryError, dags: int, environment: str
+    ) -> ProvisioningStatus | SystemErr:
         if isinstance(res, DagRepositoryError):
+            failed_dags = len(res.failed_dags) if res.failed_dags else dags
+            count_dags(environment, deleted=dags - failed_dags)
+            if res.failed_dags:
+                self.logger.error(
+                    "Unable to delete DAGs for data contracts: %s",
+                    ",".join(res.failed_dags.keys()),
+                )
             return SystemErr(error=res.error_msg)
+        count_dags(environment, deleted=dags)
         return ProvisioningStatus(status=Status1.COMPLETED, result="")
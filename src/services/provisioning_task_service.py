@@ -0,0 +1,140 @@
+import contextvars
+import uuid
+from concurrent.futures import Executor
+
+from anyio.from_thread import BlockingPortal
+
+from src.models.api_models import (
+    Info,
+    ProvisioningStatus,
+    Status1,
+    SystemErr,
+    ValidationError,
+)
+from src.models.gx_models import GXComponent, GXGuardianWorkload
+from src.models.parsed_descriptor import ParsedDescriptor
+from src.models.provisioning_task import DagProgress, ProvisioningTask
+from src.repositories.task_repository import TaskRepository
+from src.services.provision_service import ProvisionService
+from src.utility.logger import get_logger
+from src.utility.tracing import (
+    COMPONENT_ID,
+    DAG_COUNT,
+    ENVIRONMENT,
+    set_error,
+    start_span,
+)
+
+
+class ProvisioningTaskService:
+    """
+    Runs the provisioning requests in the background and tracks their status.
+
+    Every request gets a token, returned to the caller straight away, that can be
+    used to poll the status of the provisioning and the progress of the DAG of each
+    data contract while the provisioning runs on the given executor.
+    """
+
+    def __init__(self, task_repository: TaskRepository, executor: Executor):
+        self.task_repository = task_repository
+        self.executor = executor
+        self.logger = get_logger(__name__)
+
+    def submit(
+        self,
+        provision_service: ProvisionService,
+        descriptor: ParsedDescriptor,
+        workload: GXGuardianWorkload,
+        data_contracts: list[GXComponent],
+        portal: BlockingPortal | None = None,
+    ) -> str:
+        """
+        Submits the provisioning to the executor and returns its token. When a `portal`
+        to the event loop is given, the DAGs are uploaded on that event loop.
+        """
+        token = str(uuid.uuid4())
+        self.task_repository.create_task(
+            ProvisioningTask(
+                token=token,
+                status=Status1.RUNNING,
+                dataContracts={
+                    data_contract.get_id(): DagProgress.PENDING
+                    for data_contract in data_contracts
+                },
+            )
+        )
+        self.logger.info(
+            "Provisioning of component %s submitted with token %s",
+            descriptor.component_id,
+            token,
+        )
+        # run in the context of the request, e.g. to label the metrics with its route
+        # and to trace the provisioning as part of the request
+        self.executor.submit(
+            contextvars.copy_context().run,
+            self._run,
+            token,
+            provision_service,
+            descriptor,
+            workload,
+            data_contracts,
+            portal,
+        )
+        return token
+
+    def _run(
+        self,
+        token: str,
+        provision_service: ProvisionService,
+        descriptor: ParsedDescriptor,
+        workload: GXGuardianWorkload,
+        data_contracts: list[GXComponent],
+        portal: BlockingPortal | None = None,
+    ) -> None:
+        def on_progress(data_contract_id: str, progress: DagProgress) -> None:
+            self.task_repository.set_dag_progress(token, data_contract_id, progress)
+
+        with start_span(
+            "provision",
+            {
+                COMPONENT_ID: descriptor.component_id,
+                ENVIRONMENT: descriptor.data_product.environment,
+                DAG_COUNT: len(data_contracts),
+            },
+        ) as span:
+            try:
+                res = provision_service.provision(
+                    descriptor, workload, data_contracts, on_progress, portal
+                )
+            except Exception as ex:
+                set_error(span, ex)
+                error_msg = f"An unexpected error occurred while provisioning the component {descriptor.component_id}. Details: {str(ex)}"  # noqa: E501
+                self.logger.exception(error_msg)
+                self.task_repository.complete_task(token, Status1.FAILED, error_msg)
+                return
+        if isinstance(res, SystemErr):
+            self.task_repository.complete_task(token, Status1.FAILED, res.error)
+        else:
+            self.task_repository.complete_task(
+                token,
+                res.status,
+                res.result,
+                res.info.privateInfo if res.info is not None else None,
+            )
+        self.logger.info("Provisioning with token %s is over", token)
+
+    def get_status(self, token: str) -> ProvisioningStatus | ValidationError:
+        task = self.task_repository.get_task(token)
+        if task is None:
+            return ValidationError(errors=[f"Unknown provisioning token: {token}"])
+        return ProvisioningStatus(
+            status=task.status,
+            result=task.result,
+            info=Info(
+                publicInfo=dict(),
+                privateInfo={
+                    **(task.privateInfo or dict()),
+                    "dataContracts": dict(task.dataContracts),
+                },
+            ),
+        )
@@ -1,14 +1,29 @@
+import hashlib
+import os
+from functools import lru_cache
 from typing import Any
 
 from jinja2 import (
+    BytecodeCache,
     Environment,
+    FileSystemBytecodeCache,
     PackageLoader,
     Template,
     TemplateNotFound,
     select_autoescape,
 )
 
+from src.settings.template_settings import TemplateSettings
 from src.utility.logger import get_logger
+from src.utility.metrics import RENDER_TEMPLATE_SECONDS
+from src.utility.tracing import (
+    COMPONENT_ID,
+    DATA_CONTRACT_ID,
+    ENVIRONMENT,
+    PAYLOAD_SIZE,
+    TEMPLATE,
+    start_span,
+)
 
 
 class TemplateServiceError:
@@ -16,20 +31,101 @@ class TemplateServiceError:
         self.error_msg = error_msg
 
 
+@lru_cache
+def _get_environment(cache_size: int, bytecode_cache_dir: str | None) -> Environment:
+    """
+    Returns the Jinja environment shared by the whole process. The environment keeps
+    up to `cache_size` compiled templates in memory and, when `bytecode_cache_dir` is
+    set, persists the compiled bytecode there so that new workers start with
+    already compiled templates. Templates are shipped with the package, so they are
+    never checked for changes once loaded.
+    """
+    bytecode_cache: BytecodeCache | None = None
+    if bytecode_cache_dir is not None:
+        os.makedirs(bytecode_cache_dir, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+    return Environment(
+        loader=PackageLoader("src"),
+        autoescape=select_autoescape(),
+        cache_size=cache_size,
+        bytecode_cache=bytecode_cache,
+        auto_reload=False,
+    )
+
+
+@lru_cache
+def _get_template_digest(env: Environment, template_name: str) -> str:
+    """
+    Returns the SHA-256 of the source of a template. Templates are never reloaded, so
+    the digest is computed once per template.
+    """
+    source, _, _ = env.loader.get_source(env, template_name)  # type: ignore[union-attr]
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
 class TemplateService:
-    def __init__(self):
+    def __init__(self, template_settings: TemplateSettings | None = None):
+        self.template_settings = (
+            template_settings if template_settings is not None else TemplateSettings()
+        )
+        self.env = _get_environment(
+            self.template_settings.cache_size,
+            self.template_settings.bytecode_cache_dir,
+        )
         self.logger = get_logger(__name__)
 
-    def _get_template(self, technology: str) -> Template:
-        env = Environment(loader=PackageLoader("src"), autoescape=select_autoescape())
-        return env.get_template(f"{technology.casefold()}.jinja")
+    def precompile(self) -> None:
+        """
+        Loads all the templates available in `src/templates`, so that they are
+        compiled and cached before the first render.
+        """
+        for template_name in self.env.list_templates(extensions=["jinja"]):
+            self.logger.info("Precompiling template %s", template_name)
+            self.env.get_template(template_name)
+
+    def _get_template_name(self, technology: str, grouped: bool = False) -> str:
+        return f"{technology.casefold()}{'_grouped' if grouped else ''}.jinja"
+
+    def _get_template(self, technology: str, grouped: bool = False) -> Template:
+        return self.env.get_template(self._get_template_name(technology, grouped))
+
+    def get_template_digest(
+        self, technology: str, grouped: bool = False
+    ) -> str | TemplateServiceError:
+        """
+        Returns the SHA-256 of the source of the template used for the given
+        technology, which identifies the version of the template. When `grouped` is
+        True, it is the template of the DAGs evaluating many data contracts.
+        """
+        try:
+            return _get_template_digest(
+                self.env, self._get_template_name(technology, grouped)
+            )
+        except TemplateNotFound:
+            error_msg = f"Template not found for technology '{technology}'"
+            self.logger.exception(error_msg)
+            return TemplateServiceError(error_msg)
 
     def render_template(
-        self, technology: str, parameters: dict[str, Any]
+        self, technology: str, parameters: dict[str, Any], grouped: bool = False
     ) -> str | TemplateServiceError:
         try:
-            template = self._get_template(technology)
-            return template.render(parameters)
+            template_name = self._get_template_name(technology, grouped)
+            template = self._get_template(technology, grouped)
+            with RENDER_TEMPLATE_SECONDS.labels(template_name).time(), start_span(
+                "render_template",
+                {
+                    TEMPLATE: template_name,
+                    # the grouped DAGs are rendered for a guardian
+                    (COMPONENT_ID if grouped else DATA_CONTRACT_ID): parameters.get(
+                        "guardian_id" if grouped else "data_contract_id", ""
+                    ),
+                    ENVIRONMENT: parameters.get("environment", ""),
+                },
+            ) as span:
+                rendered = template.render(parameters)
+                span.set_attribute(PAYLOAD_SIZE, len(rendered))
+                return rendered
         except TemplateNotFound:
             error_msg = f"Template not found for technology '{technology}'"
             self.logger.exception(error_msg)
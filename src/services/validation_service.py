@@ -1,24 +1,46 @@
+from functools import lru_cache
 from typing import Annotated, Tuple
 
 import pydantic
 from fastapi import Depends
 
-from src.dependencies import UnpackedProvisioningRequestDep
-from src.models.api_models import ValidationError
-from src.models.data_product_descriptor import DataProduct
+from src.dependencies import (
+    UnpackedProvisioningRequestDep,
+    get_validation_executor,
+    get_validation_settings,
+    parse_component_descriptor,
+)
+from src.models.api_models import ValidationError, ValidationResult
 from src.models.gx_models import GXComponent, GXGuardianWorkload, SnowflakeOutputPort
+from src.models.parsed_descriptor import ParsedDescriptor
+from src.services.validation_task_service import ValidationTaskService
 from src.utility.logger import get_logger
+from src.utility.metrics import VALIDATE_COMPONENTS_SECONDS
+from src.utility.tracing import COMPONENT_ID, ENVIRONMENT, start_span
 
 logger = get_logger(__name__)
 
 
 def validate_components(
     request: UnpackedProvisioningRequestDep,
-) -> Tuple[DataProduct, GXGuardianWorkload, list[GXComponent]] | ValidationError:
+) -> Tuple[ParsedDescriptor, GXGuardianWorkload, list[GXComponent]] | ValidationError:
     if isinstance(request, ValidationError):
         return request
+    with VALIDATE_COMPONENTS_SECONDS.time(), start_span(
+        "validate_components",
+        {
+            COMPONENT_ID: request.component_id,
+            ENVIRONMENT: request.data_product.environment,
+        },
+    ):
+        return _validate_components(request)
 
-    data_product, component_id = request
+
+def _validate_components(
+    request: ParsedDescriptor,
+) -> Tuple[ParsedDescriptor, GXGuardianWorkload, list[GXComponent]] | ValidationError:
+
+    data_product, component_id = request.data_product, request.component_id
 
     try:
         component_to_provision: GXGuardianWorkload = (
@@ -45,14 +67,14 @@ def validate_components(
         logger.error(error_msg)
         return ValidationError(errors=[error_msg])
 
+    guarded_data_contract_ids = {
+        guard.dataContractId
+        for guard in component_to_provision.dataContractGuardianSpec.guards
+    }
     data_contract_components_to_guard = [
         cmp
         for cmp in data_product.get_data_contract_components()
-        if cmp.id
-        in map(
-            lambda x: x.dataContractId,
-            component_to_provision.dataContractGuardianSpec.guards,
-        )
+        if cmp.id in guarded_data_contract_ids
     ]
 
     len_components_to_guard = len(
@@ -67,7 +89,14 @@ def validate_components(
     try:
         # at the moment only snowflake ops are supported
         snowflake_output_ports: list[GXComponent] = [
-            SnowflakeOutputPort.model_validate(dc_cmp.model_dump(by_alias=True))
+            (
+                dc_cmp
+                if isinstance(dc_cmp, SnowflakeOutputPort)
+                # not parsed as a SnowflakeOutputPort: validate it again to report why
+                else SnowflakeOutputPort.model_validate(
+                    dc_cmp.model_dump(by_alias=True)
+                )
+            )
             for dc_cmp in data_contract_components_to_guard
         ]
     except pydantic.ValidationError as ve:
@@ -87,10 +116,33 @@ def validate_components(
         )
         return ValidationError(errors=combined)
 
-    return data_product, component_to_provision, snowflake_output_ports
+    return request, component_to_provision, snowflake_output_ports
 
 
 ValidateComponentsDep = Annotated[
-    Tuple[DataProduct, GXGuardianWorkload, list[GXComponent]] | ValidationError,
+    Tuple[ParsedDescriptor, GXGuardianWorkload, list[GXComponent]] | ValidationError,
     Depends(validate_components),
 ]
+
+
+def validate_descriptor(descriptor: str) -> ValidationResult:
+    """
+    Validates a descriptor of kind `DescriptorKind.COMPONENT_DESCRIPTOR` in YAML format
+    with the same checks applied to the provisioning requests.
+    """
+    res = validate_components(parse_component_descriptor(descriptor))
+    if isinstance(res, ValidationError):
+        return ValidationResult(valid=False, error=res)
+    return ValidationResult(valid=True)
+
+
+@lru_cache
+def get_validation_task_service() -> ValidationTaskService:
+    return ValidationTaskService(
+        validate_descriptor, get_validation_executor(), get_validation_settings()
+    )
+
+
+ValidationTaskServiceDep = Annotated[
+    ValidationTaskService, Depends(get_validation_task_service)
+]
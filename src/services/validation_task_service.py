@@ -0,0 +1,105 @@
+import contextvars
+import hashlib
+import uuid
+from concurrent.futures import Executor
+from typing import Callable
+
+from src.models.api_models import (
+    Status,
+    ValidationError,
+    ValidationResult,
+    ValidationStatus,
+)
+from src.settings.validation_settings import ValidationSettings
+from src.utility.logger import get_logger
+from src.utility.lru_ttl_cache import LruTtlCache
+
+# Validates a descriptor in YAML format
+DescriptorValidator = Callable[[str], ValidationResult]
+
+
+class ValidationTaskService:
+    """
+    Runs the validation requests in the background and tracks their status by token.
+
+    Validation results are memoized by the SHA-256 digest of the descriptor, so that
+    retries and repeated validations of the same descriptor complete immediately
+    without being submitted to the executor.
+    """
+
+    def __init__(
+        self,
+        validator: DescriptorValidator,
+        executor: Executor,
+        validation_settings: ValidationSettings | None = None,
+    ):
+        self.validator = validator
+        self.executor = executor
+        self.validation_settings = (
+            validation_settings
+            if validation_settings is not None
+            else ValidationSettings()
+        )
+        self.results: LruTtlCache[str, ValidationResult] = LruTtlCache(
+            self.validation_settings.cache_max_entries,
+            self.validation_settings.cache_ttl_seconds,
+        )
+        self.statuses: LruTtlCache[str, ValidationStatus] = LruTtlCache(
+            self.validation_settings.status_max_entries,
+            self.validation_settings.status_ttl_seconds,
+        )
+        self.logger = get_logger(__name__)
+
+    def submit(self, descriptor: str) -> str:
+        token = str(uuid.uuid4())
+        descriptor_digest = hashlib.sha256(descriptor.encode("utf-8")).hexdigest()
+        result = self.results.get(descriptor_digest)
+        self.logger.info(
+            "Validation cache %s for token %s (hits: %d, misses: %d)",
+            "hit" if result is not None else "miss",
+            token,
+            self.results.hits,
+            self.results.misses,
+        )
+        if result is not None:
+            self.statuses.put(
+                token, ValidationStatus(status=Status.COMPLETED, result=result)
+            )
+            return token
+        self.statuses.put(token, ValidationStatus(status=Status.RUNNING))
+        # run in the context of the request, e.g. to label the metrics with its route
+        self.executor.submit(
+            contextvars.copy_context().run,
+            self._run,
+            token,
+            descriptor_digest,
+            descriptor,
+        )
+        return token
+
+    def _run(self, token: str, descriptor_digest: str, descriptor: str) -> None:
+        try:
+            result = self.validator(descriptor)
+        except Exception as ex:
+            error_msg = f"An unexpected error occurred while validating the descriptor. Details: {str(ex)}"  # noqa: E501
+            self.logger.exception(error_msg)
+            self.statuses.put(
+                token,
+                ValidationStatus(
+                    status=Status.FAILED,
+                    result=ValidationResult(
+                        valid=False, error=ValidationError(errors=[error_msg])
+                    ),
+                ),
+            )
+            return
+        self.results.put(descriptor_digest, result)
+        self.statuses.put(
+            token, ValidationStatus(status=Status.COMPLETED, result=result)
+        )
+
+    def get_status(self, token: str) -> ValidationStatus | ValidationError:
+        status = self.statuses.get(token)
+        if status is None:
+            return ValidationError(errors=[f"Unknown validation token: {token}"])
+        return status
@@ -1,8 +1,20 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class AirflowSettings(BaseSettings):
     connection_id: str
+    # "ephemeral" bootstraps a new GX data context on every DAG run, "file" reuses the
+    # GX objects persisted in a file-backed context under gx_context_root_dir
+    gx_context_mode: Literal["ephemeral", "file"] = "ephemeral"
+    gx_context_root_dir: str = "/opt/airflow/gx"
+    # "virtualenv" runs the DAG tasks in a virtualenv created on every run, unless
+    # venv_cache_path is set, "external_python" runs them with the pre-built
+    # interpreter at python_executable, that must provide the task requirements
+    task_python: Literal["virtualenv", "external_python"] = "virtualenv"
+    python_executable: str | None = None
+    venv_cache_path: str | None = None
 
     model_config = SettingsConfigDict(
         env_file=".env", env_prefix="airflow_", extra="ignore"
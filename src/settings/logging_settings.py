@@ -0,0 +1,22 @@
+from typing import Literal
+
+from pydantic import Field, NonNegativeInt
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class LoggingSettings(BaseSettings):
+    level: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = "INFO"
+    # "text" writes a line per record, "json" a JSON object per record
+    format: Literal["text", "json"] = "text"
+    # write the records from a background thread instead of the logging threads
+    queue: bool = True
+    # maximum number of bytes of request and response bodies written to the logs
+    body_max_bytes: NonNegativeInt = 4096
+    # fraction of the requests whose bodies are logged
+    body_sample_rate: float = Field(default=1.0, ge=0.0, le=1.0)
+    # requests whose path matches this pattern are logged without bodies
+    body_excluded_paths: str = r"^/(health|metrics)|/status$"
+
+    model_config = SettingsConfigDict(
+        env_file=".env", env_prefix="log_", extra="ignore"
+    )
@@ -0,0 +1,26 @@
+from typing import Literal
+
+from pydantic import PositiveInt
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class ProvisionSettings(BaseSettings):
+    max_concurrency: PositiveInt = 8
+    # "component" embeds in each DAG only the slice of the data contract component
+    # needed to evaluate it, "full" embeds the whole provisioning descriptor
+    descriptor_embedding: Literal["component", "full"] = "component"
+    # render only the DAGs whose inputs changed since the last provisioning, and delete
+    # the DAGs of the data contracts not guarded anymore
+    incremental: bool = True
+    # look for DAGs left in the DAG folder by data contracts of the data product that
+    # are not guarded anymore: "dry_run" only reports them, "delete" deletes them
+    reconcile: Literal["off", "dry_run", "delete"] = "off"
+    # "data_contract" publishes a DAG per data contract, "guardian" publishes a single
+    # DAG per guardian, whose mapped tasks evaluate up to group_batch_size data
+    # contracts each
+    dag_grouping: Literal["data_contract", "guardian"] = "data_contract"
+    group_batch_size: PositiveInt = 25
+
+    model_config = SettingsConfigDict(
+        env_file=".env", env_prefix="provision_", extra="ignore"
+    )
@@ -1,9 +1,19 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class S3DagSettings(BaseSettings):
     bucket_name: str
     folder: str
+    max_pool_connections: int = 10
+    tcp_keepalive: bool = True
+    retry_mode: Literal["legacy", "standard", "adaptive"] = "standard"
+    max_attempts: int = 3
+    skip_unchanged: bool = True
+    # S3 calls in flight at the same time through the asynchronous DAG repository,
+    # above the 40 threads Starlette runs the synchronous handlers on
+    async_max_concurrency: int = 100
 
     model_config = SettingsConfigDict(
         env_file=".env", env_prefix="s3_dag_", extra="ignore"
@@ -0,0 +1,21 @@
+from typing import Literal
+
+from pydantic import PositiveFloat, PositiveInt
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class TaskSettings(BaseSettings):
+    # "memory" keeps the provisioning tasks in the process, "sqlite" in a local
+    # database file so that they survive restarts
+    store: Literal["memory", "sqlite"] = "memory"
+    sqlite_path: str = "provisioning_tasks.db"
+    max_workers: PositiveInt = 4
+    # seconds the status of a provisioning is kept: with "memory", from its start,
+    # with "sqlite", from its completion
+    ttl_seconds: PositiveFloat = 86400
+    # maximum number of provisionings whose status is kept with "memory"
+    max_entries: PositiveInt = 1024
+
+    model_config = SettingsConfigDict(
+        env_file=".env", env_prefix="task_", extra="ignore"
+    )
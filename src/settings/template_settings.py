@@ -0,0 +1,12 @@
+from pydantic import NonNegativeInt
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class TemplateSettings(BaseSettings):
+    cache_size: NonNegativeInt = 50
+    precompile: bool = True
+    bytecode_cache_dir: str | None = None
+
+    model_config = SettingsConfigDict(
+        env_file=".env", env_prefix="template_", extra="ignore"
+    )
@@ -0,0 +1,16 @@
+from pydantic import PositiveFloat, PositiveInt
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class ValidationSettings(BaseSettings):
+    # validation results memoized by descriptor digest
+    cache_max_entries: PositiveInt = 256
+    cache_ttl_seconds: PositiveFloat = 600
+    # status of the validation requests, by token
+    status_max_entries: PositiveInt = 1024
+    status_ttl_seconds: PositiveFloat = 3600
+    max_workers: PositiveInt = 2
+
+    model_config = SettingsConfigDict(
+        env_file=".env", env_prefix="validation_", extra="ignore"
+    )
@@ -0,0 +1,13 @@
+from typing import Literal
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class YamlSettings(BaseSettings):
+    # "auto" uses the libyaml based loader when available and falls back to the
+    # pure-Python one, "libyaml" and "python" force the respective loader
+    loader: Literal["auto", "libyaml", "python"] = "auto"
+
+    model_config = SettingsConfigDict(
+        env_file=".env", env_prefix="yaml_", extra="ignore"
+    )
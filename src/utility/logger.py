@@ -1,13 +1,89 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+from threading import Lock
+
+from src.settings.logging_settings import LoggingSettings
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s - %(message)s"
+LOG_DATE_FORMAT = "%d-%b-%y %H:%M"
+
+_configure_lock = Lock()
+_queue_listener: logging.handlers.QueueListener | None = None
+_configured = False
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats each record as a single line JSON object"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        log = {
+            "timestamp": self.formatTime(record, "%Y-%m-%dT%H:%M:%S%z"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            log["exception"] = self.formatException(record.exc_info)
+        return json.dumps(log, default=str)
+
+
+def configure_logging(logging_settings: LoggingSettings | None = None) -> None:
+    """
+    Configures the root logger of the process. Only the first call has effect, so it
+    is cheap to call it whenever a logger is needed.
+
+    When `queue` is enabled in the settings, the root logger only enqueues the records,
+    which are formatted and written by a background thread, so that the threads
+    serving the requests never block on the log output.
+    """
+    global _configured, _queue_listener
+    if _configured:
+        return
+    with _configure_lock:
+        if _configured:
+            return
+        logging_settings = (
+            logging_settings if logging_settings is not None else LoggingSettings()
+        )
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(
+            JsonFormatter()
+            if logging_settings.format == "json"
+            else logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT)
+        )
+        handler: logging.Handler = stream_handler
+        if logging_settings.queue:
+            log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+            handler = logging.handlers.QueueHandler(log_queue)
+            _queue_listener = logging.handlers.QueueListener(
+                log_queue, stream_handler, respect_handler_level=True
+            )
+            _queue_listener.start()
+            atexit.register(stop_logging)
+        root_logger = logging.getLogger()
+        for existing_handler in root_logger.handlers[:]:
+            root_logger.removeHandler(existing_handler)
+        root_logger.addHandler(handler)
+        root_logger.setLevel(logging_settings.level)
+        _configured = True
+
+
+def stop_logging() -> None:
+    """
+    Writes the records still in the queue and stops the background thread writing
+    them. It is called when the process exits.
+    """
+    global _queue_listener
+    with _configure_lock:
+        if _queue_listener is not None:
+            _queue_listener.stop()
+            _queue_listener = None
 
 
 def get_logger(name=""):
-    default_log_args = {
-        "level": logging.INFO,
-        "format": "%(asctime)s [%(levelname)s] %(name)s - %(message)s",
-        "datefmt": "%d-%b-%y %H:%M",
-        "force": True,
-    }
-    logging.basicConfig(**default_log_args)
-    logger = logging.getLogger(name)
-    return logger
+    configure_logging()
+    return logging.getLogger(name)
@@ -0,0 +1,108 @@
+import random
+import re
+import uuid
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.settings.logging_settings import LoggingSettings
+from src.utility.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class _BodyCapture:
+    """
+    Keeps the first `max_bytes` bytes of a body streamed in chunks, while counting
+    its total size.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.chunks: list[bytes] = []
+        self.captured = 0
+        self.size = 0
+
+    def add(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.captured < self.max_bytes:
+            chunk = chunk[: self.max_bytes - self.captured]
+            self.chunks.append(chunk)
+            self.captured += len(chunk)
+
+    def __str__(self) -> str:
+        body = b"".join(self.chunks).decode("utf-8", errors="replace")
+        if self.size > self.captured:
+            return f"{body}... [truncated, {self.size} bytes]"
+        return body
+
+
+class RequestResponseLoggingMiddleware:
+    """
+    ASGI middleware that logs every request and its response.
+
+    Bodies are not buffered: chunks are passed through as they are received or sent,
+    and only the first `body_max_bytes` bytes of each body are kept for the logs.
+    Bodies are logged for a `body_sample_rate` fraction of the requests, and never for
+    the paths matching `body_excluded_paths`, e.g. health and status checks.
+    """
+
+    def __init__(self, app: ASGIApp, logging_settings: LoggingSettings):
+        self.app = app
+        self.logging_settings = logging_settings
+        self.excluded_paths = re.compile(logging_settings.body_excluded_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = str(uuid.uuid4())
+        method, path = scope["method"], scope["path"]
+        if not self._should_log_bodies(path):
+            status_code: int | None = None
+
+            async def send_status(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_status)
+            finally:
+                logger.info("[%s] %s %s -> %s", request_id, method, path, status_code)
+            return
+
+        request_body = _BodyCapture(self.logging_settings.body_max_bytes)
+        response_body = _BodyCapture(self.logging_settings.body_max_bytes)
+        response_status: int | None = None
+
+        async def receive_and_capture() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                request_body.add(message.get("body", b""))
+            return message
+
+        async def send_and_capture(message: Message) -> None:
+            nonlocal response_status
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_body.add(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_and_capture, send_and_capture)
+        finally:
+            logger.info(
+                "[%s] REQUEST: %s %s %s", request_id, method, path, request_body
+            )
+            logger.info(
+                "[%s] RESPONSE: %s %s", request_id, response_status, response_body
+            )
+
+    def _should_log_bodies(self, path: str) -> bool:
+        if self.excluded_paths.search(path):
+            return False
+        sample_rate = self.logging_settings.body_sample_rate
+        return sample_rate >= 1.0 or random.random() < sample_rate
@@ -0,0 +1,70 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LruTtlCache(Generic[K, V]):
+    """
+    A thread-safe cache bounded both in size and in time.
+
+    When the cache is full, the least recently used entry is evicted to make room for
+    a new one. Entries older than `ttl_seconds` are considered missing and are evicted
+    when they are found. The number of hits and misses is tracked to monitor the
+    effectiveness of the cache.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        # key -> (expiration time, value), from the least to the most recently used
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: K, value: V) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def values(self) -> list[V]:
+        """
+        Returns the values of the entries not expired, without affecting their
+        recency or the number of hits and misses.
+        """
+        with self._lock:
+            now = self._clock()
+            return [
+                value
+                for expiration, value in self._entries.values()
+                if expiration > now
+            ]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,135 @@
+import os
+from contextvars import ContextVar
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.multiprocess import MultiProcessCollector
+
+# Directory shared by the worker processes when the service runs with many of them
+MULTIPROCESS_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+# From 0.5ms to 10s, to tell apart the stages of small and large descriptors
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+# From 1KiB to 16MiB
+SIZE_BUCKETS = tuple(float(1024 * 4**exponent) for exponent in range(8))
+
+# Route of the request being served, set by the `MetricsMiddleware`
+_endpoint: ContextVar[str] = ContextVar("endpoint", default="")
+
+DESCRIPTOR_PARSE_SECONDS = Histogram(
+    "gx_guardian_descriptor_parse_seconds",
+    "Time spent parsing the YAML of the descriptors",
+    buckets=LATENCY_BUCKETS,
+)
+DATA_PRODUCT_VALIDATION_SECONDS = Histogram(
+    "gx_guardian_data_product_validation_seconds",
+    "Time spent validating the data products of the descriptors",
+    buckets=LATENCY_BUCKETS,
+)
+VALIDATE_COMPONENTS_SECONDS = Histogram(
+    "gx_guardian_validate_components_seconds",
+    "Time spent validating the guardian and the data contracts it guards",
+    buckets=LATENCY_BUCKETS,
+)
+RENDER_TEMPLATE_SECONDS = Histogram(
+    "gx_guardian_render_template_seconds",
+    "Time spent rendering a DAG",
+    ["template"],
+    buckets=LATENCY_BUCKETS,
+)
+S3_REQUEST_SECONDS = Histogram(
+    "gx_guardian_s3_request_seconds",
+    "Time spent waiting for the S3 requests writing and deleting the DAGs",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+S3_PUT_OBJECT_SECONDS = S3_REQUEST_SECONDS.labels("put_object")
+S3_DELETE_OBJECT_SECONDS = S3_REQUEST_SECONDS.labels("delete_object")
+S3_DELETE_OBJECTS_SECONDS = S3_REQUEST_SECONDS.labels("delete_objects")
+DESCRIPTOR_SIZE_BYTES = Histogram(
+    "gx_guardian_descriptor_size_bytes",
+    "Size of the descriptors received",
+    ["endpoint", "environment"],
+    buckets=SIZE_BUCKETS,
+)
+DAGS_TOTAL = Counter(
+    "gx_guardian_dags",
+    "DAGs written, skipped as unchanged and deleted",
+    ["outcome", "endpoint", "environment"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "gx_guardian_requests_in_progress",
+    "Requests being served",
+    ["endpoint"],
+    # the requests in progress of the live worker processes are summed up
+    multiprocess_mode="livesum",
+)
+
+
+def set_endpoint(endpoint: str) -> None:
+    _endpoint.set(endpoint)
+
+
+def get_endpoint() -> str:
+    """
+    Returns the route of the request being served, also from the background tasks
+    submitted while serving it, or an empty string outside of a request.
+    """
+    return _endpoint.get()
+
+
+def observe_descriptor_size(descriptor: str, environment: str) -> None:
+    DESCRIPTOR_SIZE_BYTES.labels(get_endpoint(), environment).observe(
+        len(descriptor.encode("utf-8"))
+    )
+
+
+def count_dags(
+    environment: str, written: int = 0, skipped: int = 0, deleted: int = 0
+) -> None:
+    endpoint = get_endpoint()
+    for outcome, count in (
+        ("written", written),
+        ("skipped", skipped),
+        ("deleted", deleted),
+    ):
+        if count:
+            DAGS_TOTAL.labels(outcome, endpoint, environment).inc(count)
+
+
+def generate_metrics() -> tuple[bytes, str]:
+    """
+    Returns the metrics in the Prometheus text format, with their content type.
+
+    When the service runs with many worker processes, `PROMETHEUS_MULTIPROC_DIR` must
+    point to a folder shared by all of them and emptied before they start: the metrics
+    are then aggregated from the files each process writes there, so that the same
+    values are returned whichever process serves the scrape.
+    """
+    registry = REGISTRY
+    if MULTIPROCESS_DIR_ENV in os.environ:
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,44 @@
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.utility.metrics import REQUESTS_IN_PROGRESS, set_endpoint
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that tracks the requests in progress by endpoint.
+
+    The endpoint is the path template of the matched route, e.g.
+    `/v1/provision/{token}/status`, so that the tokens do not end up in the labels.
+    It is also made available to the code serving the request through
+    `src.utility.metrics.get_endpoint`. Requests not matching any route are not
+    tracked.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        endpoint = self._get_endpoint(scope)
+        if endpoint is None:
+            await self.app(scope, receive, send)
+            return
+
+        set_endpoint(endpoint)
+        in_progress = REQUESTS_IN_PROGRESS.labels(endpoint)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            in_progress.dec()
+
+    def _get_endpoint(self, scope: Scope) -> str | None:
+        for route in scope["app"].routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+        return None
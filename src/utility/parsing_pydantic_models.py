@@ -1,10 +1,10 @@
 from typing import Type, TypeVar
 
-import yaml
 from pydantic import BaseModel
 
 from src.models.api_models import ValidationError
 from src.utility.logger import get_logger
+from src.utility.yaml_loader import safe_load
 
 logger = get_logger()
 
@@ -57,7 +57,7 @@ def parse_yaml_with_model(yaml_data: dict | str, model: Type[T]) -> T | Validati
     """  # noqa: E501
     try:
         if isinstance(yaml_data, str):
-            yaml_dict = yaml.safe_load(yaml_data)
+            yaml_dict = safe_load(yaml_data)
         else:
             yaml_dict = yaml_data
 
@@ -0,0 +1,67 @@
+from contextlib import AbstractContextManager, nullcontext
+from functools import lru_cache
+
+from opentelemetry import trace
+from opentelemetry.trace import (
+    INVALID_SPAN,
+    NoOpTracerProvider,
+    ProxyTracerProvider,
+    Span,
+    StatusCode,
+    Tracer,
+    TracerProvider,
+)
+from opentelemetry.util.types import Attributes
+
+# Span attributes
+DATA_CONTRACT_ID = "gx_guardian.data_contract_id"
+COMPONENT_ID = "gx_guardian.component_id"
+ENVIRONMENT = "deployment.environment"
+PAYLOAD_SIZE = "gx_guardian.payload_size"
+UPLOAD_SKIPPED = "gx_guardian.upload_skipped"
+TEMPLATE = "gx_guardian.template"
+S3_BUCKET = "aws.s3.bucket"
+S3_KEY = "aws.s3.key"
+DAG_COUNT = "gx_guardian.dag_count"
+
+
+@lru_cache
+def _get_tracer(tracer_provider: TracerProvider) -> Tracer:
+    return tracer_provider.get_tracer(__name__)
+
+
+def start_span(
+    name: str, attributes: Attributes = None
+) -> AbstractContextManager[Span]:
+    """
+    Starts a span, child of the current one, and makes it the current span until the
+    returned context manager exits.
+
+    Tracing is enabled by starting the service with `opentelemetry-instrument`, which
+    sets up the tracer provider. When it is not, no span is created and the returned
+    context manager yields a non-recording span, so that the instrumented code only
+    pays for a function call.
+
+    Args:
+        name (str): the name of the span
+        attributes (Attributes): the attributes of the span known when it starts,
+            more can be set on the yielded span
+
+    Returns:
+        AbstractContextManager[Span]: the context manager of the span
+    """
+    tracer_provider = trace.get_tracer_provider()
+    if isinstance(tracer_provider, (ProxyTracerProvider, NoOpTracerProvider)):
+        return nullcontext(INVALID_SPAN)
+    return _get_tracer(tracer_provider).start_as_current_span(
+        name, attributes=attributes
+    )
+
+
+def set_error(span: Span, exception: BaseException) -> None:
+    """
+    Marks a span as failed because of an exception that has been handled, since only
+    the exceptions escaping the span are recorded automatically.
+    """
+    span.record_exception(exception)
+    span.set_status(StatusCode.ERROR, str(exception))
@@ -0,0 +1,50 @@
+from functools import lru_cache
+from typing import Any, Type
+
+import yaml
+
+from src.settings.yaml_settings import YamlSettings
+from src.utility.logger import get_logger
+
+logger = get_logger()
+
+
+def get_loader_class(loader: str) -> Type[yaml.SafeLoader] | Type[yaml.CSafeLoader]:
+    """
+    Returns the safe YAML loader class matching the `loader` setting.
+
+    Args:
+        loader (str): "auto", "libyaml" or "python".
+
+    Returns:
+        The C-accelerated `yaml.CSafeLoader` if PyYAML has been built with libyaml and
+        `loader` is "auto" or "libyaml", the pure-Python `yaml.SafeLoader` otherwise.
+
+    Raises:
+        RuntimeError: If `loader` is "libyaml" but PyYAML has been built without libyaml.
+    """  # noqa: E501
+    if loader == "python":
+        return yaml.SafeLoader
+    if yaml.__with_libyaml__:
+        return yaml.CSafeLoader
+    if loader == "libyaml":
+        raise RuntimeError(
+            "The libyaml YAML loader has been requested, but PyYAML has been built without libyaml"  # noqa: E501
+        )
+    logger.warning(
+        "libyaml is not available, falling back to the pure-Python YAML loader"
+    )
+    return yaml.SafeLoader
+
+
+@lru_cache
+def _get_configured_loader_class() -> Type[yaml.SafeLoader] | Type[yaml.CSafeLoader]:
+    return get_loader_class(YamlSettings().loader)
+
+
+def safe_load(stream: str) -> Any:
+    """
+    Parses a YAML document like `yaml.safe_load`, using the loader selected through
+    the `YAML_LOADER` setting.
+    """
+    return yaml.load(stream, Loader=_get_configured_loader_class())
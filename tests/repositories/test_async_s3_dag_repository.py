@@ -0,0 +1,187 @@
+import threading
+import time
+from unittest.mock import Mock
+
+import anyio
+import pytest
+from botocore.exceptions import ClientError
+
+from src.repositories.async_s3_dag_repository import AsyncS3DagRepository
+from src.repositories.dag_repository import DagRepositoryError, DagWriteOutcome
+from src.repositories.s3_dag_repository import S3DagRepository, S3DagSettings
+
+environment = "environment"
+# default number of threads Starlette runs the synchronous handlers on
+REQUEST_THREADPOOL_SIZE = 40
+
+
+class SlowS3Client:
+    """
+    Local S3 stand-in whose uploads and deletions take `latency` seconds, tracking the
+    highest number of them in flight at the same time. When `barrier` is given, every
+    call waits for it, so that they only complete if enough of them are in flight
+    together.
+    """
+
+    def __init__(self, latency: float = 0.0, barrier: threading.Barrier | None = None):
+        self.latency = latency
+        self.barrier = barrier
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.keys: set[str] = set()
+        self._lock = threading.Lock()
+
+    def head_object(self, Bucket: str, Key: str) -> dict:
+        raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+
+    def put_object(self, Bucket: str, Key: str, **kwargs) -> dict:
+        self._call([Key])
+        return dict()
+
+    def delete_objects(self, Bucket: str, Delete: dict) -> dict:
+        self._call([s3_object["Key"] for s3_object in Delete["Objects"]])
+        return dict()
+
+    def _call(self, keys: list[str]) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        if self.barrier is not None:
+            self.barrier.wait()
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+            self.keys.update(keys)
+
+
+def _async_repository(s3_client, async_max_concurrency: int = 10):
+    return AsyncS3DagRepository(
+        S3DagRepository(
+            S3DagSettings(
+                bucket_name="bucket_name",
+                folder="dags",
+                async_max_concurrency=async_max_concurrency,
+            ),
+            s3_client,
+        )
+    )
+
+
+def test_default_concurrency_above_request_threadpool():
+    repository = AsyncS3DagRepository(
+        S3DagRepository(S3DagSettings(bucket_name="bucket_name", folder="dags"), Mock())
+    )
+
+    assert repository.limiter.total_tokens > REQUEST_THREADPOOL_SIZE
+
+
+@pytest.mark.asyncio
+async def test_create_or_update_dags_scales_past_request_threadpool():
+    # the uploads only complete if more of them than the threads of the request
+    # threadpool are in flight together
+    s3_client = SlowS3Client(
+        barrier=threading.Barrier(REQUEST_THREADPOOL_SIZE + 1, timeout=10)
+    )
+    repository = _async_repository(s3_client, async_max_concurrency=100)
+    dags = {
+        f"urn:dmb:cmp:dp:0:dc-{i}": "content"
+        for i in range(REQUEST_THREADPOOL_SIZE + 1)
+    }
+
+    outcomes = await repository.create_or_update_dags(dags, environment)
+
+    assert list(outcomes.keys()) == list(dags.keys())
+    assert set(outcomes.values()) == {DagWriteOutcome.WRITTEN}
+    assert len(s3_client.keys) == REQUEST_THREADPOOL_SIZE + 1
+
+
+@pytest.mark.asyncio
+async def test_create_or_update_dags_bounded_by_limiter():
+    s3_client = SlowS3Client(latency=0.01)
+    repository = _async_repository(s3_client, async_max_concurrency=5)
+    dags = {f"urn:dmb:cmp:dp:0:dc-{i}": "content" for i in range(20)}
+
+    await repository.create_or_update_dags(dags, environment)
+
+    assert 1 <= s3_client.max_in_flight <= 5
+    assert len(s3_client.keys) == 20
+
+
+@pytest.mark.asyncio
+async def test_create_or_update_dags_reports_errors():
+    s3_client = Mock()
+    s3_client.head_object.return_value = {"Metadata": {}}
+    s3_client.put_object.side_effect = [ValueError("error"), dict()]
+    repository = _async_repository(s3_client, async_max_concurrency=1)
+
+    outcomes = await repository.create_or_update_dags(
+        {"urn:dc:0": "content", "urn:dc:1": "content"}, environment
+    )
+
+    assert isinstance(outcomes["urn:dc:0"], DagRepositoryError)
+    assert outcomes["urn:dc:1"] == DagWriteOutcome.WRITTEN
+
+
+async def _delete_concurrently(repository: AsyncS3DagRepository, count: int) -> list:
+    results: list = []
+
+    async def delete(i: int) -> None:
+        results.append(
+            await repository.delete_dags([f"urn:dmb:cmp:dp:0:dc-{i}"], environment)
+        )
+
+    async with anyio.create_task_group() as task_group:
+        for i in range(count):
+            task_group.start_soon(delete, i)
+    return results
+
+
+@pytest.mark.asyncio
+async def test_delete_dags_scales_past_request_threadpool():
+    # the deletions only complete if more of them than the threads of the request
+    # threadpool are in flight together
+    s3_client = SlowS3Client(
+        barrier=threading.Barrier(REQUEST_THREADPOOL_SIZE + 1, timeout=10)
+    )
+    repository = _async_repository(s3_client, async_max_concurrency=100)
+
+    results = await _delete_concurrently(repository, REQUEST_THREADPOOL_SIZE + 1)
+
+    assert results == [None] * (REQUEST_THREADPOOL_SIZE + 1)
+    assert len(s3_client.keys) == REQUEST_THREADPOOL_SIZE + 1
+
+
+@pytest.mark.asyncio
+async def test_delete_dags_bounded_by_limiter():
+    s3_client = SlowS3Client(latency=0.01)
+    repository = _async_repository(s3_client, async_max_concurrency=5)
+
+    await _delete_concurrently(repository, 20)
+
+    assert 1 <= s3_client.max_in_flight <= 5
+    assert len(s3_client.keys) == 20
+
+
+@pytest.mark.asyncio
+async def test_delete_dags_error():
+    s3_client = Mock()
+    s3_client.delete_objects.side_effect = ValueError("error")
+    repository = _async_repository(s3_client)
+
+    res = await repository.delete_dags(["urn:dc:0"], environment)
+
+    assert isinstance(res, DagRepositoryError)
+    assert list(res.failed_dags.keys()) == ["urn:dc:0"]
+
+
+@pytest.mark.asyncio
+async def test_delete_dags_and_manifest():
+    s3_client = Mock()
+    s3_client.delete_objects.return_value = dict()
+    s3_client.delete_object.return_value = dict()
+    repository = _async_repository(s3_client)
+
+    assert await repository.delete_manifest("urn:guardian", environment) is None
+    assert await repository.delete_dags(["urn:dc:0"], environment) is None
+    s3_client.delete_object.assert_called_once()
+    s3_client.delete_objects.assert_called_once()
@@ -0,0 +1,78 @@
+from src.models.api_models import Status1
+from src.models.provisioning_task import DagProgress, ProvisioningTask
+from src.repositories.in_memory_task_repository import InMemoryTaskRepository
+
+
+def _running_task(token: str) -> ProvisioningTask:
+    return ProvisioningTask(
+        token=token,
+        status=Status1.RUNNING,
+        dataContracts={"dc1": DagProgress.PENDING, "dc2": DagProgress.PENDING},
+    )
+
+
+def test_get_task_unknown_token():
+    repository = InMemoryTaskRepository()
+
+    assert repository.get_task("unknown") is None
+
+
+def test_task_lifecycle():
+    repository = InMemoryTaskRepository()
+    repository.create_task(_running_task("token"))
+
+    repository.set_dag_progress("token", "dc1", DagProgress.WRITTEN)
+    repository.set_dag_progress("token", "dc2", DagProgress.SKIPPED)
+    repository.complete_task(
+        "token", Status1.COMPLETED, "", {"dags": {"written": 1, "skipped": 1}}
+    )
+
+    task = repository.get_task("token")
+    assert task is not None
+    assert task.status == Status1.COMPLETED
+    assert task.privateInfo == {"dags": {"written": 1, "skipped": 1}}
+    assert task.dataContracts == {
+        "dc1": DagProgress.WRITTEN,
+        "dc2": DagProgress.SKIPPED,
+    }
+
+
+def test_get_task_returns_a_copy():
+    repository = InMemoryTaskRepository()
+    repository.create_task(_running_task("token"))
+
+    task = repository.get_task("token")
+    assert task is not None
+    task.dataContracts["dc1"] = DagProgress.FAILED
+
+    stored_task = repository.get_task("token")
+    assert stored_task is not None
+    assert stored_task.dataContracts["dc1"] == DagProgress.PENDING
+
+
+def test_fail_orphaned_tasks():
+    repository = InMemoryTaskRepository()
+    repository.create_task(_running_task("running"))
+
+    # the tasks belong to the running process
+    assert repository.fail_orphaned_tasks("interrupted") == 0
+
+    running_task = repository.get_task("running")
+    assert running_task is not None
+    assert running_task.status == Status1.RUNNING
+
+
+def test_tasks_are_evicted():
+    now = [0.0]
+    repository = InMemoryTaskRepository(
+        max_entries=2, ttl_seconds=10, clock=lambda: now[0]
+    )
+    repository.create_task(_running_task("first"))
+    repository.create_task(_running_task("second"))
+    repository.create_task(_running_task("third"))
+
+    assert repository.get_task("first") is None
+    assert repository.get_task("second") is not None
+
+    now[0] = 10
+    assert repository.get_task("third") is None
@@ -1,11 +1,22 @@
+import hashlib
+import io
+import threading
 from unittest import mock
-from unittest.mock import call
+from unittest.mock import Mock
 
-from src.repositories.dag_repository import DagRepositoryError
-from src.repositories.s3_dag_repository import S3DagRepository, S3DagSettings
+import boto3
+from botocore.exceptions import ClientError
+from botocore.response import StreamingBody
+from botocore.stub import Stubber
+
+from src.repositories.dag_repository import DagRepositoryError, DagWriteOutcome
+from src.repositories.s3_dag_repository import (
+    S3DagRepository,
+    S3DagSettings,
+    create_s3_client,
+)
 
 s3_dag_settings = S3DagSettings(bucket_name="bucket_name", folder="dags")
-s3_dag_repository = S3DagRepository(s3_dag_settings)
 data_contract_id = (
     "urn:dmb:cmp:marketing:system-with-data-contract:0:consumable-data-contract"
 )
@@ -14,56 +25,582 @@ data_contract_ids = [
     "urn:dmb:cmp:marketing:system-with-data-contract:0:consumable-data-contract-2",
 ]
 content = "content"
+content_digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
 environment = "environment"
 
 
 @mock.patch("src.repositories.s3_dag_repository.boto3.client")
-def test_create_or_update_dag_ok(mock_client):
-    mock_client.return_value.put_object.return_value = None
+def test_create_s3_client(mock_client):
+    settings = S3DagSettings(
+        bucket_name="bucket_name",
+        folder="dags",
+        max_pool_connections=50,
+        tcp_keepalive=False,
+        retry_mode="adaptive",
+        max_attempts=5,
+    )
+
+    create_s3_client(settings)
+
+    mock_client.assert_called_once()
+    config = mock_client.call_args.kwargs["config"]
+    assert mock_client.call_args.args == ("s3",)
+    assert config.max_pool_connections == 50
+    assert config.tcp_keepalive is False
+    assert config.retries == {"mode": "adaptive", "max_attempts": 5}
+
+
+@mock.patch("src.repositories.s3_dag_repository.boto3.client")
+def test_client_is_reused_across_calls(mock_client):
+    s3_dag_repository = S3DagRepository(s3_dag_settings)
+
+    s3_dag_repository.create_or_update_dag(data_contract_id, content, environment)
+    s3_dag_repository.create_or_update_dag(data_contract_id, content, environment)
+    s3_dag_repository.delete_dags(data_contract_ids, environment)
+
+    mock_client.assert_called_once()
+
+
+def test_create_or_update_dag_ok():
+    s3_client = Mock()
+    s3_client.head_object.side_effect = ClientError(
+        {"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject"
+    )
+    s3_client.put_object.return_value = None
+    s3_dag_repository = S3DagRepository(s3_dag_settings, s3_client)
 
     res = s3_dag_repository.create_or_update_dag(data_contract_id, content, environment)
 
-    assert res is None
-    mock_client.return_value.put_object.assert_called_once_with(
+    assert res == DagWriteOutcome.WRITTEN
+    s3_client.put_object.assert_called_once_with(
         Body=content,
         Bucket="bucket_name",
         Key="dags/dag_urn_dmb_cmp_marketing_system_with_data_contract_0_consumable_data_contract_environment.py",
+        Metadata={
+            "content-sha256": content_digest,
+            "data-contract-id": data_contract_id,
+        },
     )
 
 
-@mock.patch("src.repositories.s3_dag_repository.boto3.client")
-def test_create_or_update_dag_error(mock_client):
-    mock_client.return_value.put_object.side_effect = ValueError("error")
+def test_create_or_update_dag_unchanged():
+    s3_client = Mock()
+    s3_client.head_object.return_value = {
+        "Metadata": {
+            "content-sha256": content_digest,
+            "data-contract-id": data_contract_id,
+        }
+    }
+    s3_dag_repository = S3DagRepository(s3_dag_settings, s3_client)
+
+    res = s3_dag_repository.create_or_update_dag(data_contract_id, content, environment)
+
+    assert res == DagWriteOutcome.SKIPPED
+    s3_client.put_object.assert_not_called()
+
+
+def test_create_or_update_dag_unchanged_without_data_contract_id():
+    # DAG published before its data contract ID was stored in the metadata
+    s3_client = Mock()
+    s3_client.head_object.return_value = {
+        "Metadata": {"content-sha256": content_digest}
+    }
+    s3_dag_repository = S3DagRepository(s3_dag_settings, s3_client)
+
+    res = s3_dag_repository.create_or_update_dag(data_contract_id, content, environment)
+
+    assert res == DagWriteOutcome.WRITTEN
+    s3_client.put_object.assert_called_once()
+
+
+def test_create_or_update_dag_changed():
+    s3_client = Mock()
+    s3_client.head_object.return_value = {"Metadata": {"content-sha256": "old"}}
+    s3_dag_repository = S3DagRepository(s3_dag_settings, s3_client)
+
+    res = s3_dag_repository.create_or_update_dag(data_contract_id, content, environment)
+
+    assert res == DagWriteOutcome.WRITTEN
+    s3_client.put_object.assert_called_once()
+
+
+def test_create_or_update_dag_skip_unchanged_disabled():
+    s3_client = Mock()
+    s3_dag_repository = S3DagRepository(
+        S3DagSettings(bucket_name="bucket_name", folder="dags", skip_unchanged=False),
+        s3_client,
+    )
+
+    res = s3_dag_repository.create_or_update_dag(data_contract_id, content, environment)
+
+    assert res == DagWriteOutcome.WRITTEN
+    s3_client.head_object.assert_not_called()
+    s3_client.put_object.assert_called_once()
+
+
+def test_create_or_update_dag_head_error():
+    s3_client = Mock()
+    s3_client.head_object.side_effect = ClientError(
+        {"Error": {"Code": "403", "Message": "Forbidden"}}, "HeadObject"
+    )
+    s3_dag_repository = S3DagRepository(s3_dag_settings, s3_client)
 
     res = s3_dag_repository.create_or_update_dag(data_contract_id, content, environment)
 
     assert isinstance(res, DagRepositoryError)
+    s3_client.put_object.assert_not_called()
 
 
-@mock.patch("src.repositories.s3_dag_repository.boto3.client")
-def test_delete_dags_ok(mock_client):
-    mock_client.return_value.delete_object.return_value = None
-    calls = [
-        call(
-            Bucket="bucket_name",
-            Key="dags/dag_urn_dmb_cmp_marketing_system_with_data_contract_0_consumable_data_contract_1_environment.py",
-        ),
-        call(
-            Bucket="bucket_name",
-            Key="dags/dag_urn_dmb_cmp_marketing_system_with_data_contract_0_consumable_data_contract_2_environment.py",
-        ),
-    ]
+def test_create_or_update_dag_error():
+    s3_client = Mock()
+    s3_client.put_object.side_effect = ValueError("error")
+    s3_dag_repository = S3DagRepository(s3_dag_settings, s3_client)
 
-    res = s3_dag_repository.delete_dags(data_contract_ids, environment)
+    res = s3_dag_repository.create_or_update_dag(data_contract_id, content, environment)
+
+    assert isinstance(res, DagRepositoryError)
+
+
+def _stubbed_s3_client():
+    s3_client = boto3.client(
+        "s3",
+        region_name="us-east-1",
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+    )
+    return s3_client, Stubber(s3_client)
+
+
+def test_delete_dags_ok():
+    s3_client, stubber = _stubbed_s3_client()
+    stubber.add_response(
+        "delete_objects",
+        {},
+        {
+            "Bucket": "bucket_name",
+            "Delete": {
+                "Objects": [
+                    {
+                        "Key": "dags/dag_urn_dmb_cmp_marketing_system_with_data_contract_0_consumable_data_contract_1_environment.py"  # noqa: E501
+                    },
+                    {
+                        "Key": "dags/dag_urn_dmb_cmp_marketing_system_with_data_contract_0_consumable_data_contract_2_environment.py"  # noqa: E501
+                    },
+                ],
+                "Quiet": True,
+            },
+        },
+    )
+    s3_dag_repository = S3DagRepository(s3_dag_settings, s3_client)
+
+    with stubber:
+        res = s3_dag_repository.delete_dags(data_contract_ids, environment)
 
     assert res is None
-    mock_client.return_value.delete_object.assert_has_calls(calls, any_order=True)
+    stubber.assert_no_pending_responses()
 
 
-@mock.patch("src.repositories.s3_dag_repository.boto3.client")
-def test_delete_dags_error(mock_client):
-    mock_client.return_value.delete_object.side_effect = ValueError("error")
+def test_delete_dags_is_batched():
+    s3_client, stubber = _stubbed_s3_client()
+    ids = [f"urn:dmb:cmp:dp:0:op-{i}" for i in range(2500)]
+    for _ in range(3):
+        stubber.add_response("delete_objects", {})
+    s3_dag_repository = S3DagRepository(s3_dag_settings, s3_client)
+
+    with stubber:
+        res = s3_dag_repository.delete_dags(ids, environment)
+
+    assert res is None
+    # 2500 keys need exactly 3 DeleteObjects requests (1000 + 1000 + 500)
+    stubber.assert_no_pending_responses()
+
+
+def test_delete_dags_reports_failed_keys():
+    s3_client, stubber = _stubbed_s3_client()
+    stubber.add_response(
+        "delete_objects",
+        {
+            "Errors": [
+                {
+                    "Key": "dags/dag_urn_dmb_cmp_marketing_system_with_data_contract_0_consumable_data_contract_2_environment.py",  # noqa: E501
+                    "Code": "AccessDenied",
+                    "Message": "Access Denied",
+                }
+            ]
+        },
+    )
+    s3_dag_repository = S3DagRepository(s3_dag_settings, s3_client)
+
+    with stubber:
+        res = s3_dag_repository.delete_dags(data_contract_ids, environment)
+
+    assert isinstance(res, DagRepositoryError)
+    assert res.failed_dags == {data_contract_ids[1]: "AccessDenied: Access Denied"}
+    assert data_contract_ids[1] in res.error_msg
+    assert data_contract_ids[0] not in res.error_msg
+
+
+def test_delete_dags_error():
+    s3_client = Mock()
+    s3_client.delete_objects.side_effect = ValueError("error")
+    s3_dag_repository = S3DagRepository(s3_dag_settings, s3_client)
 
     res = s3_dag_repository.delete_dags(data_contract_ids, environment)
 
     assert isinstance(res, DagRepositoryError)
+    assert res.failed_dags == {
+        data_contract_ids[0]: "error",
+        data_contract_ids[1]: "error",
+    }
+
+
+guardian_id = "urn:dmb:cmp:marketing:system-with-data-contract:0:guardian"
+manifest_key = "dags/manifests/urn_dmb_cmp_marketing_system_with_data_contract_0_guardian_environment.json"  # noqa: E501
+
+
+def test_get_manifest_ok():
+    s3_client = Mock()
+    s3_client.get_object.return_value = {
+        "Body": io.BytesIO(b'{"dataContracts": {"urn:dc:0": "fingerprint"}}')
+    }
+    s3_dag_repository = S3DagRepository(s3_dag_settings, s3_client)
+
+    res = s3_dag_repository.get_manifest(guardian_id, environment)
+
+    assert res == {"urn:dc:0": "fingerprint"}
+    s3_client.get_object.assert_called_once_with(Bucket="bucket_name", Key=manifest_key)
+
+
+def test_get_manifest_missing():
+    s3_client = Mock()
+    s3_client.get_object.side_effect = ClientError(
+        {"Error": {"Code": "NoSuchKey", "Message": "Not Found"}}, "GetObject"
+    )
+    s3_dag_repository = S3DagRepository(s3_dag_settings, s3_client)
+
+    res = s3_dag_repository.get_manifest(guardian_id, environment)
+
+    assert res == dict()
+
+
+def test_get_manifest_error():
+    s3_client = Mock()
+    s3_client.get_object.side_effect = ClientError(
+        {"Error": {"Code": "403", "Message": "Forbidden"}}, "GetObject"
+    )
+    s3_dag_repository = S3DagRepository(s3_dag_settings, s3_client)
+
+    res = s3_dag_repository.get_manifest(guardian_id, environment)
+
+    assert isinstance(res, DagRepositoryError)
+
+
+def test_put_manifest_ok():
+    s3_client = Mock()
+    s3_dag_repository = S3DagRepository(s3_dag_settings, s3_client)
+
+    res = s3_dag_repository.put_manifest(
+        guardian_id, environment, {"urn:dc:0": "fingerprint"}
+    )
+
+    assert res is None
+    s3_client.put_object.assert_called_once_with(
+        Body='{"dataContracts": {"urn:dc:0": "fingerprint"}}',
+        Bucket="bucket_name",
+        Key=manifest_key,
+        ContentType="application/json",
+    )
+
+
+def test_put_manifest_error():
+    s3_client = Mock()
+    s3_client.put_object.side_effect = ValueError("error")
+    s3_dag_repository = S3DagRepository(s3_dag_settings, s3_client)
+
+    res = s3_dag_repository.put_manifest(guardian_id, environment, dict())
+
+    assert isinstance(res, DagRepositoryError)
+
+
+def test_delete_manifest_ok():
+    s3_client = Mock()
+    s3_dag_repository = S3DagRepository(s3_dag_settings, s3_client)
+
+    res = s3_dag_repository.delete_manifest(guardian_id, environment)
+
+    assert res is None
+    s3_client.delete_object.assert_called_once_with(
+        Bucket="bucket_name", Key=manifest_key
+    )
+
+
+def test_delete_manifest_error():
+    s3_client = Mock()
+    s3_client.delete_object.side_effect = ValueError("error")
+    s3_dag_repository = S3DagRepository(s3_dag_settings, s3_client)
+
+    res = s3_dag_repository.delete_manifest(guardian_id, environment)
+
+    assert isinstance(res, DagRepositoryError)
+
+
+# the DAGs not related to the given IDs are checked in the order of the stubbed responses
+sequential_s3_dag_settings = S3DagSettings(
+    bucket_name="bucket_name", folder="dags", max_pool_connections=1
+)
+dag_prefix = "dags/dag_urn_dmb_cmp_marketing_system_with_data_contract_0_"
+data_contract_id_prefix = "urn:dmb:cmp:marketing:system-with-data-contract:0:"
+
+
+def test_find_orphan_dags_paginates():
+    s3_client, stubber = _stubbed_s3_client()
+    stubber.add_response(
+        "list_objects_v2",
+        {
+            "Contents": [
+                {"Key": f"{dag_prefix}consumable_data_contract_1_environment.py"},
+                {"Key": f"{dag_prefix}dropped_data_contract_environment.py"},
+            ],
+            "IsTruncated": True,
+            "NextContinuationToken": "token",
+        },
+        {"Bucket": "bucket_name", "Prefix": dag_prefix},
+    )
+    stubber.add_response(
+        "list_objects_v2",
+        {
+            "Contents": [
+                {"Key": f"{dag_prefix}consumable_data_contract_2_environment.py"},
+                # DAG of the same data contract in another environment
+                {"Key": f"{dag_prefix}dropped_data_contract_production.py"},
+            ],
+            "IsTruncated": False,
+        },
+        {"Bucket": "bucket_name", "Prefix": dag_prefix, "ContinuationToken": "token"},
+    )
+    stubber.add_response(
+        "head_object",
+        {"Metadata": {"data-contract-id": f"{data_contract_id_prefix}dropped"}},
+        {
+            "Bucket": "bucket_name",
+            "Key": f"{dag_prefix}dropped_data_contract_environment.py",
+        },
+    )
+    s3_dag_repository = S3DagRepository(sequential_s3_dag_settings, s3_client)
+
+    with stubber:
+        res = s3_dag_repository.find_orphan_dags(
+            data_contract_id_prefix, data_contract_ids, environment
+        )
+
+    assert res == (3, [f"{dag_prefix}dropped_data_contract_environment.py"])
+    stubber.assert_no_pending_responses()
+
+
+def test_find_orphan_dags_ignores_dags_of_colliding_ids():
+    # the IDs of different data products can be sanitized to the same key prefix
+    s3_client, stubber = _stubbed_s3_client()
+    prefix = "dags/dag_urn_dmb_cmp_marketing_sales_1_"
+    stubber.add_response(
+        "list_objects_v2",
+        {
+            "Contents": [
+                {"Key": f"{prefix}dropped_environment.py"},
+                # DAG of urn:dmb:dp:marketing:sales-1:0
+                {"Key": f"{prefix}0_other_dc_environment.py"},
+                # DAGs published without their data contract ID in the metadata
+                {"Key": f"{prefix}legacy_environment.py"},
+                {"Key": f"{prefix}0_legacy_environment.py"},
+                # DAG deleted while listing
+                {"Key": f"{prefix}deleted_environment.py"},
+            ],
+            "IsTruncated": False,
+        },
+    )
+    stubber.add_response(
+        "head_object",
+        {"Metadata": {"data-contract-id": "urn:dmb:cmp:marketing:sales:1:dropped"}},
+    )
+    stubber.add_response(
+        "head_object",
+        {"Metadata": {"data-contract-id": "urn:dmb:cmp:marketing:sales-1:0:other-dc"}},
+    )
+    for key, legacy_id in [
+        (f"{prefix}legacy_environment.py", "urn:dmb:cmp:marketing:sales:1:legacy"),
+        (f"{prefix}0_legacy_environment.py", "urn:dmb:cmp:marketing:sales-1:0:legacy"),
+    ]:
+        stubber.add_response("head_object", {"Metadata": {}})
+        header = f'from __future__ import annotations\n\ndata_contract_id = "{legacy_id}"\n'  # noqa: E501
+        stubber.add_response(
+            "get_object",
+            {"Body": StreamingBody(io.BytesIO(header.encode()), len(header))},
+            {"Bucket": "bucket_name", "Key": key, "Range": "bytes=0-4095"},
+        )
+    stubber.add_client_error("head_object", "404")
+    s3_dag_repository = S3DagRepository(sequential_s3_dag_settings, s3_client)
+
+    with stubber:
+        res = s3_dag_repository.find_orphan_dags(
+            "urn:dmb:cmp:marketing:sales:1:", [], environment
+        )
+
+    assert res == (
+        2,
+        [f"{prefix}dropped_environment.py", f"{prefix}legacy_environment.py"],
+    )
+    stubber.assert_no_pending_responses()
+
+
+def test_find_orphan_dags_checks_keys_in_parallel():
+    s3_client = Mock()
+    keys = [f"{dag_prefix}dc_{i}_environment.py" for i in range(20)]
+    s3_client.get_paginator.return_value.paginate.return_value = [
+        {"Contents": [{"Key": key} for key in keys]}
+    ]
+    # each HEAD waits for as many others as the connection pool allows
+    barrier = threading.Barrier(s3_dag_settings.max_pool_connections, timeout=5)
+
+    def head_object(Bucket, Key):
+        barrier.wait()
+        index = keys.index(Key)
+        return {"Metadata": {"data-contract-id": f"{data_contract_id_prefix}{index}"}}
+
+    s3_client.head_object.side_effect = head_object
+    s3_dag_repository = S3DagRepository(s3_dag_settings, s3_client)
+
+    res = s3_dag_repository.find_orphan_dags(data_contract_id_prefix, [], environment)
+
+    assert res == (20, keys)
+
+
+def test_find_orphan_dags_skips_legacy_dags_without_id():
+    s3_client = Mock()
+    key = f"{dag_prefix}legacy_environment.py"
+    s3_client.get_paginator.return_value.paginate.return_value = [
+        {"Contents": [{"Key": key}]}
+    ]
+    s3_client.head_object.return_value = {"Metadata": {}}
+    s3_client.get_object.return_value = {"Body": io.BytesIO(b"from airflow import DAG")}
+    s3_dag_repository = S3DagRepository(s3_dag_settings, s3_client)
+
+    res = s3_dag_repository.find_orphan_dags(data_contract_id_prefix, [], environment)
+
+    assert res == (0, [])
+
+
+def test_find_existing_dags():
+    s3_client, stubber = _stubbed_s3_client()
+    stubber.add_response(
+        "list_objects_v2",
+        {
+            "Contents": [
+                {"Key": f"{dag_prefix}consumable_data_contract_1_environment.py"},
+                {"Key": f"{dag_prefix}consumable_data_contract_1_production.py"},
+            ],
+            "IsTruncated": False,
+        },
+        {
+            "Bucket": "bucket_name",
+            "Prefix": f"{dag_prefix}consumable_data_contract_",
+        },
+    )
+    s3_dag_repository = S3DagRepository(s3_dag_settings, s3_client)
+
+    with stubber:
+        res = s3_dag_repository.find_existing_dags(data_contract_ids, environment)
+
+    assert res == {data_contract_ids[0]}
+    stubber.assert_no_pending_responses()
+
+
+def test_find_existing_dags_error():
+    s3_client, stubber = _stubbed_s3_client()
+    stubber.add_client_error("list_objects_v2", "AccessDenied")
+    s3_dag_repository = S3DagRepository(s3_dag_settings, s3_client)
+
+    with stubber:
+        res = s3_dag_repository.find_existing_dags(data_contract_ids, environment)
+
+    assert isinstance(res, DagRepositoryError)
+    assert s3_dag_repository.find_existing_dags([], environment) == set()
+
+
+def test_find_orphan_dags_error():
+    s3_client, stubber = _stubbed_s3_client()
+    stubber.add_client_error("list_objects_v2", "AccessDenied")
+    s3_dag_repository = S3DagRepository(s3_dag_settings, s3_client)
+
+    with stubber:
+        res = s3_dag_repository.find_orphan_dags(
+            data_contract_id_prefix, data_contract_ids, environment
+        )
+
+    assert isinstance(res, DagRepositoryError)
+
+
+def test_delete_dag_keys_reports_failed_keys():
+    s3_client, stubber = _stubbed_s3_client()
+    keys = [f"{dag_prefix}dc_{i}_environment.py" for i in range(1500)]
+    stubber.add_response("delete_objects", {})
+    stubber.add_response(
+        "delete_objects",
+        {"Errors": [{"Key": keys[-1], "Code": "AccessDenied", "Message": "Denied"}]},
+    )
+    s3_dag_repository = S3DagRepository(s3_dag_settings, s3_client)
+
+    with stubber:
+        res = s3_dag_repository.delete_dag_keys(keys)
+
+    assert isinstance(res, DagRepositoryError)
+    assert res.failed_dags == {keys[-1]: "AccessDenied: Denied"}
+    stubber.assert_no_pending_responses()
+
+
+def test_find_and_delete_orphans_in_large_dag_folder():
+    # 20 pages of 1000 DAGs served through the real paginator, 5000 of them orphans
+    s3_client, stubber = _stubbed_s3_client()
+    ids = [f"{data_contract_id_prefix}dc-{i}" for i in range(20000)]
+    keys = [f"{dag_prefix}dc_{i}_environment.py" for i in range(20000)]
+    for page in range(20):
+        stubber.add_response(
+            "list_objects_v2",
+            {
+                "Contents": [
+                    {"Key": key} for key in keys[page * 1000 : (page + 1) * 1000]
+                ],
+                "IsTruncated": page < 19,
+                **({"NextContinuationToken": f"token-{page}"} if page < 19 else {}),
+            },
+        )
+    # the DAGs not guarded are attributed by their metadata
+    for i in range(15000, 20000):
+        stubber.add_response("head_object", {"Metadata": {"data-contract-id": ids[i]}})
+    for batch in range(5):
+        stubber.add_response(
+            "delete_objects",
+            {},
+            {
+                "Bucket": "bucket_name",
+                "Delete": {
+                    "Objects": [
+                        {"Key": key}
+                        for key in keys[15000 + batch * 1000 : 16000 + batch * 1000]
+                    ],
+                    "Quiet": True,
+                },
+            },
+        )
+    s3_dag_repository = S3DagRepository(sequential_s3_dag_settings, s3_client)
+
+    with stubber:
+        res = s3_dag_repository.find_orphan_dags(
+            data_contract_id_prefix, ids[:15000], environment
+        )
+        assert not isinstance(res, DagRepositoryError)
+        listed, orphan_keys = res
+        delete_res = s3_dag_repository.delete_dag_keys(orphan_keys)
+
+    assert listed == 20000
+    assert orphan_keys == keys[15000:]
+    assert delete_res is None
+    stubber.assert_no_pending_responses()
@@ -0,0 +1,150 @@
+import os
+import sqlite3
+import subprocess
+import sys
+from contextlib import closing
+
+from src.models.api_models import Status1
+from src.models.provisioning_task import DagProgress, ProvisioningTask
+from src.repositories.sqlite_task_repository import SqliteTaskRepository
+
+
+def _running_task(token: str) -> ProvisioningTask:
+    return ProvisioningTask(
+        token=token,
+        status=Status1.RUNNING,
+        dataContracts={"dc1": DagProgress.PENDING, "dc2": DagProgress.PENDING},
+    )
+
+
+def test_get_task_unknown_token(tmp_path):
+    repository = SqliteTaskRepository(str(tmp_path / "tasks.db"))
+
+    assert repository.get_task("unknown") is None
+
+
+def test_task_lifecycle(tmp_path):
+    repository = SqliteTaskRepository(str(tmp_path / "tasks.db"))
+    repository.create_task(_running_task("token"))
+
+    repository.set_dag_progress("token", "dc1", DagProgress.WRITTEN)
+    repository.set_dag_progress("token", "dc2", DagProgress.FAILED)
+    repository.complete_task("token", Status1.FAILED, "error on dc2")
+
+    task = repository.get_task("token")
+    assert task is not None
+    assert task.status == Status1.FAILED
+    assert task.result == "error on dc2"
+    assert task.privateInfo is None
+    assert task.dataContracts == {
+        "dc1": DagProgress.WRITTEN,
+        "dc2": DagProgress.FAILED,
+    }
+
+
+def test_tasks_survive_restart(tmp_path):
+    database_path = str(tmp_path / "tasks.db")
+    repository = SqliteTaskRepository(database_path)
+    repository.create_task(_running_task("token"))
+    repository.complete_task(
+        "token", Status1.COMPLETED, "", {"dags": {"written": 2, "skipped": 0}}
+    )
+
+    task = SqliteTaskRepository(database_path).get_task("token")
+
+    assert task is not None
+    assert task.status == Status1.COMPLETED
+    assert task.privateInfo == {"dags": {"written": 2, "skipped": 0}}
+
+
+def test_fail_orphaned_tasks_after_restart(tmp_path):
+    database_path = str(tmp_path / "tasks.db")
+    repository = SqliteTaskRepository(database_path)
+    repository.create_task(_running_task("running"))
+    repository.create_task(_running_task("completed"))
+    repository.complete_task("completed", Status1.COMPLETED, "")
+
+    restarted_repository = SqliteTaskRepository(database_path)
+
+    assert restarted_repository.fail_orphaned_tasks("interrupted") == 1
+    running_task = restarted_repository.get_task("running")
+    completed_task = restarted_repository.get_task("completed")
+    assert running_task is not None and completed_task is not None
+    assert running_task.status == Status1.FAILED
+    assert running_task.result == "interrupted"
+    assert completed_task.status == Status1.COMPLETED
+
+
+def _set_owner_pid(database_path: str, owner: str, pid: int) -> None:
+    with closing(sqlite3.connect(database_path)) as connection, connection:
+        connection.execute(
+            "UPDATE provisioning_task_owners SET pid = ? WHERE owner = ?", (pid, owner)
+        )
+
+
+def test_tasks_of_running_workers_are_not_failed(tmp_path):
+    database_path = str(tmp_path / "tasks.db")
+    worker_repository = SqliteTaskRepository(database_path)
+    worker_repository.create_task(_running_task("running"))
+    # another worker process, still running
+    _set_owner_pid(database_path, worker_repository.owner, os.getppid())
+
+    repository = SqliteTaskRepository(database_path)
+
+    assert repository.fail_orphaned_tasks("interrupted") == 0
+    running_task = repository.get_task("running")
+    assert running_task is not None
+    assert running_task.status == Status1.RUNNING
+
+
+def test_tasks_of_gone_workers_are_failed(tmp_path):
+    database_path = str(tmp_path / "tasks.db")
+    worker_repository = SqliteTaskRepository(database_path)
+    worker_repository.create_task(_running_task("running"))
+    worker = subprocess.run(
+        [sys.executable, "-c", "import os; print(os.getpid())"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    _set_owner_pid(database_path, worker_repository.owner, int(worker.stdout))
+
+    repository = SqliteTaskRepository(database_path)
+
+    assert repository.fail_orphaned_tasks("interrupted") == 1
+    running_task = repository.get_task("running")
+    assert running_task is not None
+    assert running_task.status == Status1.FAILED
+
+
+def test_expired_completed_tasks_are_purged(tmp_path):
+    now = [0.0]
+    repository = SqliteTaskRepository(
+        str(tmp_path / "tasks.db"), ttl_seconds=10, clock=lambda: now[0]
+    )
+    repository.create_task(_running_task("completed"))
+    repository.create_task(_running_task("running"))
+    repository.complete_task("completed", Status1.COMPLETED, "")
+
+    now[0] = 11
+    repository.create_task(_running_task("new"))
+
+    assert repository.get_task("completed") is None
+    assert repository.get_task("running") is not None
+    assert repository.get_task("new") is not None
+
+
+def test_database_of_a_previous_version_is_migrated(tmp_path):
+    database_path = str(tmp_path / "tasks.db")
+    with closing(sqlite3.connect(database_path)) as connection:
+        connection.execute(
+            "CREATE TABLE provisioning_tasks (token TEXT PRIMARY KEY, status TEXT NOT NULL, result TEXT NOT NULL, private_info TEXT)"  # noqa: E501
+        )
+    repository = SqliteTaskRepository(database_path)
+    repository.create_task(_running_task("token"))
+
+    repository.complete_task("token", Status1.COMPLETED, "")
+
+    task = repository.get_task("token")
+    assert task is not None
+    assert task.status == Status1.COMPLETED
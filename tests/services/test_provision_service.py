@@ -1,17 +1,24 @@
+import json
+import time
 from pathlib import Path
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 import yaml
+from anyio.from_thread import start_blocking_portal
 
 from src.models.api_models import ProvisioningStatus, Status1, SystemErr
+from src.models.dag_reconciliation import DagReconciliationReport
 from src.models.data_product_descriptor import DataProduct
-from src.repositories.dag_repository import DagRepositoryError
+from src.models.parsed_descriptor import ParsedDescriptor
+from src.models.provisioning_task import DagProgress
+from src.repositories.dag_repository import DagRepositoryError, DagWriteOutcome
 from src.services.provision_service import ProvisionService
 from src.services.template_service import TemplateService, TemplateServiceError
 from src.services.validation_service import validate_components
 from src.settings.airflow_settings import AirflowSettings
 from src.settings.cgp_settings import CGPSettings
+from src.settings.provision_settings import ProvisionSettings
 from src.utility.parsing_pydantic_models import parse_yaml_with_model
 
 
@@ -25,31 +32,57 @@ def unpacked_request_fixture(descriptor_str):
     request = yaml.safe_load(descriptor_str)
     data_product = parse_yaml_with_model(request.get("dataProduct"), DataProduct)
     component_to_provision = request.get("componentIdToProvision")
-    return validate_components((data_product, component_to_provision))
+    return validate_components(
+        ParsedDescriptor(request, data_product, component_to_provision)
+    )
 
 
-def test_provision_ok(unpacked_request, descriptor_str):
-    data_product, workload, data_contracts = unpacked_request
+def test_provision_ok(unpacked_request):
+    descriptor, workload, data_contracts = unpacked_request
     dag_repository = Mock()
+    dag_repository.get_manifest.return_value = dict()
     cgp_settings = CGPSettings(base_url="http://localhost:8088")
     template_service = TemplateService()
-    dag_repository.create_or_update_dag.return_value = None
+    dag_repository.create_or_update_dag.return_value = DagWriteOutcome.WRITTEN
     airflow_settings = AirflowSettings(connection_id="connection_id")
     provisioner = ProvisionService(
         dag_repository, template_service, cgp_settings, airflow_settings
     )
 
-    provisioning_status = provisioner.provision(
-        data_product, workload, data_contracts, descriptor_str
-    )
+    provisioning_status = provisioner.provision(descriptor, workload, data_contracts)
 
     assert isinstance(provisioning_status, ProvisioningStatus)
     assert provisioning_status.status == Status1.COMPLETED
+    assert provisioning_status.info is not None
+    assert provisioning_status.info.privateInfo == {
+        "dags": {"written": 1, "skipped": 0, "deleted": 0}
+    }
 
 
-def test_provision_ko_create_dag(unpacked_request, descriptor_str):
-    data_product, workload, data_contracts = unpacked_request
+def test_provision_ok_skipped(unpacked_request):
+    descriptor, workload, data_contracts = unpacked_request
     dag_repository = Mock()
+    dag_repository.get_manifest.return_value = dict()
+    dag_repository.create_or_update_dag.return_value = DagWriteOutcome.SKIPPED
+    cgp_settings = CGPSettings(base_url="http://localhost:8088")
+    airflow_settings = AirflowSettings(connection_id="connection_id")
+    provisioner = ProvisionService(
+        dag_repository, TemplateService(), cgp_settings, airflow_settings
+    )
+
+    provisioning_status = provisioner.provision(descriptor, workload, data_contracts)
+
+    assert isinstance(provisioning_status, ProvisioningStatus)
+    assert provisioning_status.info is not None
+    assert provisioning_status.info.privateInfo == {
+        "dags": {"written": 0, "skipped": 1, "deleted": 0}
+    }
+
+
+def test_provision_ko_create_dag(unpacked_request):
+    descriptor, workload, data_contracts = unpacked_request
+    dag_repository = Mock()
+    dag_repository.get_manifest.return_value = dict()
     error_msg = "error"
     error = DagRepositoryError(error_msg=error_msg)
     dag_repository.create_or_update_dag.return_value = error
@@ -60,39 +93,38 @@ def test_provision_ko_create_dag(unpacked_request, descriptor_str):
         dag_repository, template_service, cgp_settings, airflow_settings
     )
 
-    system_err = provisioner.provision(
-        data_product, workload, data_contracts, descriptor_str
-    )
+    system_err = provisioner.provision(descriptor, workload, data_contracts)
 
     assert isinstance(system_err, SystemErr)
     assert system_err.error == error_msg
 
 
-def test_provision_ko_render_template(unpacked_request, descriptor_str):
-    data_product, workload, data_contracts = unpacked_request
+def test_provision_ko_render_template(unpacked_request):
+    descriptor, workload, data_contracts = unpacked_request
     dag_repository = Mock()
-    dag_repository.create_or_update_dag.return_value = None
+    dag_repository.get_manifest.return_value = dict()
+    dag_repository.create_or_update_dag.return_value = DagWriteOutcome.WRITTEN
     cgp_settings = CGPSettings(base_url="http://localhost:8088")
     error_msg = "error"
     error = TemplateServiceError(error_msg=error_msg)
     template_service = Mock()
+    template_service.get_template_digest.return_value = "template-digest"
     template_service.render_template.return_value = error
     airflow_settings = AirflowSettings(connection_id="connection_id")
     provisioner = ProvisionService(
         dag_repository, template_service, cgp_settings, airflow_settings
     )
 
-    system_err = provisioner.provision(
-        data_product, workload, data_contracts, descriptor_str
-    )
+    system_err = provisioner.provision(descriptor, workload, data_contracts)
 
     assert isinstance(system_err, SystemErr)
     assert system_err.error == error_msg
 
 
-def test_unprovision_ok(unpacked_request, descriptor_str):
-    data_product, workload, data_contracts = unpacked_request
+def test_unprovision_ok(unpacked_request):
+    descriptor, workload, data_contracts = unpacked_request
     dag_repository = Mock()
+    dag_repository.delete_manifest.return_value = None
     dag_repository.delete_dags.return_value = None
     cgp_settings = CGPSettings(base_url="http://localhost:8088")
     template_service = TemplateService()
@@ -101,16 +133,17 @@ def test_unprovision_ok(unpacked_request, descriptor_str):
         dag_repository, template_service, cgp_settings, airflow_settings
     )
 
-    provisioning_status = provisioner.unprovision(
-        data_product, workload, data_contracts, descriptor_str
-    )
+    provisioning_status = provisioner.unprovision(descriptor, workload, data_contracts)
 
     assert isinstance(provisioning_status, ProvisioningStatus)
     assert provisioning_status.status == Status1.COMPLETED
+    dag_repository.delete_manifest.assert_called_once_with(
+        descriptor.component_id, descriptor.data_product.environment
+    )
 
 
-def test_unprovision_ko(unpacked_request, descriptor_str):
-    data_product, workload, data_contracts = unpacked_request
+def test_unprovision_ko(unpacked_request):
+    descriptor, workload, data_contracts = unpacked_request
     dag_repository = Mock()
     error_msg = "error"
     error = DagRepositoryError(error_msg=error_msg)
@@ -122,9 +155,916 @@ def test_unprovision_ko(unpacked_request, descriptor_str):
         dag_repository, template_service, cgp_settings, airflow_settings
     )
 
-    system_err = provisioner.unprovision(
-        data_product, workload, data_contracts, descriptor_str
-    )
+    system_err = provisioner.unprovision(descriptor, workload, data_contracts)
 
     assert isinstance(system_err, SystemErr)
     assert system_err.error == error_msg
+
+
+def test_unprovision_ko_partial(unpacked_request):
+    descriptor, workload, data_contracts = unpacked_request
+    dag_repository = Mock()
+    failed_id = data_contracts[0].get_id()
+    error = DagRepositoryError(
+        error_msg=f"error deleting {failed_id}",
+        failed_dags={failed_id: "AccessDenied: Access Denied"},
+    )
+    dag_repository.delete_dags.return_value = error
+    cgp_settings = CGPSettings(base_url="http://localhost:8088")
+    template_service = TemplateService()
+    airflow_settings = AirflowSettings(connection_id="connection_id")
+    provisioner = ProvisionService(
+        dag_repository, template_service, cgp_settings, airflow_settings
+    )
+
+    system_err = provisioner.unprovision(descriptor, workload, data_contracts)
+
+    assert isinstance(system_err, SystemErr)
+    assert failed_id in system_err.error
+
+
+def _mock_data_contract(data_contract_id: str) -> Mock:
+    data_contract = Mock()
+    data_contract.get_id.return_value = data_contract_id
+    data_contract.get_technology.return_value = "Snowflake"
+    return data_contract
+
+
+def test_provision_ko_reports_all_errors(unpacked_request):
+    descriptor, workload, _ = unpacked_request
+    data_contracts = [_mock_data_contract(f"urn:dc:{i}") for i in range(10)]
+    dag_repository = Mock()
+    dag_repository.get_manifest.return_value = dict()
+
+    def create_or_update_dag(data_contract_id, content, environment):
+        if data_contract_id in ("urn:dc:3", "urn:dc:7"):
+            return DagRepositoryError(error_msg=f"error {data_contract_id}")
+        return DagWriteOutcome.WRITTEN
+
+    dag_repository.create_or_update_dag.side_effect = create_or_update_dag
+    cgp_settings = CGPSettings(base_url="http://localhost:8088")
+    airflow_settings = AirflowSettings(connection_id="connection_id")
+    provisioner = ProvisionService(
+        dag_repository,
+        TemplateService(),
+        cgp_settings,
+        airflow_settings,
+        ProvisionSettings(max_concurrency=4, descriptor_embedding="full"),
+    )
+
+    system_err = provisioner.provision(descriptor, workload, data_contracts)
+
+    assert isinstance(system_err, SystemErr)
+    assert system_err.error == "error urn:dc:3\nerror urn:dc:7"
+    assert dag_repository.create_or_update_dag.call_count == 10
+
+
+def test_provision_ko_unexpected_error_cancels_pending(unpacked_request):
+    descriptor, workload, _ = unpacked_request
+    data_contracts = [_mock_data_contract(f"urn:dc:{i}") for i in range(5)]
+    dag_repository = Mock()
+    dag_repository.get_manifest.return_value = dict()
+
+    def create_or_update_dag(data_contract_id, content, environment):
+        if data_contract_id != "urn:dc:0":
+            # leaves time to cancel the data contracts not yet started
+            time.sleep(0.1)
+        raise RuntimeError("boom")
+
+    dag_repository.create_or_update_dag.side_effect = create_or_update_dag
+    cgp_settings = CGPSettings(base_url="http://localhost:8088")
+    airflow_settings = AirflowSettings(connection_id="connection_id")
+    provisioner = ProvisionService(
+        dag_repository,
+        TemplateService(),
+        cgp_settings,
+        airflow_settings,
+        ProvisionSettings(max_concurrency=1, descriptor_embedding="full"),
+    )
+
+    system_err = provisioner.provision(descriptor, workload, data_contracts)
+
+    assert isinstance(system_err, SystemErr)
+    assert "urn:dc:0. Details: boom" in system_err.error
+    assert "has been cancelled" in system_err.error
+    assert dag_repository.create_or_update_dag.call_count < len(data_contracts)
+
+
+def test_provision_reports_progress(unpacked_request):
+    descriptor, workload, _ = unpacked_request
+    data_contracts = [_mock_data_contract(f"urn:dc:{i}") for i in range(3)]
+    dag_repository = Mock()
+    dag_repository.get_manifest.return_value = dict()
+
+    def create_or_update_dag(data_contract_id, content, environment):
+        if data_contract_id == "urn:dc:1":
+            return DagRepositoryError(error_msg=f"error {data_contract_id}")
+        if data_contract_id == "urn:dc:2":
+            return DagWriteOutcome.SKIPPED
+        return DagWriteOutcome.WRITTEN
+
+    dag_repository.create_or_update_dag.side_effect = create_or_update_dag
+    cgp_settings = CGPSettings(base_url="http://localhost:8088")
+    airflow_settings = AirflowSettings(connection_id="connection_id")
+    provisioner = ProvisionService(
+        dag_repository,
+        TemplateService(),
+        cgp_settings,
+        airflow_settings,
+        ProvisionSettings(max_concurrency=2, descriptor_embedding="full"),
+    )
+    progress_callback = Mock()
+
+    provisioner.provision(descriptor, workload, data_contracts, progress_callback)
+
+    progress_by_data_contract: dict[str, list[DagProgress]] = dict()
+    for (data_contract_id, progress), _ in progress_callback.call_args_list:
+        progress_by_data_contract.setdefault(data_contract_id, []).append(progress)
+    assert progress_by_data_contract == {
+        "urn:dc:0": [DagProgress.RUNNING, DagProgress.WRITTEN],
+        "urn:dc:1": [DagProgress.RUNNING, DagProgress.FAILED],
+        "urn:dc:2": [DagProgress.RUNNING, DagProgress.SKIPPED],
+    }
+
+
+def _incremental_provisioner(dag_repository: Mock, **provision_settings):
+    return ProvisionService(
+        dag_repository,
+        TemplateService(),
+        CGPSettings(base_url="http://localhost:8088"),
+        AirflowSettings(connection_id="connection_id"),
+        ProvisionSettings(descriptor_embedding="full", **provision_settings),
+    )
+
+
+def test_provision_incremental_skips_unchanged(unpacked_request):
+    descriptor, workload, _ = unpacked_request
+    data_contracts = [_mock_data_contract(f"urn:dc:{i}") for i in range(3)]
+    dag_repository = Mock()
+    dag_repository.get_manifest.return_value = dict()
+    dag_repository.create_or_update_dag.return_value = DagWriteOutcome.WRITTEN
+    provisioner = _incremental_provisioner(dag_repository)
+    provisioner.provision(descriptor, workload, data_contracts)
+    manifest = dag_repository.put_manifest.call_args.args[2]
+    dag_repository.reset_mock()
+    dag_repository.get_manifest.return_value = manifest
+    dag_repository.find_existing_dags.side_effect = lambda ids, _: set(ids)
+
+    provisioning_status = provisioner.provision(descriptor, workload, data_contracts)
+
+    assert set(manifest.keys()) == {"urn:dc:0", "urn:dc:1", "urn:dc:2"}
+    assert isinstance(provisioning_status, ProvisioningStatus)
+    assert provisioning_status.info is not None
+    assert provisioning_status.info.privateInfo == {
+        "dags": {"written": 0, "skipped": 3, "deleted": 0}
+    }
+    dag_repository.create_or_update_dag.assert_not_called()
+    dag_repository.delete_dags.assert_not_called()
+    dag_repository.put_manifest.assert_called_once_with(
+        descriptor.component_id, descriptor.data_product.environment, manifest
+    )
+
+
+def test_provision_incremental_renders_changed(unpacked_request):
+    descriptor, workload, _ = unpacked_request
+    data_contracts = [_mock_data_contract(f"urn:dc:{i}") for i in range(3)]
+    dag_repository = Mock()
+    dag_repository.get_manifest.return_value = dict()
+    dag_repository.create_or_update_dag.return_value = DagWriteOutcome.WRITTEN
+    provisioner = _incremental_provisioner(dag_repository)
+    provisioner.provision(descriptor, workload, data_contracts)
+    manifest = dag_repository.put_manifest.call_args.args[2]
+    dag_repository.reset_mock()
+    dag_repository.get_manifest.return_value = {**manifest, "urn:dc:1": "outdated"}
+    dag_repository.find_existing_dags.side_effect = lambda ids, _: set(ids)
+
+    provisioner.provision(descriptor, workload, data_contracts)
+
+    dag_repository.create_or_update_dag.assert_called_once()
+    assert dag_repository.create_or_update_dag.call_args.args[0] == "urn:dc:1"
+    assert dag_repository.put_manifest.call_args.args[2] == manifest
+    dag_repository.find_existing_dags.assert_called_once_with(
+        ["urn:dc:0", "urn:dc:2"], descriptor.data_product.environment
+    )
+
+
+@pytest.mark.parametrize(
+    "existing_dags",
+    [{"urn:dc:0", "urn:dc:2"}, DagRepositoryError(error_msg="error")],
+)
+def test_provision_incremental_restores_missing_dags(unpacked_request, existing_dags):
+    descriptor, workload, _ = unpacked_request
+    data_contracts = [_mock_data_contract(f"urn:dc:{i}") for i in range(3)]
+    dag_repository = Mock()
+    dag_repository.get_manifest.return_value = dict()
+    dag_repository.create_or_update_dag.return_value = DagWriteOutcome.WRITTEN
+    provisioner = _incremental_provisioner(dag_repository)
+    provisioner.provision(descriptor, workload, data_contracts)
+    manifest = dag_repository.put_manifest.call_args.args[2]
+    dag_repository.reset_mock()
+    dag_repository.get_manifest.return_value = manifest
+    # urn:dc:1 deleted out of band, or the DAGs cannot be listed
+    dag_repository.find_existing_dags.return_value = existing_dags
+
+    provisioner.provision(descriptor, workload, data_contracts)
+
+    written_ids = {
+        call.args[0] for call in dag_repository.create_or_update_dag.call_args_list
+    }
+    assert written_ids == (
+        {"urn:dc:1"}
+        if isinstance(existing_dags, set)
+        else {"urn:dc:0", "urn:dc:1", "urn:dc:2"}
+    )
+    assert dag_repository.put_manifest.call_args.args[2] == manifest
+
+
+def test_provision_incremental_deletes_unguarded(unpacked_request):
+    descriptor, workload, _ = unpacked_request
+    data_contracts = [_mock_data_contract("urn:dc:0")]
+    dag_repository = Mock()
+    dag_repository.get_manifest.return_value = {
+        "urn:dc:old": "fingerprint",
+        "urn:dc:older": "fingerprint",
+    }
+    dag_repository.create_or_update_dag.return_value = DagWriteOutcome.WRITTEN
+    dag_repository.delete_dags.return_value = None
+    provisioner = _incremental_provisioner(dag_repository)
+
+    provisioning_status = provisioner.provision(descriptor, workload, data_contracts)
+
+    assert isinstance(provisioning_status, ProvisioningStatus)
+    assert provisioning_status.info is not None
+    assert provisioning_status.info.privateInfo == {
+        "dags": {"written": 1, "skipped": 0, "deleted": 2}
+    }
+    dag_repository.delete_dags.assert_called_once_with(
+        ["urn:dc:old", "urn:dc:older"], descriptor.data_product.environment
+    )
+    assert set(dag_repository.put_manifest.call_args.args[2].keys()) == {"urn:dc:0"}
+
+
+def test_provision_incremental_keeps_failures_for_next_run(unpacked_request):
+    descriptor, workload, _ = unpacked_request
+    data_contracts = [_mock_data_contract(f"urn:dc:{i}") for i in range(2)]
+    dag_repository = Mock()
+    dag_repository.get_manifest.return_value = {"urn:dc:old": "old-fingerprint"}
+    dag_repository.create_or_update_dag.side_effect = lambda dc_id, *_: (
+        DagRepositoryError(error_msg="publish error")
+        if dc_id == "urn:dc:1"
+        else DagWriteOutcome.WRITTEN
+    )
+    dag_repository.delete_dags.return_value = DagRepositoryError(
+        error_msg="delete error", failed_dags={"urn:dc:old": "AccessDenied"}
+    )
+    provisioner = _incremental_provisioner(dag_repository)
+
+    system_err = provisioner.provision(descriptor, workload, data_contracts)
+
+    assert isinstance(system_err, SystemErr)
+    assert system_err.error == "publish error\ndelete error"
+    manifest = dag_repository.put_manifest.call_args.args[2]
+    # the failed DAG is rendered again, the failed deletion is retried
+    assert set(manifest.keys()) == {"urn:dc:0", "urn:dc:old"}
+    assert manifest["urn:dc:old"] == "old-fingerprint"
+
+
+def test_provision_incremental_disabled(unpacked_request):
+    descriptor, workload, _ = unpacked_request
+    data_contracts = [_mock_data_contract("urn:dc:0")]
+    dag_repository = Mock()
+    dag_repository.create_or_update_dag.return_value = DagWriteOutcome.WRITTEN
+    provisioner = _incremental_provisioner(dag_repository, incremental=False)
+
+    provisioning_status = provisioner.provision(descriptor, workload, data_contracts)
+
+    assert isinstance(provisioning_status, ProvisioningStatus)
+    dag_repository.get_manifest.assert_not_called()
+    dag_repository.put_manifest.assert_not_called()
+    dag_repository.create_or_update_dag.assert_called_once()
+
+
+def test_provision_incremental_unreadable_manifest(unpacked_request):
+    descriptor, workload, _ = unpacked_request
+    data_contracts = [_mock_data_contract(f"urn:dc:{i}") for i in range(2)]
+    dag_repository = Mock()
+    dag_repository.get_manifest.return_value = DagRepositoryError(error_msg="error")
+    dag_repository.create_or_update_dag.return_value = DagWriteOutcome.WRITTEN
+    provisioner = _incremental_provisioner(dag_repository)
+
+    provisioning_status = provisioner.provision(descriptor, workload, data_contracts)
+
+    assert isinstance(provisioning_status, ProvisioningStatus)
+    assert dag_repository.create_or_update_dag.call_count == 2
+
+
+def test_unprovision_ko_manifest(unpacked_request):
+    descriptor, workload, data_contracts = unpacked_request
+    dag_repository = Mock()
+    dag_repository.delete_manifest.return_value = DagRepositoryError(error_msg="error")
+    provisioner = _incremental_provisioner(dag_repository)
+
+    system_err = provisioner.unprovision(descriptor, workload, data_contracts)
+
+    assert isinstance(system_err, SystemErr)
+    dag_repository.delete_dags.assert_not_called()
+
+
+guarded_id = "urn:dmb:cmp:marketing:system-with-data-contract:0:consumable-data-contract"  # noqa: E501
+orphan_key = "dags/dag_urn_dmb_cmp_marketing_system_with_data_contract_0_dropped_development.py"  # noqa: E501
+
+
+@pytest.mark.parametrize("dry_run", [True, False])
+def test_reconcile_dags(unpacked_request, dry_run):
+    descriptor, _, _ = unpacked_request
+    dag_repository = Mock()
+    dag_repository.find_orphan_dags.return_value = (2, [orphan_key])
+    dag_repository.delete_dag_keys.return_value = None
+    provisioner = _incremental_provisioner(dag_repository)
+
+    report = provisioner.reconcile_dags(descriptor.data_product, dry_run=dry_run)
+
+    assert isinstance(report, DagReconciliationReport)
+    assert report.dryRun == dry_run
+    assert report.listed == 2
+    assert report.orphans == [orphan_key]
+    assert report.deleted == ([] if dry_run else [orphan_key])
+    dag_repository.find_orphan_dags.assert_called_once_with(
+        "urn:dmb:cmp:marketing:system-with-data-contract:0:",
+        [guarded_id],
+        "development",
+    )
+    assert dag_repository.delete_dag_keys.call_count == (0 if dry_run else 1)
+
+
+def _parse_data_product(descriptor_str: str, use_case_template_id: str, guards):
+    request = yaml.safe_load(descriptor_str)
+    for component in request["dataProduct"]["components"]:
+        if "__dataContractGuardianSpec" in component:
+            component["useCaseTemplateId"] = use_case_template_id
+            component["__dataContractGuardianSpec"]["guards"] = guards
+    return parse_yaml_with_model(request.get("dataProduct"), DataProduct)
+
+
+def test_reconcile_dags_custom_use_case_template(descriptor_str):
+    data_product = _parse_data_product(
+        descriptor_str,
+        "urn:dmb:utm:custom-guardian-template:0.0.0",
+        [{"dataContractId": guarded_id}],
+    )
+    dag_repository = Mock()
+    dag_repository.find_orphan_dags.return_value = (1, [])
+    provisioner = _incremental_provisioner(dag_repository)
+
+    report = provisioner.reconcile_dags(data_product, dry_run=False)
+
+    assert isinstance(report, DagReconciliationReport)
+    assert dag_repository.find_orphan_dags.call_args.args[1] == [guarded_id]
+    dag_repository.delete_dag_keys.assert_not_called()
+
+
+def test_reconcile_dags_invalid_guardian_spec(descriptor_str):
+    data_product = _parse_data_product(
+        descriptor_str, "urn:dmb:utm:custom-guardian-template:0.0.0", "not a list"
+    )
+    dag_repository = Mock()
+    provisioner = _incremental_provisioner(dag_repository)
+
+    assert isinstance(provisioner.reconcile_dags(data_product), SystemErr)
+    dag_repository.find_orphan_dags.assert_not_called()
+
+
+def test_reconcile_dags_kept_ids(unpacked_request):
+    descriptor, _, _ = unpacked_request
+    dag_repository = Mock()
+    dag_repository.find_orphan_dags.return_value = (0, [])
+    provisioner = _incremental_provisioner(dag_repository)
+
+    provisioner.reconcile_dags(descriptor.data_product, kept_ids=["urn:dc:kept"])
+
+    assert dag_repository.find_orphan_dags.call_args.args[1] == [
+        guarded_id,
+        "urn:dc:kept",
+    ]
+
+
+def test_reconcile_dags_reports_failed_deletions(unpacked_request):
+    descriptor, _, _ = unpacked_request
+    dag_repository = Mock()
+    dag_repository.find_orphan_dags.return_value = (1, [orphan_key])
+    dag_repository.delete_dag_keys.return_value = DagRepositoryError(
+        error_msg="error", failed_dags={orphan_key: "AccessDenied"}
+    )
+    provisioner = _incremental_provisioner(dag_repository)
+
+    report = provisioner.reconcile_dags(descriptor.data_product, dry_run=False)
+
+    assert isinstance(report, DagReconciliationReport)
+    assert report.deleted == []
+    assert report.failed == {orphan_key: "AccessDenied"}
+
+
+def test_reconcile_dags_ko(unpacked_request):
+    descriptor, _, _ = unpacked_request
+    dag_repository = Mock()
+    dag_repository.find_orphan_dags.return_value = DagRepositoryError(error_msg="error")
+    provisioner = _incremental_provisioner(dag_repository)
+    data_product = descriptor.data_product.model_copy(update={"id": "dp"})
+
+    assert isinstance(provisioner.reconcile_dags(data_product), SystemErr)
+    dag_repository.find_orphan_dags.assert_not_called()
+    assert isinstance(provisioner.reconcile_dags(descriptor.data_product), SystemErr)
+
+
+def test_provision_reconcile(unpacked_request):
+    descriptor, workload, data_contracts = unpacked_request
+    dag_repository = Mock()
+    dag_repository.get_manifest.return_value = dict()
+    dag_repository.create_or_update_dag.return_value = DagWriteOutcome.WRITTEN
+    dag_repository.find_orphan_dags.return_value = (2, [orphan_key])
+    dag_repository.delete_dag_keys.return_value = None
+    provisioner = _incremental_provisioner(dag_repository, reconcile="delete")
+
+    provisioning_status = provisioner.provision(descriptor, workload, data_contracts)
+
+    assert isinstance(provisioning_status, ProvisioningStatus)
+    assert provisioning_status.info is not None
+    assert provisioning_status.info.privateInfo == {
+        "dags": {"written": 1, "skipped": 0, "deleted": 0},
+        "orphans": {"found": 1, "deleted": 1},
+    }
+    dag_repository.delete_dag_keys.assert_called_once_with([orphan_key])
+    assert dag_repository.find_orphan_dags.call_args.args[1] == [
+        guarded_id,
+        *[data_contract.id for data_contract in data_contracts],
+    ]
+
+
+def test_provision_reconcile_error_does_not_fail(unpacked_request):
+    descriptor, workload, data_contracts = unpacked_request
+    dag_repository = Mock()
+    dag_repository.get_manifest.return_value = dict()
+    dag_repository.create_or_update_dag.return_value = DagWriteOutcome.WRITTEN
+    dag_repository.find_orphan_dags.return_value = DagRepositoryError(error_msg="error")
+    provisioner = _incremental_provisioner(dag_repository, reconcile="dry_run")
+
+    provisioning_status = provisioner.provision(descriptor, workload, data_contracts)
+
+    assert isinstance(provisioning_status, ProvisioningStatus)
+    assert provisioning_status.status == Status1.COMPLETED
+
+
+@pytest.mark.parametrize(
+    "airflow_settings",
+    [
+        {"task_python": "external_python"},
+        {"task_python": "external_python", "python_executable": "bin/python"},
+        {"venv_cache_path": '/opt/venvs"'},
+        {"gx_context_root_dir": "gx"},
+        {"gx_context_mode": "file", "gx_context_root_dir": '/opt/gx"\nimport os'},
+        {"gx_context_root_dir": "C:\\gx"},
+    ],
+)
+def test_provision_ko_task_python(unpacked_request, airflow_settings):
+    descriptor, workload, data_contracts = unpacked_request
+    dag_repository = Mock()
+    provisioner = ProvisionService(
+        dag_repository,
+        TemplateService(),
+        CGPSettings(base_url="http://localhost:8088"),
+        AirflowSettings(connection_id="connection_id", **airflow_settings),
+    )
+
+    system_err = provisioner.provision(descriptor, workload, data_contracts)
+
+    assert isinstance(system_err, SystemErr)
+    dag_repository.create_or_update_dag.assert_not_called()
+
+
+def test_provision_external_python(unpacked_request):
+    descriptor, workload, data_contracts = unpacked_request
+    dag_repository = Mock()
+    dag_repository.get_manifest.return_value = dict()
+    dag_repository.create_or_update_dag.return_value = DagWriteOutcome.WRITTEN
+    provisioner = ProvisionService(
+        dag_repository,
+        TemplateService(),
+        CGPSettings(base_url="http://localhost:8088"),
+        AirflowSettings(
+            connection_id="connection_id",
+            task_python="external_python",
+            python_executable="/opt/gx/bin/python",
+        ),
+    )
+
+    provisioning_status = provisioner.provision(descriptor, workload, data_contracts)
+
+    assert isinstance(provisioning_status, ProvisioningStatus)
+    rendered_dag = dag_repository.create_or_update_dag.call_args.args[1]
+    assert '@task.external_python(python="/opt/gx/bin/python")' in rendered_dag
+
+
+def test_provision_grouped(unpacked_request):
+    descriptor, workload, _ = unpacked_request
+    data_contracts = [_mock_data_contract(f"urn:dc:{i}") for i in range(5)]
+    dag_repository = Mock()
+    # DAGs published for the single data contracts before grouping was enabled
+    dag_repository.get_manifest.return_value = {"urn:dc:0": "fingerprint"}
+    dag_repository.create_or_update_dag.return_value = DagWriteOutcome.WRITTEN
+    dag_repository.delete_dags.return_value = None
+    provisioner = _incremental_provisioner(
+        dag_repository, dag_grouping="guardian", group_batch_size=2
+    )
+    progress: dict[str, list[DagProgress]] = dict()
+
+    provisioning_status = provisioner.provision(
+        descriptor,
+        workload,
+        data_contracts,
+        lambda dc_id, dag_progress: progress.setdefault(dc_id, []).append(dag_progress),
+    )
+
+    assert isinstance(provisioning_status, ProvisioningStatus)
+    assert provisioning_status.info is not None
+    assert provisioning_status.info.privateInfo == {
+        "dags": {"written": 1, "skipped": 0, "deleted": 1}
+    }
+    dag_repository.create_or_update_dag.assert_called_once()
+    dag_id, rendered_dag, environment = (
+        dag_repository.create_or_update_dag.call_args.args
+    )
+    assert dag_id == descriptor.component_id
+    assert environment == descriptor.data_product.environment
+    compile(rendered_dag, "dag.py", "exec")
+    assert (
+        'data_contract_batches = [["urn:dc:0", "urn:dc:1"], ["urn:dc:2", "urn:dc:3"], ["urn:dc:4"]]'  # noqa: E501
+        in rendered_dag
+    )
+    assert ".expand(data_contract_ids=data_contract_batches)" in rendered_dag
+    assert progress == {
+        f"urn:dc:{i}": [DagProgress.RUNNING, DagProgress.WRITTEN] for i in range(5)
+    }
+    dag_repository.delete_dags.assert_called_once_with(
+        ["urn:dc:0"], descriptor.data_product.environment
+    )
+    assert set(dag_repository.put_manifest.call_args.args[2].keys()) == {
+        descriptor.component_id
+    }
+
+
+def test_provision_grouped_skips_unchanged(unpacked_request):
+    descriptor, workload, _ = unpacked_request
+    data_contracts = [_mock_data_contract(f"urn:dc:{i}") for i in range(3)]
+    dag_repository = Mock()
+    dag_repository.get_manifest.return_value = dict()
+    dag_repository.create_or_update_dag.return_value = DagWriteOutcome.WRITTEN
+    provisioner = _incremental_provisioner(dag_repository, dag_grouping="guardian")
+    provisioner.provision(descriptor, workload, data_contracts)
+    manifest = dag_repository.put_manifest.call_args.args[2]
+    dag_repository.reset_mock()
+    dag_repository.get_manifest.return_value = manifest
+    dag_repository.find_existing_dags.side_effect = lambda ids, _: set(ids)
+
+    provisioning_status = provisioner.provision(descriptor, workload, data_contracts)
+
+    assert isinstance(provisioning_status, ProvisioningStatus)
+    assert provisioning_status.info is not None
+    assert provisioning_status.info.privateInfo == {
+        "dags": {"written": 0, "skipped": 1, "deleted": 0}
+    }
+    dag_repository.create_or_update_dag.assert_not_called()
+    dag_repository.put_manifest.assert_called_once_with(
+        descriptor.component_id, descriptor.data_product.environment, manifest
+    )
+
+
+def test_provision_grouped_restores_missing_dag(unpacked_request):
+    descriptor, workload, _ = unpacked_request
+    data_contracts = [_mock_data_contract(f"urn:dc:{i}") for i in range(3)]
+    dag_repository = Mock()
+    dag_repository.get_manifest.return_value = dict()
+    dag_repository.create_or_update_dag.return_value = DagWriteOutcome.WRITTEN
+    provisioner = _incremental_provisioner(dag_repository, dag_grouping="guardian")
+    provisioner.provision(descriptor, workload, data_contracts)
+    manifest = dag_repository.put_manifest.call_args.args[2]
+    dag_repository.reset_mock()
+    dag_repository.get_manifest.return_value = manifest
+    dag_repository.find_existing_dags.return_value = set()
+
+    provisioning_status = provisioner.provision(descriptor, workload, data_contracts)
+
+    assert isinstance(provisioning_status, ProvisioningStatus)
+    dag_repository.create_or_update_dag.assert_called_once()
+    dag_repository.find_existing_dags.assert_called_once_with(
+        [descriptor.component_id], descriptor.data_product.environment
+    )
+
+
+@pytest.mark.parametrize(
+    "previous_manifest",
+    [
+        dict(),
+        # DAG published for a data contract before grouping was enabled
+        {"urn:dc:0": "oldfp"},
+    ],
+)
+def test_provision_grouped_ko_publish(unpacked_request, previous_manifest):
+    descriptor, workload, data_contracts = unpacked_request
+    dag_repository = Mock()
+    dag_repository.get_manifest.return_value = {
+        **previous_manifest,
+        descriptor.component_id: "guardianfp",
+    }
+    dag_repository.create_or_update_dag.return_value = DagRepositoryError(
+        error_msg="error"
+    )
+    provisioner = _incremental_provisioner(dag_repository, dag_grouping="guardian")
+
+    system_err = provisioner.provision(descriptor, workload, data_contracts)
+
+    assert isinstance(system_err, SystemErr)
+    assert system_err.error == "error"
+    # the previous DAGs are kept until the guardian DAG is published, and the guardian
+    # DAG is rendered again by the next provisioning
+    dag_repository.delete_dags.assert_not_called()
+    assert dag_repository.put_manifest.call_args.args[2] == previous_manifest
+
+
+def test_unprovision_grouped(unpacked_request):
+    descriptor, workload, data_contracts = unpacked_request
+    dag_repository = Mock()
+    dag_repository.delete_manifest.return_value = None
+    dag_repository.delete_dags.return_value = None
+    provisioner = _incremental_provisioner(dag_repository, dag_grouping="guardian")
+
+    provisioning_status = provisioner.unprovision(descriptor, workload, data_contracts)
+
+    assert isinstance(provisioning_status, ProvisioningStatus)
+    dag_repository.delete_dags.assert_called_once_with(
+        [data_contracts[0].get_id(), descriptor.component_id],
+        descriptor.data_product.environment,
+    )
+
+
+def test_provision_grouped_ko_mixed_technologies(unpacked_request):
+    descriptor, workload, _ = unpacked_request
+    data_contracts = [_mock_data_contract(f"urn:dc:{i}") for i in range(2)]
+    data_contracts[1].get_technology.return_value = "Databricks"
+    dag_repository = Mock()
+    provisioner = _incremental_provisioner(dag_repository, dag_grouping="guardian")
+
+    system_err = provisioner.provision(descriptor, workload, data_contracts)
+
+    assert isinstance(system_err, SystemErr)
+    dag_repository.create_or_update_dag.assert_not_called()
+
+
+def test_provision_grouped_ko_file_context(unpacked_request):
+    descriptor, workload, data_contracts = unpacked_request
+    dag_repository = Mock()
+    provisioner = ProvisionService(
+        dag_repository,
+        TemplateService(),
+        CGPSettings(base_url="http://localhost:8088"),
+        AirflowSettings(connection_id="connection_id", gx_context_mode="file"),
+        ProvisionSettings(dag_grouping="guardian"),
+    )
+
+    system_err = provisioner.provision(descriptor, workload, data_contracts)
+
+    assert isinstance(system_err, SystemErr)
+    dag_repository.create_or_update_dag.assert_not_called()
+
+
+def test_reconcile_dags_grouped(unpacked_request):
+    descriptor, _, _ = unpacked_request
+    dag_repository = Mock()
+    dag_repository.find_orphan_dags.return_value = (0, [])
+    provisioner = _incremental_provisioner(dag_repository, dag_grouping="guardian")
+
+    provisioner.reconcile_dags(descriptor.data_product)
+
+    assert dag_repository.find_orphan_dags.call_args.args[1] == [
+        descriptor.component_id
+    ]
+
+
+def _async_provisioner(dag_repository: Mock, async_dag_repository: Mock | None):
+    return ProvisionService(
+        dag_repository,
+        TemplateService(),
+        CGPSettings(base_url="http://localhost:8088"),
+        AirflowSettings(connection_id="connection_id"),
+        async_dag_repository=async_dag_repository,
+    )
+
+
+@pytest.mark.asyncio
+async def test_unprovision_async_ok(unpacked_request):
+    descriptor, workload, data_contracts = unpacked_request
+    dag_repository = Mock()
+    async_dag_repository = Mock()
+    async_dag_repository.delete_manifest = AsyncMock(return_value=None)
+    async_dag_repository.delete_dags = AsyncMock(return_value=None)
+    provisioner = _async_provisioner(dag_repository, async_dag_repository)
+
+    provisioning_status = await provisioner.unprovision_async(
+        descriptor, workload, data_contracts
+    )
+
+    assert isinstance(provisioning_status, ProvisioningStatus)
+    assert provisioning_status.status == Status1.COMPLETED
+    async_dag_repository.delete_dags.assert_awaited_once_with(
+        [data_contracts[0].get_id()], descriptor.data_product.environment
+    )
+    dag_repository.delete_dags.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_unprovision_async_ko(unpacked_request):
+    descriptor, workload, data_contracts = unpacked_request
+    async_dag_repository = Mock()
+    async_dag_repository.delete_manifest = AsyncMock(return_value=None)
+    async_dag_repository.delete_dags = AsyncMock(
+        return_value=DagRepositoryError(
+            error_msg="error", failed_dags={data_contracts[0].get_id(): "error"}
+        )
+    )
+    provisioner = _async_provisioner(Mock(), async_dag_repository)
+
+    system_err = await provisioner.unprovision_async(
+        descriptor, workload, data_contracts
+    )
+
+    assert isinstance(system_err, SystemErr)
+    assert system_err.error == "error"
+
+
+@pytest.mark.asyncio
+async def test_unprovision_async_grouped(unpacked_request):
+    descriptor, workload, data_contracts = unpacked_request
+    async_dag_repository = Mock()
+    async_dag_repository.delete_manifest = AsyncMock(return_value=None)
+    async_dag_repository.delete_dags = AsyncMock(return_value=None)
+    provisioner = ProvisionService(
+        Mock(),
+        TemplateService(),
+        CGPSettings(base_url="http://localhost:8088"),
+        AirflowSettings(connection_id="connection_id"),
+        ProvisionSettings(dag_grouping="guardian"),
+        async_dag_repository,
+    )
+
+    provisioning_status = await provisioner.unprovision_async(
+        descriptor, workload, data_contracts
+    )
+
+    assert isinstance(provisioning_status, ProvisioningStatus)
+    async_dag_repository.delete_dags.assert_awaited_once_with(
+        [data_contracts[0].get_id(), descriptor.component_id],
+        descriptor.data_product.environment,
+    )
+
+
+@pytest.mark.asyncio
+async def test_unprovision_async_without_async_repository(unpacked_request):
+    descriptor, workload, data_contracts = unpacked_request
+    dag_repository = Mock()
+    dag_repository.delete_manifest.return_value = None
+    dag_repository.delete_dags.return_value = None
+    provisioner = _async_provisioner(dag_repository, None)
+
+    provisioning_status = await provisioner.unprovision_async(
+        descriptor, workload, data_contracts
+    )
+
+    assert isinstance(provisioning_status, ProvisioningStatus)
+    dag_repository.delete_dags.assert_called_once()
+
+
+@pytest.mark.parametrize("dag_grouping", ["data_contract", "guardian"])
+def test_provision_uploads_through_portal(unpacked_request, dag_grouping):
+    descriptor, workload, data_contracts = unpacked_request
+    dag_repository = Mock()
+    dag_repository.get_manifest.return_value = dict()
+    async_dag_repository = Mock()
+    async_dag_repository.create_or_update_dag = AsyncMock(
+        return_value=DagWriteOutcome.WRITTEN
+    )
+    async_dag_repository.create_or_update_dags = AsyncMock(
+        side_effect=lambda dags, _: {dag_id: DagWriteOutcome.WRITTEN for dag_id in dags}
+    )
+    provisioner = ProvisionService(
+        dag_repository,
+        TemplateService(),
+        CGPSettings(base_url="http://localhost:8088"),
+        AirflowSettings(connection_id="connection_id"),
+        ProvisionSettings(dag_grouping=dag_grouping),
+        async_dag_repository,
+    )
+    progress: dict[str, list[DagProgress]] = {}
+
+    with start_blocking_portal() as portal:
+        provisioning_status = provisioner.provision(
+            descriptor,
+            workload,
+            data_contracts,
+            lambda dag_id, dag_progress: progress.setdefault(dag_id, []).append(
+                dag_progress
+            ),
+            portal,
+        )
+
+    assert isinstance(provisioning_status, ProvisioningStatus)
+    assert provisioning_status.status == Status1.COMPLETED
+    assert progress == {
+        data_contracts[0].get_id(): [DagProgress.RUNNING, DagProgress.WRITTEN]
+    }
+    dag_repository.create_or_update_dag.assert_not_called()
+    if dag_grouping == "guardian":
+        async_dag_repository.create_or_update_dag.assert_awaited_once()
+        assert (
+            async_dag_repository.create_or_update_dag.call_args.args[0]
+            == descriptor.component_id
+        )
+    else:
+        async_dag_repository.create_or_update_dags.assert_awaited_once()
+        assert list(
+            async_dag_repository.create_or_update_dags.call_args.args[0].keys()
+        ) == [data_contracts[0].get_id()]
+
+
+def test_provision_reports_failed_uploads_through_portal(unpacked_request):
+    descriptor, workload, data_contracts = unpacked_request
+    dag_repository = Mock()
+    dag_repository.get_manifest.return_value = dict()
+    async_dag_repository = Mock()
+    async_dag_repository.create_or_update_dags = AsyncMock(
+        side_effect=lambda dags, _: {
+            dag_id: DagRepositoryError(error_msg="upload error") for dag_id in dags
+        }
+    )
+    provisioner = _async_provisioner(dag_repository, async_dag_repository)
+
+    with start_blocking_portal() as portal:
+        system_err = provisioner.provision(
+            descriptor, workload, data_contracts, portal=portal
+        )
+
+    assert isinstance(system_err, SystemErr)
+    assert "upload error" in system_err.error
+
+
+def test_provision_without_portal_uses_sync_repository(unpacked_request):
+    descriptor, workload, data_contracts = unpacked_request
+    dag_repository = Mock()
+    dag_repository.get_manifest.return_value = dict()
+    dag_repository.create_or_update_dag.return_value = DagWriteOutcome.WRITTEN
+    async_dag_repository = Mock()
+    provisioner = _async_provisioner(dag_repository, async_dag_repository)
+
+    provisioning_status = provisioner.provision(descriptor, workload, data_contracts)
+
+    assert isinstance(provisioning_status, ProvisioningStatus)
+    dag_repository.create_or_update_dag.assert_called_once()
+    async_dag_repository.create_or_update_dags.assert_not_called()
+
+
+def _get_embedded_descriptor(rendered_dag: str) -> dict:
+    start = rendered_dag.index('descriptor = r"""') + len('descriptor = r"""')
+    end = rendered_dag.index('"""', start)
+    return json.loads(rendered_dag[start:end])
+
+
+@pytest.mark.parametrize("descriptor_embedding", ["component", "full"])
+def test_provision_descriptor_embedding(unpacked_request, descriptor_embedding):
+    descriptor, workload, data_contracts = unpacked_request
+    dag_repository = Mock()
+    dag_repository.get_manifest.return_value = dict()
+    dag_repository.create_or_update_dag.return_value = DagWriteOutcome.WRITTEN
+    cgp_settings = CGPSettings(base_url="http://localhost:8088")
+    airflow_settings = AirflowSettings(connection_id="connection_id")
+    provisioner = ProvisionService(
+        dag_repository,
+        TemplateService(),
+        cgp_settings,
+        airflow_settings,
+        ProvisionSettings(descriptor_embedding=descriptor_embedding),
+    )
+
+    provisioner.provision(descriptor, workload, data_contracts)
+
+    data_contract_id = data_contracts[0].get_id()
+    rendered_dag = dag_repository.create_or_update_dag.call_args.args[1]
+    embedded_descriptor = _get_embedded_descriptor(rendered_dag)
+    components = embedded_descriptor["dataProduct"]["components"]
+    # the DAG looks up its component by ID in both modes
+    component = next(c for c in components if c["id"] == data_contract_id)
+    assert component["technology"] == "Snowflake"
+    assert component["specific"]["database"] is not None
+    assert "quality" in component["dataContract"]
+    if descriptor_embedding == "component":
+        assert len(components) == 1
+        assert "schema" not in component["dataContract"]
+    else:
+        assert len(components) == len(descriptor.data_product.components)
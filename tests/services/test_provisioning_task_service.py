@@ -0,0 +1,136 @@
+from concurrent.futures import Executor, Future
+from unittest.mock import Mock
+
+from src.models.api_models import (
+    Info,
+    ProvisioningStatus,
+    Status1,
+    SystemErr,
+    ValidationError,
+)
+from src.models.provisioning_task import DagProgress
+from src.repositories.in_memory_task_repository import InMemoryTaskRepository
+from src.services.provisioning_task_service import ProvisioningTaskService
+
+
+class DeferredExecutor(Executor):
+    """Runs the submitted calls only when `run_all` is called"""
+
+    def __init__(self):
+        self.calls = []
+
+    def submit(self, fn, /, *args, **kwargs):
+        self.calls.append((fn, args, kwargs))
+        return Future()
+
+    def run_all(self):
+        for fn, args, kwargs in self.calls:
+            fn(*args, **kwargs)
+
+
+def _mock_data_contract(data_contract_id: str) -> Mock:
+    data_contract = Mock()
+    data_contract.get_id.return_value = data_contract_id
+    return data_contract
+
+
+def _submit(
+    provision_service: Mock, portal: Mock | None = None
+) -> tuple[ProvisioningTaskService, str, DeferredExecutor]:
+    executor = DeferredExecutor()
+    service = ProvisioningTaskService(InMemoryTaskRepository(), executor)
+    token = service.submit(
+        provision_service,
+        Mock(),
+        Mock(),
+        [_mock_data_contract("dc1"), _mock_data_contract("dc2")],
+        portal,
+    )
+    return service, token, executor
+
+
+def test_status_running_before_completion():
+    service, token, _ = _submit(Mock())
+
+    status = service.get_status(token)
+
+    assert isinstance(status, ProvisioningStatus)
+    assert status.status == Status1.RUNNING
+    assert status.info is not None
+    assert status.info.privateInfo == {
+        "dataContracts": {"dc1": DagProgress.PENDING, "dc2": DagProgress.PENDING}
+    }
+
+
+def test_status_completed():
+    def provision(descriptor, workload, data_contracts, progress_callback, portal):
+        progress_callback("dc1", DagProgress.WRITTEN)
+        progress_callback("dc2", DagProgress.SKIPPED)
+        return ProvisioningStatus(
+            status=Status1.COMPLETED,
+            result="",
+            info=Info(
+                publicInfo=dict(),
+                privateInfo={"dags": {"written": 1, "skipped": 1}},
+            ),
+        )
+
+    provision_service = Mock()
+    provision_service.provision.side_effect = provision
+    service, token, executor = _submit(provision_service)
+
+    executor.run_all()
+    status = service.get_status(token)
+
+    assert isinstance(status, ProvisioningStatus)
+    assert status.status == Status1.COMPLETED
+    assert status.info is not None
+    assert status.info.privateInfo == {
+        "dags": {"written": 1, "skipped": 1},
+        "dataContracts": {"dc1": DagProgress.WRITTEN, "dc2": DagProgress.SKIPPED},
+    }
+
+
+def test_provisioning_uploads_through_portal():
+    provision_service = Mock()
+    provision_service.provision.return_value = SystemErr(error="error")
+    portal = Mock()
+    _, _, executor = _submit(provision_service, portal)
+
+    executor.run_all()
+
+    assert provision_service.provision.call_args.args[4] is portal
+
+
+def test_status_failed():
+    provision_service = Mock()
+    provision_service.provision.return_value = SystemErr(error="error")
+    service, token, executor = _submit(provision_service)
+
+    executor.run_all()
+    status = service.get_status(token)
+
+    assert isinstance(status, ProvisioningStatus)
+    assert status.status == Status1.FAILED
+    assert status.result == "error"
+
+
+def test_status_failed_on_unexpected_error():
+    provision_service = Mock()
+    provision_service.provision.side_effect = RuntimeError("boom")
+    service, token, executor = _submit(provision_service)
+
+    executor.run_all()
+    status = service.get_status(token)
+
+    assert isinstance(status, ProvisioningStatus)
+    assert status.status == Status1.FAILED
+    assert "Details: boom" in status.result
+
+
+def test_status_unknown_token():
+    service = ProvisioningTaskService(InMemoryTaskRepository(), DeferredExecutor())
+
+    status = service.get_status("unknown")
+
+    assert isinstance(status, ValidationError)
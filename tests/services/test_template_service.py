@@ -1,4 +1,11 @@
+import ast
+import hashlib
+from pathlib import Path
+
+import pytest
+
 from src.services.template_service import TemplateService, TemplateServiceError
+from src.settings.template_settings import TemplateSettings
 
 
 def test_render_template_ok():
@@ -17,3 +24,169 @@ def test_render_template_ko():
     res = template_service.render_template(technology, dict())
 
     assert isinstance(res, TemplateServiceError)
+
+
+def test_environment_is_shared():
+    assert TemplateService().env is TemplateService().env
+
+
+def test_template_is_compiled_once():
+    template_service = TemplateService()
+
+    first = template_service._get_template("Snowflake")
+    second = template_service._get_template("snowflake")
+
+    assert first is second
+
+
+def test_precompile():
+    template_service = TemplateService(TemplateSettings(cache_size=10))
+
+    template_service.precompile()
+
+    assert template_service.env.cache is not None
+    assert any(
+        name == "snowflake.jinja" for _, name in template_service.env.cache.keys()
+    )
+
+
+def test_bytecode_cache(tmp_path):
+    bytecode_cache_dir = tmp_path / "jinja"
+    template_service = TemplateService(
+        TemplateSettings(bytecode_cache_dir=str(bytecode_cache_dir))
+    )
+
+    res = template_service.render_template("Snowflake", dict())
+
+    assert isinstance(res, str)
+    assert any(bytecode_cache_dir.iterdir())
+
+
+def test_get_template_digest():
+    template_service = TemplateService()
+    source = Path("src/templates/snowflake.jinja").read_text()
+
+    res = template_service.get_template_digest("Snowflake")
+
+    assert res == hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def test_get_template_digest_not_found():
+    template_service = TemplateService()
+
+    res = template_service.get_template_digest("Unknown")
+
+    assert isinstance(res, TemplateServiceError)
+
+
+@pytest.mark.parametrize(
+    "gx_context_mode,expected,unexpected",
+    [
+        ("ephemeral", "gx.get_context()", 'mode="file"'),
+        ("file", "project_root_dir=gx_context_root_dir", "gx.get_context()"),
+    ],
+)
+def test_render_template_gx_context_mode(gx_context_mode, expected, unexpected):
+    template_service = TemplateService()
+
+    res = template_service.render_template(
+        "Snowflake",
+        {
+            "data_contract_id": "urn:dmb:cmp:dp:0:data-contract",
+            "descriptor": "{}",
+            "gx_context_mode": gx_context_mode,
+            "gx_context_root_dir": "/opt/airflow/gx",
+        },
+    )
+
+    assert isinstance(res, str)
+    compile(res, "dag.py", "exec")
+    assert expected in res
+    assert unexpected not in res
+    if gx_context_mode == "file":
+        assert 'gx_context_root_dir = "/opt/airflow/gx"' in res
+        assert 'self.name = "urn_dmb_cmp_dp_0_data-contract"' in res
+        assert "checkpoint.run()" in res
+        # the password is substituted from the environment, never persisted
+        assert 'password="${" + gx_password_env_var + "}"' in res
+
+
+@pytest.mark.parametrize(
+    "parameters,expected,unexpected",
+    [
+        (dict(), "@task.virtualenv(", "venv_cache_path"),
+        (
+            {"venv_cache_path": "/opt/airflow/venvs"},
+            'venv_cache_path="/opt/airflow/venvs"',
+            "@task.external_python",
+        ),
+        (
+            {"task_python": "external_python", "python_executable": "/opt/gx/python"},
+            '@task.external_python(python="/opt/gx/python")',
+            "@task.virtualenv",
+        ),
+    ],
+)
+def test_render_template_task_python(parameters, expected, unexpected):
+    template_service = TemplateService()
+
+    res = template_service.render_template(
+        "Snowflake",
+        {"data_contract_id": "urn:dmb:cmp:dp:0:data-contract", **parameters},
+    )
+
+    assert isinstance(res, str)
+    compile(res, "dag.py", "exec")
+    assert res.count(expected) == 2
+    assert unexpected not in res
+
+
+def test_render_grouped_template():
+    template_service = TemplateService()
+
+    res = template_service.render_template(
+        "Snowflake",
+        {
+            "guardian_id": "urn:dmb:cmp:dp:0:guardian",
+            "data_contract_batches": [
+                ["urn:dmb:cmp:dp:0:dc-1"],
+                ["urn:dmb:cmp:dp:0:dc-2"],
+            ],
+            "descriptor": "{}",
+        },
+        grouped=True,
+    )
+
+    assert isinstance(res, str)
+    compile(res, "dag.py", "exec")
+    assert 'guardian_id_for_dag_id = "urn_dmb_cmp_dp_0_guardian"' in res
+
+
+def test_render_grouped_template_quotes_data_contract_ids():
+    template_service = TemplateService()
+    data_contract_batches = [["urn:dmb:cmp:dp:0:dc-'1'"], ['urn:dmb:cmp:dp:0:"dc"\\2']]
+
+    res = template_service.render_template(
+        "Snowflake",
+        {
+            "guardian_id": "urn:dmb:cmp:dp:0:guardian",
+            "data_contract_batches": data_contract_batches,
+            "descriptor": "{}",
+        },
+        grouped=True,
+    )
+
+    assert isinstance(res, str)
+    (line,) = [
+        line for line in res.splitlines() if line.startswith("data_contract_batches =")
+    ]
+    assert ast.literal_eval(line.split("=", 1)[1].strip()) == data_contract_batches
+
+
+def test_get_grouped_template_digest():
+    template_service = TemplateService()
+    source = Path("src/templates/snowflake_grouped.jinja").read_text()
+
+    res = template_service.get_template_digest("Snowflake", grouped=True)
+
+    assert res == hashlib.sha256(source.encode("utf-8")).hexdigest()
@@ -1,11 +1,22 @@
 from pathlib import Path
 
-from src.models.api_models import ValidationError
+import yaml
+
+from src.models.api_models import ValidationError, ValidationResult
 from src.models.data_product_descriptor import DataProduct
-from src.services.validation_service import validate_components
+from src.models.parsed_descriptor import ParsedDescriptor
+from src.services.validation_service import validate_components, validate_descriptor
 from src.utility.parsing_pydantic_models import parse_yaml_with_model
 
 
+def _parsed_descriptor(
+    descriptor_str: str, data_product: DataProduct, component_id: str
+) -> ParsedDescriptor:
+    return ParsedDescriptor(
+        {"dataProduct": yaml.safe_load(descriptor_str)}, data_product, component_id
+    )
+
+
 def test_validate_components_valid_guardian():
     descriptor_str = Path(
         "tests/descriptors/data_product_with_guardian_valid.yaml"
@@ -15,7 +26,11 @@ def test_validate_components_valid_guardian():
     assert isinstance(result, DataProduct)
 
     actual_res = validate_components(
-        (result, "urn:dmb:cmp:marketing:system-with-data-contract:0:guardian")
+        _parsed_descriptor(
+            descriptor_str,
+            result,
+            "urn:dmb:cmp:marketing:system-with-data-contract:0:guardian",
+        )
     )
 
     assert not isinstance(actual_res, ValidationError)
@@ -41,7 +56,11 @@ def test_validate_components_not_valid_guardian():
     assert isinstance(result, DataProduct)
 
     actual_res = validate_components(
-        (result, "urn:dmb:cmp:marketing:system-with-data-contract:0:guardian")
+        _parsed_descriptor(
+            descriptor_str,
+            result,
+            "urn:dmb:cmp:marketing:system-with-data-contract:0:guardian",
+        )
     )
 
     assert isinstance(actual_res, ValidationError)
@@ -59,7 +78,9 @@ def test_validate_components_no_guardian():
     assert isinstance(result, DataProduct)
     component_id = "urn:dmb:cmp:marketing:system-with-data-contract:0:guardian"
 
-    actual_res = validate_components((result, component_id))
+    actual_res = validate_components(
+        _parsed_descriptor(descriptor_str, result, component_id)
+    )
 
     assert isinstance(actual_res, ValidationError)
     assert len(actual_res.errors) == 1
@@ -78,7 +99,9 @@ def test_validate_components_no_data_contracts():
     assert isinstance(result, DataProduct)
     component_id = "urn:dmb:cmp:marketing:system-with-data-contract:0:guardian"
 
-    actual_res = validate_components((result, component_id))
+    actual_res = validate_components(
+        _parsed_descriptor(descriptor_str, result, component_id)
+    )
 
     assert isinstance(actual_res, ValidationError)
     assert len(actual_res.errors) == 1
@@ -97,7 +120,9 @@ def test_validate_components_unsupported_data_contracts():
     assert isinstance(result, DataProduct)
     component_id = "urn:dmb:cmp:marketing:system-with-data-contract:0:guardian"
 
-    actual_res = validate_components((result, component_id))
+    actual_res = validate_components(
+        _parsed_descriptor(descriptor_str, result, component_id)
+    )
 
     assert isinstance(actual_res, ValidationError)
     assert len(actual_res.errors) == 6
@@ -105,3 +130,17 @@ def test_validate_components_unsupported_data_contracts():
         "One or more components to guard are not supported by this Tech Adapter:"
         == actual_res.errors[0]
     )
+
+
+def test_validate_descriptor_valid():
+    descriptor_str = Path("tests/descriptors/descriptor_valid.yaml").read_text()
+
+    assert validate_descriptor(descriptor_str) == ValidationResult(valid=True)
+
+
+def test_validate_descriptor_not_valid():
+    result = validate_descriptor("descriptor")
+
+    assert not result.valid
+    assert result.error is not None
+    assert "Unable to parse the descriptor." in result.error.errors
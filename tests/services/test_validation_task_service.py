@@ -0,0 +1,121 @@
+from concurrent.futures import Executor, Future
+from unittest.mock import Mock
+
+from src.models.api_models import (
+    Status,
+    ValidationError,
+    ValidationResult,
+    ValidationStatus,
+)
+from src.services.validation_task_service import ValidationTaskService
+from src.settings.validation_settings import ValidationSettings
+
+
+class DeferredExecutor(Executor):
+    """Runs the submitted calls only when `run_all` is called"""
+
+    def __init__(self):
+        self.calls = []
+
+    def submit(self, fn, /, *args, **kwargs):
+        self.calls.append((fn, args, kwargs))
+        return Future()
+
+    def run_all(self):
+        calls, self.calls = self.calls, []
+        for fn, args, kwargs in calls:
+            fn(*args, **kwargs)
+
+
+def test_status_running_before_completion():
+    service = ValidationTaskService(Mock(), DeferredExecutor())
+
+    token = service.submit("descriptor")
+
+    assert service.get_status(token) == ValidationStatus(status=Status.RUNNING)
+
+
+def test_status_completed():
+    result = ValidationResult(
+        valid=False, error=ValidationError(errors=["invalid descriptor"])
+    )
+    validator = Mock(return_value=result)
+    executor = DeferredExecutor()
+    service = ValidationTaskService(validator, executor)
+
+    token = service.submit("descriptor")
+    executor.run_all()
+
+    validator.assert_called_once_with("descriptor")
+    assert service.get_status(token) == ValidationStatus(
+        status=Status.COMPLETED, result=result
+    )
+
+
+def test_status_failed_on_unexpected_error():
+    validator = Mock(side_effect=RuntimeError("boom"))
+    executor = DeferredExecutor()
+    service = ValidationTaskService(validator, executor)
+
+    token = service.submit("descriptor")
+    executor.run_all()
+
+    status = service.get_status(token)
+    assert isinstance(status, ValidationStatus)
+    assert status.status == Status.FAILED
+    assert status.result is not None and status.result.error is not None
+    assert "Details: boom" in status.result.error.errors[0]
+
+
+def test_repeated_validation_is_served_from_cache():
+    validator = Mock(return_value=ValidationResult(valid=True))
+    executor = DeferredExecutor()
+    service = ValidationTaskService(validator, executor)
+    first_token = service.submit("descriptor")
+    executor.run_all()
+
+    second_token = service.submit("descriptor")
+
+    assert first_token != second_token
+    assert executor.calls == []
+    assert validator.call_count == 1
+    assert service.get_status(second_token) == ValidationStatus(
+        status=Status.COMPLETED, result=ValidationResult(valid=True)
+    )
+    assert (service.results.hits, service.results.misses) == (1, 1)
+
+
+def test_failed_validation_is_not_cached():
+    validator = Mock(side_effect=[RuntimeError("boom"), ValidationResult(valid=True)])
+    executor = DeferredExecutor()
+    service = ValidationTaskService(validator, executor)
+    service.submit("descriptor")
+    executor.run_all()
+
+    token = service.submit("descriptor")
+    executor.run_all()
+
+    assert validator.call_count == 2
+    assert service.get_status(token) == ValidationStatus(
+        status=Status.COMPLETED, result=ValidationResult(valid=True)
+    )
+
+
+def test_results_cache_is_bounded():
+    validator = Mock(return_value=ValidationResult(valid=True))
+    executor = DeferredExecutor()
+    service = ValidationTaskService(
+        validator, executor, ValidationSettings(cache_max_entries=2)
+    )
+
+    for descriptor in ("a", "b", "c"):
+        service.submit(descriptor)
+        executor.run_all()
+
+    assert len(service.results) == 2
+
+
+def test_status_unknown_token():
+    service = ValidationTaskService(Mock(), DeferredExecutor())
+
+    assert isinstance(service.get_status("unknown"), ValidationError)
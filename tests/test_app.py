@@ -30,18 +30,18 @@ def fun1(request: RequestModel) -> Response:
         val = request.val
 
     if val == 1:
-        return check_response(out_response=1, application=app2)
+        return check_response(out_response=1, application=app2, endpoint=fun1)
 
     if val == 2:
-        return check_response(out_response="ris=202", application=app2)
+        return check_response(out_response="ris=202", application=app2, endpoint=fun1)
 
     if val == 3:
         resp = SystemErr(error="error")
-        return check_response(out_response=resp, application=app2)
+        return check_response(out_response=resp, application=app2, endpoint=fun1)
 
     else:
         resp2 = ValidationError(errors=["wrong input"])
-        return check_response(out_response=resp2, application=app2)
+        return check_response(out_response=resp2, application=app2, endpoint=fun1)
 
 
 client = TestClient(app2)
@@ -113,3 +113,43 @@ class TestCheckResponses(unittest.TestCase):
         )
         self.assertEqual(response.status_code, 500)
         self.assertIn("error", json.loads(response.body))
+
+    def test_check_responses_route_path(self):
+        response = check_response(
+            application=app2, out_response="ris", route_path="/v1/test"
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.body, b"ris")
+
+    def test_check_responses_unknown_route_path(self):
+        response = check_response(
+            application=app2, out_response="ris", route_path="/v1/unknown"
+        )
+        self.assertEqual(response.status_code, 500)
+
+    def test_check_responses_routes_added_later(self):
+        app3 = FastAPI()
+        self.assertEqual(
+            check_response(
+                application=app3, out_response=1, route_path="/v1/late"
+            ).status_code,
+            500,
+        )
+
+        @app3.get("/v1/late", responses={"201": {"model": int}})
+        def late() -> Response:
+            return check_response(out_response=1, application=app3, endpoint=late)
+
+        self.assertEqual(late().status_code, 201)
+
+    def test_check_responses_unknown_endpoint(self):
+        def unknown() -> Response:
+            return check_response(out_response=1, application=app2, endpoint=unknown)
+
+        self.assertEqual(unknown().status_code, 500)
+
+    def test_check_responses_without_route(self):
+        # the route is never looked up from the call stack
+        self.assertEqual(
+            check_response(out_response=1, application=app2).status_code, 500
+        )
@@ -17,7 +17,11 @@ from src.models.data_product_descriptor import (
     OutputPort,
     StorageArea,
     Workload,
+    parse_component,
+    register_component_model,
+    specialized_component_map,
 )
+from src.models.gx_models import GXGuardianWorkload, SnowflakeOutputPort
 from src.utility.parsing_pydantic_models import parse_yaml_with_model
 
 
@@ -190,6 +194,56 @@ class TestDataProductDescriptor(unittest.TestCase):
         self.assertIsInstance(observability_apis[0], Observability)
         self.assertEqual("obs1", observability_apis[0].id)
 
+    def test_get_data_contract_components(self):
+        self.sample_data_product.components[1].dataContractEnabled = True
+        self.sample_data_product.invalidate_component_index()
+
+        data_contracts = self.sample_data_product.get_data_contract_components()
+
+        self.assertEqual(["op2"], [dc.id for dc in data_contracts])
+
+    def test_component_index_follows_added_components(self):
+        self.assertIsNone(self.sample_data_product.get_component_by_id("wl2"))
+        workload = self.sample_data_product.get_workloads()[0].model_copy(
+            update={"id": "wl2"}
+        )
+
+        self.sample_data_product.components.append(workload)
+
+        self.assertIs(workload, self.sample_data_product.get_component_by_id("wl2"))
+        self.assertEqual(2, len(self.sample_data_product.get_workloads()))
+
+    def test_component_index_follows_reassigned_components(self):
+        self.assertIsNotNone(self.sample_data_product.get_component_by_id("op1"))
+        components = list(self.sample_data_product.components)
+
+        self.sample_data_product.components = components[2:]
+
+        self.assertIsNone(self.sample_data_product.get_component_by_id("op1"))
+        self.assertEqual([], self.sample_data_product.get_output_ports())
+
+    def test_component_index_follows_components_reassigned_without_lookup(self):
+        self.assertIsNotNone(self.sample_data_product.get_component_by_id("op1"))
+        components = list(self.sample_data_product.components)
+
+        for i in range(100):
+            # the discarded lists can be freed and their identity reused
+            self.sample_data_product.components = list(components)
+            workload = components[-1].model_copy(update={"id": f"reassigned{i}"})
+            self.sample_data_product.components = components[:-1] + [workload]
+
+            self.assertIs(
+                workload, self.sample_data_product.get_component_by_id(f"reassigned{i}")
+            )
+
+    def test_get_components_by_kind_returns_a_copy(self):
+        workloads = self.sample_data_product.get_components_by_kind(
+            ComponentKind.WORKLOAD
+        )
+        workloads.clear()
+
+        self.assertEqual(1, len(self.sample_data_product.get_workloads()))
+
     def test_output_port_check_kind_classmethod(self):
         valid_output_port_data = """
             id: output_port_1
@@ -338,8 +392,8 @@ class TestDataProductDescriptor(unittest.TestCase):
 
         valid_column_data = yaml.safe_load(valid_column_data)
 
-        OpenMetadataColumn.check_dataType(
-            "string", valid_column_data
+        OpenMetadataColumn.model_validate(
+            valid_column_data
         )  # Should not raise an error
 
         invalid_column_data = """
@@ -351,7 +405,7 @@ class TestDataProductDescriptor(unittest.TestCase):
         invalid_column_data = yaml.safe_load(invalid_column_data)
 
         with pytest.raises(ValueError):
-            OpenMetadataColumn.check_dataType("invalid_type", invalid_column_data)
+            OpenMetadataColumn.model_validate(invalid_column_data)
 
     def test_workload_without_readsFrom(self):
         input_data = """
@@ -400,3 +454,117 @@ class TestDataProductDescriptor(unittest.TestCase):
             data_product.get_typed_component_by_id(
                 invalid_component_to_provision, OutputPort
             )
+
+
+def _parse_data_product(descriptor_path: str) -> DataProduct:
+    request = yaml.safe_load(Path(descriptor_path).read_text())
+    data_product = parse_yaml_with_model(
+        request.get("dataProduct", request), DataProduct
+    )
+    assert isinstance(data_product, DataProduct)
+    return data_product
+
+
+def test_parse_component_uses_registered_models():
+    data_product = _parse_data_product("tests/descriptors/descriptor_valid.yaml")
+    guardian_id = "urn:dmb:cmp:marketing:system-with-data-contract:0:guardian"
+
+    guardian = data_product.get_component_by_id(guardian_id)
+    output_ports = data_product.get_output_ports()
+
+    assert isinstance(guardian, GXGuardianWorkload)
+    assert len(output_ports) == 1
+    assert isinstance(output_ports[0], SnowflakeOutputPort)
+    assert (
+        data_product.get_typed_component_by_id(guardian_id, GXGuardianWorkload)
+        is guardian
+    )
+
+
+def test_parse_component_falls_back_to_kind_model():
+    data_product = _parse_data_product(
+        "tests/descriptors/data_product_with_guardian_unsupported_op.yaml"
+    )
+
+    output_ports = data_product.get_output_ports()
+
+    assert [type(op) for op in output_ports] == [OutputPort, SnowflakeOutputPort]
+    assert output_ports[0].technology == "Databricks"
+
+
+def test_parse_component_falls_back_on_invalid_specialized_component():
+    data_product = _parse_data_product("tests/descriptors/descriptor_valid.yaml")
+    output_port_dict = data_product.get_output_ports()[0].model_dump(by_alias=True)
+    del output_port_dict["specific"]["tableName"]
+
+    output_port = parse_component(output_port_dict)
+
+    assert type(output_port) is OutputPort
+
+
+def test_register_component_model():
+    class CustomStorageArea(StorageArea):
+        pass
+
+    register_component_model(
+        CustomStorageArea,
+        ComponentKind.STORAGE,
+        technology="Custom",
+        use_case_template="urn:dmb:utm:custom-storage-template",
+    )
+    storage_area = {
+        "id": "sa1",
+        "name": "Storage Area 1",
+        "description": "A storage area",
+        "specific": {},
+        "kind": "storage",
+        "infrastructureTemplateId": "infra3",
+        "useCaseTemplateId": "urn:dmb:utm:custom-storage-template:1.0.0",
+        "technology": "Custom",
+        "dependsOn": [],
+        "tags": [],
+    }
+
+    try:
+        assert type(parse_component(storage_area)) is CustomStorageArea
+        assert (
+            type(parse_component({**storage_area, "technology": "Other"}))
+            is StorageArea
+        )
+    finally:
+        del specialized_component_map[
+            (ComponentKind.STORAGE, "Custom", "urn:dmb:utm:custom-storage-template")
+        ]
+
+
+def test_data_contract_reports_all_invalid_dataTypes():
+    schema = [
+        {"name": "column1", "dataType": "varchar"},
+        {"name": "column2", "dataType": "invalid_type"},
+        {"name": "column3", "dataType": "NUMBER"},
+        {"name": "column4", "dataType": "other_type"},
+    ]
+
+    with pytest.raises(pydantic_core.ValidationError) as exc_info:
+        DataContract.model_validate({"schema": schema})
+
+    assert exc_info.value.error_count() == 2
+    message = str(exc_info.value)
+    assert 'Column "column2" specifies dataType of "invalid_type"' in message
+    assert 'Column "column4" specifies dataType of "other_type"' in message
+    assert "column1" not in message
+    assert "column3" not in message
+
+
+def test_data_contract_accepts_dataTypes_in_any_case():
+    schema = [
+        {"name": "column1", "dataType": "varchar"},
+        {"name": "column2", "dataType": "Timestamp"},
+    ]
+
+    data_contract = DataContract.model_validate({"schema": schema})
+
+    assert [column.dataType for column in data_contract.schema_] == [
+        "varchar",
+        "Timestamp",
+    ]
@@ -1,3 +1,4 @@
+import json
 import unittest
 from pathlib import Path
 from unittest.mock import Mock
@@ -18,6 +19,7 @@ from src.models.api_models import (
     ValidationError,
 )
 from src.models.data_product_descriptor import DataProduct
+from src.models.parsed_descriptor import ParsedDescriptor
 
 
 class TestUnpackUpdateAclRequest(unittest.IsolatedAsyncioTestCase):
@@ -79,11 +81,17 @@ class TestUnpackProvisioningRequest(unittest.IsolatedAsyncioTestCase):
 
     async def test_successful_unpack(self):
         result = await unpack_provisioning_request(self.provisioning_request)
-        self.assertIsInstance(result, tuple)
-        self.assertEqual(len(result), 2)
-        self.assertIsInstance(result[0], DataProduct)
+        self.assertIsInstance(result, ParsedDescriptor)
+        self.assertIsInstance(result.data_product, DataProduct)
         self.assertEqual(
-            result[1], "urn:dmb:cmp:healthcare:vaccinations:0:snowflake-output-port"
+            result.component_id,
+            "urn:dmb:cmp:healthcare:vaccinations:0:snowflake-output-port",
+        )
+        self.assertEqual(
+            result.descriptor_dict["dataProduct"]["id"], result.data_product.id
+        )
+        self.assertEqual(
+            json.loads(result.json)["componentIdToProvision"], result.component_id
         )
 
     async def test_invalid_request(self):
@@ -105,12 +113,11 @@ app_test = FastAPI()
 
 @app_test.post("/provision")
 async def provision(data: UnpackedProvisioningRequestDep):
-    if isinstance(data, tuple) and len(data) == 2:
-        data_product, component_id = data
+    if isinstance(data, ParsedDescriptor):
         return {
             "message": "Provisioning completed successfully",
-            "data_product": data_product,
-            "component_id": component_id,
+            "data_product": data.data_product,
+            "component_id": data.component_id,
         }
     elif isinstance(data, ValidationError):
         return {"message": "Provisioning failed", "errors": data.errors}
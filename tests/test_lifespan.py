@@ -0,0 +1,104 @@
+from unittest.mock import Mock
+
+import pytest
+from starlette.testclient import TestClient
+
+from src import lifespan as lifespan_module
+from src.dependencies import get_task_executor, get_validation_executor
+from src.main import app
+
+
+@pytest.fixture(name="getters")
+def getters_fixture(monkeypatch):
+    getters = {
+        name: Mock()
+        for name in [
+            "get_provision_service",
+            "get_dag_repository",
+            "get_provisioning_task_service",
+            "get_validation_task_service",
+            "get_s3_dag_settings",
+            "get_s3_client",
+            "get_task_executor",
+            "get_validation_executor",
+        ]
+    }
+    for name, getter in getters.items():
+        monkeypatch.setattr(lifespan_module, name, getter)
+    return getters
+
+
+def test_warm_up(getters):
+    getters["get_s3_dag_settings"].return_value.bucket_name = "bucket_name"
+
+    lifespan_module.warm_up()
+
+    getters["get_provision_service"].assert_called_once()
+    getters["get_provisioning_task_service"].assert_called_once()
+    getters["get_validation_task_service"].assert_called_once()
+    getters["get_s3_client"].return_value.head_bucket.assert_called_once_with(
+        Bucket="bucket_name"
+    )
+
+
+def test_warm_up_with_unreachable_bucket(getters):
+    getters["get_s3_client"].return_value.head_bucket.side_effect = ValueError("error")
+
+    lifespan_module.warm_up()
+
+    getters["get_provision_service"].assert_called_once()
+
+
+def test_warm_up_with_invalid_settings(getters):
+    getters["get_provision_service"].side_effect = ValueError("invalid settings")
+
+    with pytest.raises(ValueError):
+        lifespan_module.warm_up()
+
+
+def test_drain(getters):
+    lifespan_module.drain()
+
+    getters["get_task_executor"].return_value.shutdown.assert_called_once_with(
+        wait=True
+    )
+    getters["get_validation_executor"].return_value.shutdown.assert_called_once_with(
+        wait=True
+    )
+    for name in [
+        "get_task_executor",
+        "get_provisioning_task_service",
+        "get_validation_executor",
+        "get_validation_task_service",
+    ]:
+        getters[name].cache_clear.assert_called_once()
+
+
+def test_executors_accept_tasks_after_drain():
+    task_executor = get_task_executor()
+    validation_executor = get_validation_executor()
+
+    lifespan_module.drain()
+
+    assert get_task_executor() is not task_executor
+    assert get_validation_executor() is not validation_executor
+    assert get_task_executor().submit(lambda: "task").result() == "task"
+    assert get_validation_executor().submit(lambda: "task").result() == "task"
+
+
+def test_readiness_follows_lifespan(monkeypatch):
+    warm_up, drain = Mock(), Mock()
+    monkeypatch.setattr(lifespan_module, "warm_up", warm_up)
+    monkeypatch.setattr(lifespan_module, "drain", drain)
+
+    assert TestClient(app).get("/health/ready").status_code == 503
+    with TestClient(app) as client:
+        warm_up.assert_called_once()
+        assert client.get("/health/ready").json() == {"status": "ready"}
+        assert client.get("/health/live").status_code == 200
+        assert app.state.blocking_portal is not None
+        drain.assert_not_called()
+    drain.assert_called_once()
+    assert app.state.ready is False
+    assert app.state.blocking_portal is None
+    assert TestClient(app).get("/health/live").json() == {"status": "live"}
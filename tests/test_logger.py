@@ -0,0 +1,71 @@
+import json
+import logging
+import logging.handlers
+import sys
+
+import pytest
+
+from src.settings.logging_settings import LoggingSettings
+from src.utility import logger as logger_module
+from src.utility.logger import (
+    JsonFormatter,
+    configure_logging,
+    get_logger,
+    stop_logging,
+)
+
+
+@pytest.fixture(autouse=True)
+def unconfigured_logging(monkeypatch):
+    root_logger = logging.getLogger()
+    handlers, level = root_logger.handlers[:], root_logger.level
+    monkeypatch.setattr(logger_module, "_configured", False)
+    monkeypatch.setattr(logger_module, "_queue_listener", None)
+    yield
+    stop_logging()
+    root_logger.handlers = handlers
+    root_logger.setLevel(level)
+
+
+def test_logging_is_configured_once():
+    configure_logging(LoggingSettings(level="WARNING"))
+    handlers = logging.getLogger().handlers[:]
+
+    get_logger("first")
+    configure_logging(LoggingSettings(level="DEBUG"))
+    get_logger("second")
+
+    assert logging.getLogger().handlers == handlers
+    assert logging.getLogger().level == logging.WARNING
+
+
+def test_queue_handler():
+    configure_logging(LoggingSettings(queue=True))
+
+    (handler,) = logging.getLogger().handlers
+    assert isinstance(handler, logging.handlers.QueueHandler)
+    assert logger_module._queue_listener is not None
+
+
+def test_stream_handler_without_queue():
+    configure_logging(LoggingSettings(queue=False))
+
+    (handler,) = logging.getLogger().handlers
+    assert isinstance(handler, logging.StreamHandler)
+    assert logger_module._queue_listener is None
+
+
+def test_json_formatter():
+    try:
+        raise ValueError("error")
+    except ValueError:
+        record = logging.LogRecord(
+            "name", logging.ERROR, __file__, 1, "message %s", ("arg",), sys.exc_info()
+        )
+
+    log = json.loads(JsonFormatter().format(record))
+
+    assert log["level"] == "ERROR"
+    assert log["logger"] == "name"
+    assert log["message"] == "message arg"
+    assert "ValueError: error" in log["exception"]
@@ -0,0 +1,99 @@
+import logging
+
+from fastapi import FastAPI
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.testclient import TestClient
+
+from src.settings.logging_settings import LoggingSettings
+from src.utility.logging_middleware import RequestResponseLoggingMiddleware
+
+LOGGER_NAME = "src.utility.logging_middleware"
+
+
+def _client(**settings) -> TestClient:
+    app_test = FastAPI()
+    app_test.add_middleware(
+        RequestResponseLoggingMiddleware, logging_settings=LoggingSettings(**settings)
+    )
+
+    @app_test.post("/echo")
+    async def echo(body: dict):
+        return body
+
+    @app_test.get("/stream")
+    async def stream():
+        return StreamingResponse(iter([b"chunk1-", b"chunk2-", b"chunk3"]))
+
+    @app_test.get("/v1/provision/{token}/status")
+    async def status(token: str):
+        return PlainTextResponse(f"status {token}")
+
+    @app_test.get("/metrics")
+    async def metrics():
+        return PlainTextResponse("# HELP metric")
+
+    return TestClient(app_test)
+
+
+def _messages(caplog) -> list[str]:
+    return [r.getMessage() for r in caplog.records if r.name == LOGGER_NAME]
+
+
+def test_logs_request_and_response(caplog):
+    caplog.set_level(logging.INFO, logger=LOGGER_NAME)
+
+    resp = _client().post("/echo", json={"key": "value"})
+
+    assert resp.status_code == 200
+    request_log, response_log = _messages(caplog)
+    assert 'REQUEST: POST /echo {"key":"value"}' in request_log
+    assert 'RESPONSE: 200 {"key":"value"}' in response_log
+
+
+def test_streamed_response_is_passed_through(caplog):
+    caplog.set_level(logging.INFO, logger=LOGGER_NAME)
+
+    resp = _client().get("/stream")
+
+    assert resp.text == "chunk1-chunk2-chunk3"
+    assert "RESPONSE: 200 chunk1-chunk2-chunk3" in _messages(caplog)[1]
+
+
+def test_bodies_are_truncated(caplog):
+    caplog.set_level(logging.INFO, logger=LOGGER_NAME)
+
+    resp = _client(body_max_bytes=10).post("/echo", json={"key": "x" * 100})
+
+    assert resp.json() == {"key": "x" * 100}
+    request_log, response_log = _messages(caplog)
+    assert request_log.endswith('{"key":"xx... [truncated, 110 bytes]')
+    assert response_log.endswith('{"key":"xx... [truncated, 110 bytes]')
+
+
+def test_status_routes_are_logged_without_bodies(caplog):
+    caplog.set_level(logging.INFO, logger=LOGGER_NAME)
+
+    resp = _client().get("/v1/provision/token/status")
+
+    assert resp.text == "status token"
+    (log,) = _messages(caplog)
+    assert log.endswith("GET /v1/provision/token/status -> 200")
+
+
+def test_metrics_are_logged_without_bodies(caplog):
+    caplog.set_level(logging.INFO, logger=LOGGER_NAME)
+
+    resp = _client().get("/metrics")
+
+    assert resp.text == "# HELP metric"
+    (log,) = _messages(caplog)
+    assert log.endswith("GET /metrics -> 200")
+
+
+def test_bodies_are_sampled(caplog):
+    caplog.set_level(logging.INFO, logger=LOGGER_NAME)
+
+    _client(body_sample_rate=0.0).post("/echo", json={"key": "value"})
+
+    (log,) = _messages(caplog)
+    assert log.endswith("POST /echo -> 200")
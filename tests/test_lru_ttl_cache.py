@@ -0,0 +1,73 @@
+from src.utility.lru_ttl_cache import LruTtlCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_get_counts_hits_and_misses():
+    cache: LruTtlCache[str, int] = LruTtlCache(max_entries=2, ttl_seconds=10)
+    cache.put("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache: LruTtlCache[str, int] = LruTtlCache(max_entries=2, ttl_seconds=10)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+
+    cache.put("c", 3)
+
+    assert len(cache) == 2
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_expired_entry_is_evicted():
+    clock = FakeClock()
+    cache: LruTtlCache[str, int] = LruTtlCache(
+        max_entries=2, ttl_seconds=10, clock=clock
+    )
+    cache.put("a", 1)
+
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_put_refreshes_expiration():
+    clock = FakeClock()
+    cache: LruTtlCache[str, int] = LruTtlCache(
+        max_entries=2, ttl_seconds=10, clock=clock
+    )
+    cache.put("a", 1)
+    clock.now = 5
+    cache.put("a", 2)
+
+    clock.now = 12
+    assert cache.get("a") == 2
+
+
+def test_values_skips_expired_entries():
+    clock = FakeClock()
+    cache: LruTtlCache[str, int] = LruTtlCache(
+        max_entries=2, ttl_seconds=10, clock=clock
+    )
+    cache.put("a", 1)
+    clock.now = 5
+    cache.put("b", 2)
+    clock.now = 10
+
+    assert cache.values() == [2]
+    assert (cache.hits, cache.misses) == (0, 0)
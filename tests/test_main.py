@@ -1,10 +1,11 @@
+from concurrent.futures import Executor, Future
 from pathlib import Path
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock
 
 from fastapi.encoders import jsonable_encoder
 from starlette.testclient import TestClient
 
-from src.dependencies import get_provision_service
+from src.dependencies import get_provision_service, get_provisioning_task_service
 from src.main import app
 from src.models.api_models import (
     DescriptorKind,
@@ -14,11 +15,30 @@ from src.models.api_models import (
     Status1,
     SystemErr,
     UpdateAclRequest,
+    ValidationRequest,
 )
+from src.repositories.in_memory_task_repository import InMemoryTaskRepository
+from src.services.provisioning_task_service import ProvisioningTaskService
+from src.services.validation_service import (
+    get_validation_task_service,
+    validate_descriptor,
+)
+from src.services.validation_task_service import ValidationTaskService
 
 client = TestClient(app)
 
 
+class ImmediateExecutor(Executor):
+    def submit(self, fn, /, *args, **kwargs):
+        future: Future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+def mock_provisioning_task_service():
+    return ProvisioningTaskService(InMemoryTaskRepository(), ImmediateExecutor())
+
+
 def test_provisioning_invalid_descriptor():
     provisioning_request = ProvisioningRequest(
         descriptorKind=DescriptorKind.COMPONENT_DESCRIPTOR, descriptor="descriptor"
@@ -50,13 +70,20 @@ def test_provisioning_ok():
         )
         return m
 
+    provisioning_task_service = mock_provisioning_task_service()
     app.dependency_overrides[get_provision_service] = mock_provision_service
+    app.dependency_overrides[get_provisioning_task_service] = (
+        lambda: provisioning_task_service
+    )
 
     resp = client.post("/v1/provision", json=jsonable_encoder(provisioning_request))
+    status_resp = client.get(f"/v1/provision/{resp.text}/status")
 
     app.dependency_overrides = {}
-    assert resp.status_code == 200
-    assert resp.json() == {"info": None, "result": "", "status": "COMPLETED"}
+    assert resp.status_code == 202
+    assert status_resp.status_code == 200
+    assert status_resp.json()["status"] == "COMPLETED"
+    assert status_resp.json()["result"] == ""
 
 
 def test_provisioning_ko():
@@ -71,13 +98,32 @@ def test_provisioning_ko():
         m.provision.return_value = SystemErr(error=error_msg)
         return m
 
+    provisioning_task_service = mock_provisioning_task_service()
     app.dependency_overrides[get_provision_service] = mock_provision_service
+    app.dependency_overrides[get_provisioning_task_service] = (
+        lambda: provisioning_task_service
+    )
 
     resp = client.post("/v1/provision", json=jsonable_encoder(provisioning_request))
+    status_resp = client.get(f"/v1/provision/{resp.text}/status")
 
     app.dependency_overrides = {}
-    assert resp.status_code == 500
-    assert resp.json() == {"error": error_msg}
+    assert resp.status_code == 202
+    assert status_resp.status_code == 200
+    assert status_resp.json()["status"] == "FAILED"
+    assert status_resp.json()["result"] == error_msg
+
+
+def test_provisioning_status_unknown_token():
+    app.dependency_overrides[get_provisioning_task_service] = (
+        mock_provisioning_task_service
+    )
+
+    resp = client.get("/v1/provision/unknown/status")
+
+    app.dependency_overrides = {}
+    assert resp.status_code == 400
+    assert resp.json() == {"errors": ["Unknown provisioning token: unknown"]}
 
 
 def test_unprovisioning_invalid_descriptor():
@@ -107,8 +153,8 @@ def test_unprovisioning_ok():
 
     def mock_provision_service():
         m = Mock()
-        m.unprovision.return_value = ProvisioningStatus(
-            status=Status1.COMPLETED, result=""
+        m.unprovision_async = AsyncMock(
+            return_value=ProvisioningStatus(status=Status1.COMPLETED, result="")
         )
         return m
 
@@ -130,7 +176,7 @@ def test_unprovisioning_ko():
 
     def mock_provision_service():
         m = Mock()
-        m.unprovision.return_value = SystemErr(error=error_msg)
+        m.unprovision_async = AsyncMock(return_value=SystemErr(error=error_msg))
         return m
 
     app.dependency_overrides[get_provision_service] = mock_provision_service
@@ -192,3 +238,76 @@ def test_updateacl_valid_descriptor():
 
     assert resp.status_code == 500
     assert "Response not yet implemented" in resp.json().get("error")
+
+
+def test_async_validate_valid_descriptor():
+    descriptor_str = Path("tests/descriptors/descriptor_valid.yaml").read_text()
+    validation_task_service = ValidationTaskService(
+        validate_descriptor, ImmediateExecutor()
+    )
+    app.dependency_overrides[get_validation_task_service] = (
+        lambda: validation_task_service
+    )
+
+    resp = client.post(
+        "/v2/validate", json=dict(ValidationRequest(descriptor=descriptor_str))
+    )
+    status_resp = client.get(f"/v2/validate/{resp.text}/status")
+
+    app.dependency_overrides = {}
+    assert resp.status_code == 202
+    assert status_resp.status_code == 200
+    assert status_resp.json() == {
+        "status": "COMPLETED",
+        "result": {"valid": True, "error": None},
+    }
+
+
+def test_async_validate_invalid_descriptor():
+    validation_task_service = ValidationTaskService(
+        validate_descriptor, ImmediateExecutor()
+    )
+    app.dependency_overrides[get_validation_task_service] = (
+        lambda: validation_task_service
+    )
+
+    resp = client.post(
+        "/v2/validate", json=dict(ValidationRequest(descriptor="descriptor"))
+    )
+    status_resp = client.get(f"/v2/validate/{resp.text}/status")
+
+    app.dependency_overrides = {}
+    assert resp.status_code == 202
+    assert status_resp.status_code == 200
+    assert status_resp.json()["status"] == "COMPLETED"
+    assert status_resp.json()["result"]["valid"] is False
+
+
+def test_async_validate_status_unknown_token():
+    resp = client.get("/v2/validate/unknown/status")
+
+    assert resp.status_code == 400
+    assert resp.json() == {"errors": ["Unknown validation token: unknown"]}
+
+
+def test_metrics():
+    descriptor_str = Path("tests/descriptors/descriptor_valid.yaml").read_text()
+    client.post(
+        "/v1/validate",
+        json=dict(
+            ProvisioningRequest(
+                descriptorKind=DescriptorKind.COMPONENT_DESCRIPTOR,
+                descriptor=descriptor_str,
+            )
+        ),
+    )
+
+    resp = client.get("/metrics")
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert (
+        'gx_guardian_descriptor_size_bytes_count{endpoint="/v1/validate",environment="development"}'  # noqa: E501
+        in resp.text
+    )
+    assert "gx_guardian_validate_components_seconds_count" in resp.text
@@ -0,0 +1,82 @@
+import contextvars
+from pathlib import Path
+
+from prometheus_client import REGISTRY
+
+from src.dependencies import parse_component_descriptor
+from src.utility.metrics import count_dags, generate_metrics, set_endpoint
+
+
+def _value(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_count_dags_by_outcome_endpoint_and_environment():
+    def count() -> None:
+        set_endpoint("/v1/provision")
+        count_dags("test_env", written=2, skipped=1)
+
+    before = _value(
+        "gx_guardian_dags_total",
+        outcome="written",
+        endpoint="/v1/provision",
+        environment="test_env",
+    )
+
+    contextvars.copy_context().run(count)
+
+    assert (
+        _value(
+            "gx_guardian_dags_total",
+            outcome="written",
+            endpoint="/v1/provision",
+            environment="test_env",
+        )
+        == before + 2
+    )
+    assert (
+        _value(
+            "gx_guardian_dags_total",
+            outcome="skipped",
+            endpoint="/v1/provision",
+            environment="test_env",
+        )
+        >= 1
+    )
+
+
+def test_parse_component_descriptor_observes_stages_and_size():
+    descriptor = Path("tests/descriptors/descriptor_valid.yaml").read_text()
+    parses = _value("gx_guardian_descriptor_parse_seconds_count")
+    validations = _value("gx_guardian_data_product_validation_seconds_count")
+    sizes = _value(
+        "gx_guardian_descriptor_size_bytes_sum", endpoint="", environment="development"
+    )
+
+    contextvars.copy_context().run(parse_component_descriptor, descriptor)
+
+    assert _value("gx_guardian_descriptor_parse_seconds_count") == parses + 1
+    assert (
+        _value("gx_guardian_data_product_validation_seconds_count") == validations + 1
+    )
+    assert _value(
+        "gx_guardian_descriptor_size_bytes_sum", endpoint="", environment="development"
+    ) == sizes + len(descriptor.encode("utf-8"))
+
+
+def test_generate_metrics_of_a_single_process(monkeypatch):
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+
+    content, content_type = generate_metrics()
+
+    assert content_type.startswith("text/plain")
+    assert b"gx_guardian_requests_in_progress" in content
+
+
+def test_generate_metrics_aggregates_the_worker_processes(monkeypatch, tmp_path: Path):
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+
+    content, _ = generate_metrics()
+
+    # only the metrics written to the shared folder are returned
+    assert b"gx_guardian_requests_in_progress" not in content
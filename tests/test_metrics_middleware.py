@@ -0,0 +1,45 @@
+from fastapi import FastAPI
+from prometheus_client import REGISTRY
+from starlette.responses import PlainTextResponse
+from starlette.testclient import TestClient
+
+from src.utility.metrics import get_endpoint
+from src.utility.metrics_middleware import MetricsMiddleware
+
+STATUS_ROUTE = "/v1/provision/{token}/status"
+
+
+def _in_progress(endpoint: str) -> float:
+    return (
+        REGISTRY.get_sample_value(
+            "gx_guardian_requests_in_progress", {"endpoint": endpoint}
+        )
+        or 0.0
+    )
+
+
+def _client() -> TestClient:
+    app_test = FastAPI()
+    app_test.add_middleware(MetricsMiddleware)
+
+    @app_test.get(STATUS_ROUTE)
+    async def status(token: str):
+        return PlainTextResponse(f"{get_endpoint()} {_in_progress(STATUS_ROUTE)}")
+
+    return TestClient(app_test)
+
+
+def test_tracks_requests_in_progress_by_route():
+    before = _in_progress(STATUS_ROUTE)
+
+    resp = _client().get("/v1/provision/a-token/status")
+
+    assert resp.text == f"{STATUS_ROUTE} {before + 1}"
+    assert _in_progress(STATUS_ROUTE) == before
+
+
+def test_unmatched_requests_are_not_tracked():
+    resp = _client().get("/unknown")
+
+    assert resp.status_code == 404
+    assert _in_progress("/unknown") == 0.0
@@ -0,0 +1,141 @@
+import hashlib
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+from botocore.exceptions import ClientError
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from opentelemetry.trace import StatusCode
+
+from src.dependencies import parse_component_descriptor
+from src.models.api_models import ValidationError
+from src.repositories.s3_dag_repository import S3DagRepository
+from src.services.template_service import TemplateService
+from src.services.validation_service import validate_components
+from src.settings.s3_dag_settings import S3DagSettings
+from src.utility.tracing import start_span
+
+data_contract_id = (
+    "urn:dmb:cmp:marketing:system-with-data-contract:0:consumable-data-contract"
+)
+
+
+@pytest.fixture
+def exporter(monkeypatch) -> InMemorySpanExporter:
+    exporter = InMemorySpanExporter()
+    tracer_provider = TracerProvider()
+    tracer_provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(trace, "get_tracer_provider", lambda: tracer_provider)
+    return exporter
+
+
+def _spans(exporter: InMemorySpanExporter) -> dict:
+    return {span.name: span for span in exporter.get_finished_spans()}
+
+
+def test_no_span_without_tracer_provider():
+    with start_span("span", {"key": "value"}) as span:
+        span.set_attribute("other_key", "value")
+
+    assert not span.is_recording()
+
+
+def test_spans_of_descriptor_parsing_and_validation(exporter):
+    descriptor = Path("tests/descriptors/descriptor_valid.yaml").read_text()
+
+    parsed_descriptor = parse_component_descriptor(descriptor)
+    assert not isinstance(parsed_descriptor, ValidationError)
+    validate_components(parsed_descriptor)
+
+    spans = _spans(exporter)
+    assert spans["descriptor.parse"].attributes["gx_guardian.payload_size"] == len(
+        descriptor
+    )
+    assert (
+        spans["descriptor.validate_data_product"].attributes["deployment.environment"]
+        == "development"
+    )
+    assert spans["validate_components"].attributes == {
+        "gx_guardian.component_id": parsed_descriptor.component_id,
+        "deployment.environment": "development",
+    }
+
+
+def test_span_of_template_render(exporter):
+    rendered = TemplateService().render_template(
+        "snowflake",
+        {"data_contract_id": data_contract_id, "environment": "development"},
+    )
+
+    span = _spans(exporter)["render_template"]
+    assert span.attributes == {
+        "gx_guardian.template": "snowflake.jinja",
+        "gx_guardian.data_contract_id": data_contract_id,
+        "deployment.environment": "development",
+        "gx_guardian.payload_size": len(rendered),
+    }
+
+
+def test_spans_of_dag_upload(exporter):
+    s3_client = Mock()
+    s3_client.head_object.side_effect = ClientError(
+        {"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject"
+    )
+    s3_dag_repository = S3DagRepository(
+        S3DagSettings(bucket_name="bucket_name", folder="dags"), s3_client
+    )
+
+    with start_span("provision"):
+        s3_dag_repository.create_or_update_dag(
+            data_contract_id, "content", "development"
+        )
+
+    spans = _spans(exporter)
+    upload = spans["s3.create_or_update_dag"]
+    assert upload.parent.span_id == spans["provision"].context.span_id
+    assert upload.attributes["gx_guardian.data_contract_id"] == data_contract_id
+    assert upload.attributes["deployment.environment"] == "development"
+    assert upload.attributes["gx_guardian.payload_size"] == len(b"content")
+    assert upload.attributes["gx_guardian.upload_skipped"] is False
+    # a missing DAG is not an error
+    assert spans["s3.head_object"].status.status_code == StatusCode.UNSET
+    assert spans["s3.head_object"].parent.span_id == upload.context.span_id
+    assert spans["s3.put_object"].parent.span_id == upload.context.span_id
+
+
+def test_spans_of_skipped_dag_upload(exporter):
+    s3_client = Mock()
+    s3_client.head_object.return_value = {
+        "Metadata": {
+            "content-sha256": hashlib.sha256(b"content").hexdigest(),
+            "data-contract-id": data_contract_id,
+        }
+    }
+    s3_dag_repository = S3DagRepository(
+        S3DagSettings(bucket_name="bucket_name", folder="dags"), s3_client
+    )
+
+    s3_dag_repository.create_or_update_dag(data_contract_id, "content", "development")
+
+    spans = _spans(exporter)
+    assert spans["s3.create_or_update_dag"].attributes["gx_guardian.upload_skipped"]
+    assert "s3.put_object" not in spans
+
+
+def test_span_of_failed_s3_call(exporter):
+    s3_client = Mock()
+    s3_client.delete_object.side_effect = Exception("Access Denied")
+    s3_dag_repository = S3DagRepository(
+        S3DagSettings(bucket_name="bucket_name", folder="dags"), s3_client
+    )
+
+    s3_dag_repository.delete_manifest("guardian", "development")
+
+    span = _spans(exporter)["s3.delete_object"]
+    assert span.status.status_code == StatusCode.ERROR
+    assert span.attributes["gx_guardian.component_id"] == "guardian"
@@ -0,0 +1,58 @@
+from pathlib import Path
+from unittest import mock
+
+import pytest
+import yaml
+
+from src.models.data_product_descriptor import DataProduct
+from src.utility.parsing_pydantic_models import parse_yaml_with_model
+from src.utility.yaml_loader import get_loader_class
+
+descriptors = sorted(Path("tests/descriptors").glob("*.yaml"))
+
+requires_libyaml = pytest.mark.skipif(
+    not yaml.__with_libyaml__, reason="PyYAML built without libyaml"
+)
+
+
+def _load_data_product(descriptor: Path, loader: str) -> DataProduct:
+    descriptor_dict = yaml.load(descriptor.read_text(), Loader=get_loader_class(loader))
+    data_product_dict = descriptor_dict.get("dataProduct", descriptor_dict)
+    data_product = parse_yaml_with_model(data_product_dict, DataProduct)
+    assert isinstance(data_product, DataProduct)
+    return data_product
+
+
+def test_get_loader_class_python():
+    assert get_loader_class("python") is yaml.SafeLoader
+
+
+@requires_libyaml
+def test_get_loader_class_libyaml():
+    assert get_loader_class("auto") is yaml.CSafeLoader
+    assert get_loader_class("libyaml") is yaml.CSafeLoader
+
+
+def test_get_loader_class_without_libyaml():
+    with mock.patch.object(yaml, "__with_libyaml__", False):
+        assert get_loader_class("auto") is yaml.SafeLoader
+        with pytest.raises(RuntimeError):
+            get_loader_class("libyaml")
+
+
+@requires_libyaml
+@pytest.mark.parametrize("descriptor", descriptors, ids=lambda p: p.name)
+def test_loaders_parity(descriptor):
+    text = descriptor.read_text()
+
+    assert yaml.load(text, Loader=yaml.CSafeLoader) == yaml.load(
+        text, Loader=yaml.SafeLoader
+    )
+
+
+@requires_libyaml
+@pytest.mark.parametrize("descriptor", descriptors, ids=lambda p: p.name)
+def test_loaders_data_product_parity(descriptor):
+    assert _load_data_product(descriptor, "libyaml") == _load_data_product(
+        descriptor, "python"
+    )